@@ -60,6 +60,26 @@ def make_model(args):
 	b2c.main(params)
 
 
+def strictly_positive_int(value):
+	"""Type of arguments that must be integers >= 1"""
+	number = int(value)
+	if number < 1:
+		raise argparse.ArgumentTypeError(
+			"{} is not an integer >= 1".format(value)
+		)
+	return number
+
+
+def non_negative_int(value):
+	"""Type of arguments that must be integers >= 0"""
+	number = int(value)
+	if number < 0:
+		raise argparse.ArgumentTypeError(
+			"{} is not an integer >= 0".format(value)
+		)
+	return number
+
+
 def args_to_param(args):
 	"""Return argparse namespace as a dict {variable name: value}"""
 	return {k: v for k, v in vars(args).items() if k != 'func'}
@@ -107,18 +127,51 @@ def main():
 		default=cm.DIR_PICKLE + 'backup.p',
 		help="Output file path to save the script variables."
 	)
+	parser_make_model.add_argument('--backupFormat', type=str, nargs='?',
+		default='dill', choices=('dill', 'snapshot'),
+		help="Format of the backup of queries. 'snapshot' is a flat file "
+			 "of integer arrays and strings, memory-mapped when it is "
+			 "loaded (smaller, faster to save and to load; objects are "
+			 "still rebuilt in memory)."
+	)
 
 	# Model options
 	parser_make_model.add_argument('--cadbiomFile', type=str, nargs='?',
 		default=cm.DIR_OUTPUT + 'model.bcx',
 		help="Output file path to generate the Cadbiom model."
 			 "2 models are created: A basic model and a model without strongly "
-			 "connected components that block CADBIOM solver."
+			 "connected components that block CADBIOM solver. "
+			 "Models are compressed if the path ends with '.gz' (gzip) "
+			 "or '.zst' (zstd)."
+	)
+	parser_make_model.add_argument('--splitByPathway', action='store_true',
+		help="If set, 1 model per top-level pathway is written instead of "
+			 "the full model (files named after --cadbiomFile, written by "
+			 "--workers processes), with a manifest of the models "
+			 "(<cadbiomFile without extension>_manifest.json)."
+	)
+	parser_make_model.add_argument('--jsonLinesFile', type=str, nargs='?',
+		help="If set, nodes and transitions of the model are also exported "
+			 "in this JSON-lines file, with a table of strings "
+			 "(no XML parsing is needed to load it). "
+			 "The file is compressed like --cadbiomFile."
 	)
 	parser_make_model.add_argument('--convertFullGraph', action='store_true',
 		help="Converts all entities to cadbiom nodes, "
 			 "even the entities not used."
 	)
+	parser_make_model.add_argument('--maxFlatComponents',
+		type=strictly_positive_int, nargs='?',
+		help="If set, complexes with more flat components (combinations "
+			 "of their components and members) than this limit are handled "
+			 "according to --overLimitStrategy."
+	)
+	parser_make_model.add_argument('--overLimitStrategy', type=str, nargs='?',
+		default='parent', choices=('parent', 'sample'),
+		help="'parent': complexes over the limit are kept as single nodes; "
+			 "'sample': a reproducible random sample of their flat components "
+			 "is kept."
+	)
 	parser_make_model.add_argument('--fullCompartmentsNames', action='store_true',
 		help="If set, compartments will be encoded on the base "
 			 "of their real names instead of numeric values."
@@ -127,6 +180,57 @@ def main():
 		help="If set, strongly connected components will NOT be fixed in "
 			 "a second model file."
 	)
+	parser_make_model.add_argument('--compactModel', action='store_true',
+		help="If set, the elements of the model file are not indented "
+			 "(smaller file, same model)."
+	)
+	parser_make_model.add_argument('--workers',
+		type=strictly_positive_int, nargs='?', default=1,
+		help="Number of processes used to compute the transitions "
+			 "of reactions."
+	)
+	parser_make_model.add_argument('--transitionStore', type=str, nargs='?',
+		default='memory', choices=('memory', 'sqlite'),
+		help="'memory': transitions are kept in memory until the model is "
+			 "written; 'sqlite': transitions are stored in a temporary "
+			 "SQLite database in the directory of --cadbiomFile "
+			 "(for graphs whose transitions don't fit in memory)."
+	)
+	parser_make_model.add_argument('--memoryBudget', type=int, nargs='?',
+		default=256,
+		help="Memory (MB) used by the SQLite store of transitions "
+			 "(buffer of transitions and cache of SQLite)."
+	)
+	parser_make_model.add_argument('--shardByComponent', action='store_true',
+		help="If set, conditions and transitions are computed separately "
+			 "for each connected component of the graph of reactions, "
+			 "in --workers processes that only receive their components."
+	)
+	parser_make_model.add_argument('--columnarStore', action='store_true',
+		help="If set, entities involved in reactions, members used and "
+			 "entities of pathways are computed on integer arrays "
+			 "(faster on big graphs; requires numpy)."
+	)
+	parser_make_model.add_argument('--namesCache', type=str, nargs='?',
+		help="If set, names assigned to entities are saved in this file, "
+			 "and reused by the next conversions of the same entities "
+			 "(the resolution of collisions between names is skipped)."
+	)
+	parser_make_model.add_argument('--seeds', nargs='+',
+		help="If set, only the neighbourhood of these entities (uris, names "
+			 "or synonyms) is converted (see --radius). The same backup "
+			 "of queries can be reused with different seeds."
+	)
+	parser_make_model.add_argument('--radius',
+		type=non_negative_int, nargs='?', default=1,
+		help="Maximum number of reactions between the seeds and the "
+			 "entities of their neighbourhood."
+	)
+	parser_make_model.add_argument('--dryRun', action='store_true',
+		help="If set, the model is not built; only the numbers of flat "
+			 "components, cadbiom names and transitions are estimated, "
+			 "and the biggest complexes and reactions are reported."
+	)
 	parser_make_model.add_argument('--blacklist', type=str, nargs='?',
 		help="If set, the entities in the given file will be"
 			 "banished from conditions of transitions "
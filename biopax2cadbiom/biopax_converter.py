@@ -30,19 +30,54 @@ This module is used to translate BioPAX to a CADBIOM model.
 from __future__ import print_function
 
 # Standard imports
-import copy, dill, sympy, os, re
+import dill, json, os, random
 import itertools as it
+import multiprocessing as mp
 from collections import defaultdict
 import csv
 
 # Custom imports
 from biopax2cadbiom import sparql_biopaxQueries as query
-from biopax2cadbiom.cadbiom_writer import createCadbiomFile
+from biopax2cadbiom import conditions
+from biopax2cadbiom.cadbiom_writer import createCadbiomFile, \
+	createJsonLinesFile, splitModelPath, getModelWithoutSCCPath
+from biopax2cadbiom.snapshot import write_snapshot, load_snapshot
+from biopax2cadbiom.sharding import getConnectedComponents, packComponents
+from biopax2cadbiom.graph_store import GraphStore
+from biopax2cadbiom.pathways import getTopLevelPathways, \
+	splitTransitionsByPathway, getPathwayModelPaths
+from biopax2cadbiom.transition_store import MemoryTransitionStore, \
+	SQLiteTransitionStore
+from biopax2cadbiom.naming import clean_name, naming_digest, \
+	load_names_cache, save_names_cache
 import biopax2cadbiom.commons as cm
-from classes import Control
+from classes import Control, GeneEntity, Transition
 
 LOGGER = cm.logger()
 
+# Types of reactions handled by updateTransitions()
+TRANSITION_REACTION_TYPES = ("BiochemicalReaction", "ComplexAssembly",
+	"Transport", "TransportWithBiochemicalReaction")
+
+# Data shared with the processes of getTransitionsInParallel()
+# (copy-on-write after fork): (dictReaction, dictPhysicalEntity, memo)
+TRANSITIONS_CONTEXT = None
+
+# Data shared with the processes of getShardedConditionsAndTransitions()
+# (copy-on-write after fork): (dictReaction, dictPhysicalEntity, shards)
+SHARDS_CONTEXT = None
+
+# Data shared with the processes of writeModelsByPathway()
+# (copy-on-write after fork):
+# (transitions of pathways, dictPhysicalEntity, paths, settings of the models)
+PATHWAYS_CONTEXT = None
+
+# Parameters that define the results of queries: they are checked when
+# a backup of queries is loaded. Other parameters (model, seeds
+# (see getSeedsNeighbourhood()), processes, stores...) can change.
+QUERY_PARAMS = ('listOfGraphUri', 'triplestore', 'blacklist')
+
+
 
 def addReactionToEntities(dictReaction, dictControl, dictPhysicalEntity):
 	"""Fill the attribute 'reactions' of PhysicalEntity objects.
@@ -134,54 +169,325 @@ def detectMembersUsedInEntities(dictPhysicalEntity, convertFullGraph=False):
 			entity.membersUsed.add(entity.uri)
 
 
-# TODO: Test this function
-def developComplexs(dictPhysicalEntity):
+def getEntitiesUsedInReactions(dictPhysicalEntity):
+	"""Get uris of entities that can reach transitions or their conditions.
+
+	These entities are involved in at least 1 reaction (as participants
+	or controllers), or they are used members of such entities (recursively).
+
+	.. note:: Components of complexes are not returned; they are reached
+		when complexes are developped.
+
+	.. note:: 'reactions' and 'membersUsed' attributes must be set before
+		(see addReactionToEntities() and detectMembersUsedInEntities()).
+
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:return: Set of uris.
+	:rtype: <set <str>>
+	"""
+
+	used_entities = {uri for uri, entity in dictPhysicalEntity.iteritems()
+						if len(entity.reactions) != 0}
+
+	stack = list(used_entities)
+	while stack:
+		for sub_entity in dictPhysicalEntity[stack.pop()].membersUsed:
+			if sub_entity not in used_entities and \
+				sub_entity in dictPhysicalEntity:
+				used_entities.add(sub_entity)
+				stack.append(sub_entity)
+
+	return used_entities
+
+
+def developComplexs(dictPhysicalEntity, entities=None, maxFlatComponents=None,
+					overLimitStrategy='parent'):
 	"""Set the attribute 'listOfFlatComponents' of entities in the dict dictPhysicalEntity.
 
 	.. note:: The value corresponds to a list of component sets.
 
+	.. note:: Nested complexes are developped on demand, only once.
+
 	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
 		created by the function query.getPhysicalEntities()
+	:param entities: (optional) Uris of entities to be developped if they are
+		complexes (ex: getEntitiesUsedInReactions()). All complexes by default.
+	:param maxFlatComponents: (optional) Maximum number of flat components
+		per complex. See developComplexEntity().
+	:param overLimitStrategy: (optional) What to do with complexes that
+		exceed maxFlatComponents. See developComplexEntity().
 	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
 		keys: uris; values entity objects
+	:type entities: <set <str>>
+	:type maxFlatComponents: <int>
+	:type overLimitStrategy: <str>
 	"""
 
+	if entities is None:
+		entities = dictPhysicalEntity.iterkeys()
+
+	# Flat components already computed, shared by all complexes
+	flat_components = dict()
+
 	# /!\ dictPhysicalEntity will be modified in place
-	[developComplexEntity(entity_uri, dictPhysicalEntity)
-		for entity_uri, entity in dictPhysicalEntity.iteritems()
-			if (entity.entityType == "Complex") and \
-				(len(entity.listOfFlatComponents) == 0)]
+	[developComplexEntity(entity_uri, dictPhysicalEntity,
+						  maxFlatComponents, overLimitStrategy,
+						  flat_components)
+		for entity_uri in entities
+			if (dictPhysicalEntity[entity_uri].entityType == "Complex") and \
+				(len(dictPhysicalEntity[entity_uri].listOfFlatComponents) == 0)]
+
+
+def walkNestedComplexes(complexEntity, dictPhysicalEntity, done):
+	"""Iterate over the given complex and its nested complexes, in post-order
+	(nested complexes before their parents).
+
+	.. note:: Complexes in `done` are not visited (neither their components).
+
+	.. note:: Cycles (malformed data) are broken: a complex met again while
+		it is being visited is considered as an elementary component of its
+		parent. These components are returned with the parent.
+
+	:param complexEntity: Uri of a complex.
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param done: Uris of complexes already visited.
+		This container can be updated by the caller during the iteration.
+	:type complexEntity: <str>
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:type done: <dict> or <set>
+	:return: Generator of tuples (uri of complex, set of cyclic components).
+	:rtype: <generator <tuple <str>, <set>>>
+	"""
+
+	def nested_complexes(uri):
+		return iter([component for component in dictPhysicalEntity[uri].components
+					 if component in dictPhysicalEntity and \
+						dictPhysicalEntity[component].entityType == "Complex"])
+
+	path = {complexEntity}
+	stack = [(complexEntity, nested_complexes(complexEntity))]
+	cyclic_components = defaultdict(set)
+	while stack:
+		uri, components = stack[-1]
+		for component in components:
+			if component in done:
+				continue
+			if component in path:
+				LOGGER.warning("Cycle detected in components of {}: {} "
+							   "is considered as elementary".format(
+								   uri, component))
+				cyclic_components[uri].add(component)
+				continue
+			# Visit the nested complex before its parent
+			path.add(component)
+			stack.append((component, nested_complexes(component)))
+			break
+		else:
+			stack.pop()
+			path.remove(uri)
+			yield uri, cyclic_components.pop(uri, set())
+
+
+def getComponentsDevelopped(complexEntity, dictPhysicalEntity, flat_components,
+							cyclic_components=frozenset()):
+	"""Get the possible flat components of each component of the given complex.
+
+	:param complexEntity: Uri of a complex.
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param flat_components: Flat components of nested complexes
+		(None if the nested complex is kept as an elementary component).
+	:param cyclic_components: (optional) Components to be considered
+		as elementary.
+	:type complexEntity: <str>
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:type flat_components: <dict <str>: <list <tuple>>>
+	:type cyclic_components: <set <str>>
+	:return: List of possibilities for each component.
+	:rtype: <list <list>>
+	"""
+
+	listOfComponentsDevelopped = list()
+	for component in dictPhysicalEntity[complexEntity].components:
+		if component not in dictPhysicalEntity:
+			continue
+		entity = dictPhysicalEntity[component]
+		if entity.entityType == "Complex" and \
+			component not in cyclic_components and \
+			flat_components.get(component) is not None:
+			listOfComponentsDevelopped.append(flat_components[component])
+		elif entity.entityType != "Complex" and len(entity.membersUsed) > 0:
+			listOfComponentsDevelopped.append(list(entity.membersUsed))
+		else:
+			listOfComponentsDevelopped.append([component])
+	return listOfComponentsDevelopped
+
+
+def estimateFlatComponents(complexEntity, dictPhysicalEntity, estimates=None):
+	"""Get the number of flat components of the given complex,
+	without developping it.
+
+	:param complexEntity: Uri of a complex.
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param estimates: (optional) Numbers already computed for other complexes.
+		This dict is updated in place.
+	:type complexEntity: <str>
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:type estimates: <dict <str>: <int>>
+	:return: Number of flat components.
+	:rtype: <int>
+	"""
+
+	if estimates is None:
+		estimates = dict()
+
+	for uri, cyclic_components in walkNestedComplexes(
+			complexEntity, dictPhysicalEntity, estimates):
+
+		estimate = None
+		for component in dictPhysicalEntity[uri].components:
+			if component not in dictPhysicalEntity:
+				continue
+			entity = dictPhysicalEntity[component]
+			if entity.entityType == "Complex" and \
+				component not in cyclic_components:
+				size = estimates[component]
+			elif entity.entityType != "Complex" and len(entity.membersUsed) > 0:
+				size = len(entity.membersUsed)
+			else:
+				size = 1
+			estimate = size if estimate is None else estimate * size
+
+		# No component: the complex is not developped
+		estimates[uri] = 0 if estimate is None else estimate
 
+	return estimates[complexEntity]
 
-def developComplexEntity(complexEntity, dictPhysicalEntity):
+
+def developComplexEntity(complexEntity, dictPhysicalEntity,
+						 maxFlatComponents=None, overLimitStrategy='parent',
+						 flat_components=None):
 	"""This procedure fills the value of dictPhysicalEntity[entity]['listOfFlatComponents'].
 
+	Nested complexes are developped too (iteratively).
+
+	If the number of flat components of a complex exceeds maxFlatComponents,
+	overLimitStrategy is applied:
+
+		- 'parent': the complex is not developped; it is kept as a single node
+		  (its only flat component is itself; it is also kept as a single
+		  node in the flat components of its parents).
+		- 'sample': maxFlatComponents flat components are randomly selected
+		  (the selection is reproducible for a given complex).
+
 	:param complexEntity: the biopax id of a complex entity
 	:param dictPhysicalEntity: the dictionnary of biopax physicalEntities created by the function query.getPhysicalEntities()
+	:param maxFlatComponents: (optional) Maximum number of flat components
+		(>= 1). No limit by default.
+	:param overLimitStrategy: (optional) 'parent' (default) or 'sample'.
+	:param flat_components: (optional) Flat components of complexes already
+		developped (None for complexes kept as single nodes).
+		This dict is updated in place.
 	:type complexEntity: string
 	:type dictPhysicalEntity: dict
+	:type maxFlatComponents: <int>
+	:type overLimitStrategy: <str>
+	:type flat_components: <dict <str>: <list <tuple>>>
 	"""
-	listOfComponentsDevelopped = list()
-	for component in dictPhysicalEntity[complexEntity].components:
-		if component in dictPhysicalEntity and dictPhysicalEntity[component].entityType != set() :
-			typeName = dictPhysicalEntity[component].entityType
-			if typeName == "Complex":
-				if len(dictPhysicalEntity[component].listOfFlatComponents) == 0:
-					developComplexEntity(component, dictPhysicalEntity)
-				listOfComponentsDevelopped.append(dictPhysicalEntity[component].listOfFlatComponents)
-			elif len(dictPhysicalEntity[component].membersUsed) > 0:
-				listOfComponentsDevelopped.append(list(dictPhysicalEntity[component].membersUsed))
-			else:
-				listOfComponentsDevelopped.append([component])
 
-	if len(listOfComponentsDevelopped) != 0:
-		dictPhysicalEntity[complexEntity].listOfFlatComponents = []
-		for elements in it.product(*listOfComponentsDevelopped):
+	assert overLimitStrategy in ('parent', 'sample'), \
+		"Unknown strategy for complexes over the limit: " + overLimitStrategy
+	assert maxFlatComponents is None or maxFlatComponents >= 1, \
+		"The maximum number of flat components must be >= 1"
+
+	if flat_components is None:
+		flat_components = dict()
+
+	for uri, cyclic_components in walkNestedComplexes(
+			complexEntity, dictPhysicalEntity, flat_components):
+
+		entity = dictPhysicalEntity[uri]
+		listOfComponentsDevelopped = getComponentsDevelopped(
+			uri, dictPhysicalEntity, flat_components, cyclic_components
+		)
+		if len(listOfComponentsDevelopped) == 0:
+			flat_components[uri] = entity.listOfFlatComponents
+			continue
+
+		nb_flat_components = reduce(
+			lambda x, y: x * y, (len(l) for l in listOfComponentsDevelopped)
+		)
+		if maxFlatComponents is not None and \
+			nb_flat_components > maxFlatComponents:
+
+			LOGGER.warning("Complex {}: {} flat components (limit: {}); "
+						   "strategy: {}".format(
+							   uri, nb_flat_components, maxFlatComponents,
+							   overLimitStrategy))
+
+			if overLimitStrategy == 'parent':
+				# The complex is its own flat component (1 cadbiom name)
+				entity.listOfFlatComponents = [(uri,)]
+				flat_components[uri] = None
+				continue
+
+			products = sampleProduct(
+				listOfComponentsDevelopped,
+				nb_flat_components,
+				maxFlatComponents,
+				random.Random(uri),
+			)
+		else:
+			products = it.product(*listOfComponentsDevelopped)
+
+		entity.listOfFlatComponents = []
+		for elements in products:
 			l = []
 			for e in elements:
 				if isinstance(e, tuple): l += e
 				else: l.append(e)
-			dictPhysicalEntity[complexEntity].listOfFlatComponents.append(tuple(l))
+			entity.listOfFlatComponents.append(tuple(l))
+
+		flat_components[uri] = entity.listOfFlatComponents
+
+
+def sampleProduct(iterables, nb_products, nb_samples, rand):
+	"""Get a random sample of the cartesian product of the given iterables,
+	without computing the full product.
+
+	.. note:: Products are returned in the order of itertools.product().
+
+	:param iterables: List of lists.
+	:param nb_products: Size of the cartesian product.
+	:param nb_samples: Size of the sample (<= nb_products).
+	:param rand: Random number generator.
+	:type iterables: <list <list>>
+	:type nb_products: <int>
+	:type nb_samples: <int>
+	:type rand: <random.Random>
+	:return: Generator of tuples.
+	:rtype: <generator <tuple>>
+	"""
+
+	indexes = set()
+	while len(indexes) < nb_samples:
+		indexes.add(rand.randrange(nb_products))
+
+	# Mixed radix decoding: the last iterable varies the fastest
+	for index in sorted(indexes):
+		product = list()
+		for iterable in reversed(iterables):
+			index, digit = divmod(index, len(iterable))
+			product.append(iterable[digit])
+		yield tuple(reversed(product))
 
 
 def addControllersToReactions(dictReaction, dictControl):
@@ -234,12 +540,6 @@ def numerotateLocations(dictLocation, full_compartment_name=False):
 	:rtype: <dict>
 	"""
 
-	def clean_name(name):
-		"""Clean name for correct cadbiom parsing."""
-
-		return re.sub('([^a-zA-Z0-9_])', '_', name)
-
-
 	idLocationToLocation = {}
 
 	for currentId, location_uri in enumerate(sorted(dictLocation.keys())):
@@ -301,7 +601,8 @@ def getPathwayToPhysicalEntities(dictReaction, dictControl, dictPhysicalEntity):
 	return pathwayToPhysicalEntities
 
 
-def addCadbiomNameToEntities(dictPhysicalEntity, dictLocation):
+def addCadbiomNameToEntities(dictPhysicalEntity, dictLocation, namesCache=None,
+							 entities=None, nodes=None):
 	"""Add 'cadbiomName' and 'listOfCadbiomNames' attributes to entities
 	in dictPhysicalEntity.
 
@@ -313,20 +614,110 @@ def addCadbiomNameToEntities(dictPhysicalEntity, dictLocation):
 		Each member of the list is a unique cadbiom ID of each
 		subcomponent in the attribute 'listOfFlatComponents'.
 
+	.. note:: If a names cache is given and if it was built from the same
+		names, synonyms, locations and types of entities, the names it
+		contains are reused and collisions are not resolved again.
+		Otherwise the cache is (re)written with the new names.
+
+	.. note:: All entities receive a 'cadbiomName', even if they are not
+		in the given entities: unused entities reserve their names,
+		so the names of the others do not depend on the entities
+		expanded.
+
 	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
 		created by the function query.getPhysicalEntities()
 	:param dictLocation: Dictionnary of biopax locations created by
 		query.getLocations().
 		keys: CellularLocationVocabulary uri; values: Location object
+	:param namesCache: (optional) Path of the names cache.
+	:param entities: (optional) Uris of entities whose 'listOfCadbiomNames'
+		is built (ex: getEntitiesUsedInReactions()). All entities by default.
+	:param nodes: (optional) Nodes of the model, updated with the uris of
+		all the names (names in 'listOfCadbiomNames' have priority).
 	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
 		keys: uris; values entity objects
 	:type dictLocation: <dict>
+	:type namesCache: <str>
+	:type entities: <set <str>>
+	:type nodes: <ModelNodes>
 	"""
 
+	cached_names = None
+	if namesCache:
+		digest = naming_digest(dictPhysicalEntity, dictLocation)
+		cached_names = load_names_cache(namesCache, digest)
+
+	if cached_names is not None:
+		LOGGER.info("Names of entities loaded from cache: " + namesCache)
+		for uri, entity in dictPhysicalEntity.iteritems():
+			entity.cadbiomName = cached_names[uri]
+	else:
+		assignCadbiomNames(dictPhysicalEntity, dictLocation)
+
+		if namesCache:
+			save_names_cache(
+				namesCache,
+				digest,
+				{uri: entity.cadbiomName
+					for uri, entity in dictPhysicalEntity.iteritems()}
+			)
+
+	if nodes is not None:
+		nodes.uris.update(
+			(entity.cadbiomName, entity.uri)
+				for entity in dictPhysicalEntity.itervalues()
+		)
+
+	if entities is None:
+		entities = dictPhysicalEntity.iterkeys()
+
+	# Attribution of names for complex/classes with subentities
+	for uri in entities:
+		entity = dictPhysicalEntity[uri]
+		if len(entity.listOfFlatComponents) == 1:
+			# 1 sub component:
+			# listOfCadbiomNames will contain the parent's name
+			entity.listOfCadbiomNames.append(entity.cadbiomName)
+		else:
+			# Many sub components
+			# listOfFlatComponents will contain a list of subcomponent's names
+			for flatComponents in entity.listOfFlatComponents:
+				s = entity.cadbiomName+"_"+ "_".join(
+					[dictPhysicalEntity[subEntity].cadbiomName
+						for subEntity in flatComponents]
+				)
+				entity.listOfCadbiomNames.append(s)
+
+		if nodes is not None:
+			nodes.uris.update(
+				(cadbiomName, entity.uri)
+					for cadbiomName in entity.listOfCadbiomNames
+			)
+
+
+def assignCadbiomNames(dictPhysicalEntity, dictLocation):
+	"""Add a unique 'cadbiomName' attribute to entities in dictPhysicalEntity.
+
+	Entities sharing the same name are renamed with one of their synonyms
+	(see findUniqueCadbiomSynonym()).
+
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param dictLocation: Dictionnary of biopax locations created by
+		query.getLocations().
+		keys: CellularLocationVocabulary uri; values: Location object
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:type dictLocation: <dict>
+	"""
+
+	# Memo of getCadbiomName(), freed after the naming
+	names_memo = dict()
+
 	# Get all names and entities for them
 	entities_cadbiom_names = defaultdict(set)
 	for entity in dictPhysicalEntity.values():
-		cadbiomName = getCadbiomName(entity, dictLocation)
+		cadbiomName = getCadbiomName(entity, dictLocation, memo=names_memo)
 		entities_cadbiom_names[cadbiomName].add(entity)
 
 	# Set of unique cadbiom names (not used more than 1 time)
@@ -335,7 +726,10 @@ def addCadbiomNameToEntities(dictPhysicalEntity, dictLocation):
 			in entities_cadbiom_names.iteritems() if len(entities) == 1}
 
 	# Key: name, value: entities using this name
-	for cadbiom_name, entities in entities_cadbiom_names.iteritems():
+	# PS: Names are taken in sorted order and uris are given sorted;
+	# the same entities always get the same names.
+	for cadbiom_name in sorted(entities_cadbiom_names):
+		entities = entities_cadbiom_names[cadbiom_name]
 		# test findunique directement ici ?
 		if len(entities) == 1:
 			# This name is used only 1 time
@@ -347,73 +741,84 @@ def addCadbiomNameToEntities(dictPhysicalEntity, dictLocation):
 			# Key: uri, value: unique name
 			unique_cadbiom_synonyms = findUniqueCadbiomSynonym(
 				cadbiom_name,
-				{entity.uri for entity in entities},
+				sorted(entity.uri for entity in entities),
 				unique_cadbiom_names,
 				dictPhysicalEntity,
 				dictLocation,
+				names_memo,
 			)
 
 			# Set synonyms found to each entity
 			for entity in entities:
 				entity.cadbiomName = unique_cadbiom_synonyms[entity.uri]
 
-	# Attribution of names for complex/classes with subentities
-	for uri, entity in dictPhysicalEntity.iteritems():
-		if len(entity.listOfFlatComponents) == 1:
-			# 1 sub component:
-			# listOfCadbiomNames will contain the parent's name
-			entity.listOfCadbiomNames.append(entity.cadbiomName)
-		else:
-			# Many sub components
-			# listOfFlatComponents will contain a list of subcomponent's names
-			for flatComponents in entity.listOfFlatComponents:
-				s = entity.cadbiomName+"_"+ "_".join(
-					[dictPhysicalEntity[subEntity].cadbiomName
-						for subEntity in flatComponents]
-				)
-				entity.listOfCadbiomNames.append(s)
-
 
-def findUniqueCadbiomSynonym(cadbiom_name, entity_uris, unique_cadbiom_names, dictPhysicalEntity, dictLocation):
+def findUniqueCadbiomSynonym(cadbiom_name, entity_uris, unique_cadbiom_names, dictPhysicalEntity, dictLocation, memo=None):
 	"""create the dictionnary entityToUniqueSynonym from a
 	set of entity uris having the same cadbiom name.
 
 	.. todo:: COMMENTAIRES !
 
 	:param cadbiom_name: the redundant cadbiom name
-	:param entity_uris: a set set of entity_uris having the same name
+	:param entity_uris: a set (or a sorted list) of entity_uris having
+		the same name
 	:param unique_cadbiom_names: Set of unique cadbiom names already used
 	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
 		created by the function query.getPhysicalEntities()
 	:param dictLocation: Dictionnary of biopax locations created by
 		query.getLocations().
 		keys: CellularLocationVocabulary uri; values: Location object
+	:param memo: (optional) Memo of getCadbiomName().
 	:type cadbiom_name: str
-	:type entity_uris: set
+	:type entity_uris: <set> or <list>
 	:type unique_cadbiom_names: set
 	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
 		keys: uris; values entity objects
 	:type dictLocation: <dict>
+	:type memo: <dict>
 	:returns: entityToUniqueSynonym
 	:rtype: dict
 	"""
 
 	entityToUniqueSynonym = {}
 
+	# Cadbiom names of synonyms don't change between rounds: compute them once
+	# PS: lists preserve the order of insertion in the sets built below
+	entityToSynonyms = {
+		uri: [getCadbiomName(dictPhysicalEntity[uri], dictLocation,
+							 synonym=synonymEntity, memo=memo)
+				for synonymEntity in dictPhysicalEntity[uri].synonyms]
+		for uri in entity_uris
+	}
+
 	while len(entity_uris) != len(entityToUniqueSynonym):
 		entityToUniqueSynonyms = {}
 		for uri in entity_uris:
 			if uri not in entityToUniqueSynonym:
-				entityToUniqueSynonyms[uri] = {
-					getCadbiomName(dictPhysicalEntity[uri], dictLocation, synonym=synonymEntity)
-					for synonymEntity in dictPhysicalEntity[uri].synonyms
-				}
-
-		for uri1, uri2 in it.combinations(entityToUniqueSynonyms.keys(), 2):
-			synonyms1 = copy.copy(entityToUniqueSynonyms[uri1])
-			synonyms2 = copy.copy(entityToUniqueSynonyms[uri2])
-			entityToUniqueSynonyms[uri1] -= synonyms2
-			entityToUniqueSynonyms[uri2] -= synonyms1
+				entityToUniqueSynonyms[uri] = set(entityToSynonyms[uri])
+
+		# Index of owners of each synonym (in the order of keys)
+		synonymToOwners = defaultdict(list)
+		for uri, synonyms in entityToUniqueSynonyms.iteritems():
+			for synonym in synonyms:
+				synonymToOwners[synonym].append(uri)
+
+		# Synonyms shared by several entities are removed.
+		# This is equivalent to the subtraction of synonyms of each pair of
+		# entities taken in the order of keys: owners of a synonym are
+		# removed by consecutive pairs; so if their number is odd,
+		# the last one keeps the synonym.
+		removed_synonyms = defaultdict(set)
+		for synonym, owners in synonymToOwners.iteritems():
+			if len(owners) == 1:
+				continue
+			if len(owners) % 2 == 1:
+				owners = owners[:-1]
+			for uri in owners:
+				removed_synonyms[uri].add(synonym)
+
+		for uri, synonyms in removed_synonyms.iteritems():
+			entityToUniqueSynonyms[uri] -= synonyms
 
 		# Remove cadbiom names already used
 		for uri in entityToUniqueSynonyms:
@@ -438,60 +843,133 @@ def findUniqueCadbiomSynonym(cadbiom_name, entity_uris, unique_cadbiom_names, di
 	return entityToUniqueSynonym
 
 
-def getCadbiomName(entity, dictLocation, synonym=None):
+def getCadbiomName(entity, dictLocation, synonym=None, memo=None):
 	"""Get entity name formatted for Cadbiom.
 
+	.. note:: If a memo is given, names are computed once for all
+		the entities (and synonyms) sharing the same raw name, location
+		and DNA status.
+
 	:param arg1: PhysicalEntity for which the name will be encoded.
 	:param arg2: Dictionnary of biopax locations created by
 		query.getLocations().
 		keys: CellularLocationVocabulary uri; values: Location object
 	:param arg3: (Optional) Synonym that will be used instead of the name
 		of the given entity.
+	:param arg4: (Optional) Memo of names, updated in place.
+		keys: (raw name, cadbiom id of the location, is DNA);
+		values: cadbiom names
 	:type arg1: <PhysicalEntity>
 	:type arg2: <dict>
 	:type arg3: <str>
+	:type arg4: <dict>
 	:return: Encoded name with location if it exists.
 	:rtype: <str>
 	"""
 
-	def clean_name(name):
-		"""Clean name for correct cadbiom parsing."""
-
-		return re.sub('([^a-zA-Z0-9_])', '_', name)
-
-
 	if synonym:
 		name = synonym
 	else:
 		# Check if name is present, otherwise take the uri
 		name = entity.name if entity.name else entity.uri.rsplit("#", 1)[1]
 
-	name = clean_name(name)
+	location_id = dictLocation[entity.location].cadbiomId \
+		if entity.location else None
+	key = (name, location_id, entity.entityType == "Dna")
+
+	if memo is not None:
+		try:
+			return memo[key]
+		except KeyError:
+			pass
+
+	cadbiom_name = clean_name(name)
 
 	# Add location id to the name if it exists
-	if entity.location :
-		name += '_'+dictLocation[entity.location].cadbiomId
+	if location_id is not None:
+		cadbiom_name += '_' + location_id
 
 	# Add '_dna' to the name if the entity is a DNA
-	if entity.entityType == "Dna":
-		name += '_dna'
+	if key[2]:
+		cadbiom_name += '_dna'
+
+	if memo is not None:
+		memo[key] = cadbiom_name
+	return cadbiom_name
+
+
+class PossibilitiesMemo(object):
+	"""Memo tables of getSetOfCadbiomPossibilities() and
+	getListOfPossibilitiesAndCadbiomNames().
 
-	return name
+	Possibilities of an entity only depend on its flat components, its
+	members used and the cadbiom names; so they are computed once per entity
+	and shared by all the reactions and controls that use this entity.
+
+	.. warning:: Possibilities are built from the cadbiom names of entities:
+		the memo must be created after addCadbiomNameToEntities(),
+		and invalidated if names are changed.
+
+	.. warning:: Returned values are shared; they must not be modified.
+	"""
+
+	def __init__(self):
+		# keys: table names; values: dict (keys: uris; values: possibilities)
+		self.tables = defaultdict(dict)
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, table, uri):
+		"""Get the possibilities of the given entity, or None if they are
+		not computed yet."""
+		value = self.tables[table].get(uri)
+		if value is None:
+			self.misses += 1
+		else:
+			self.hits += 1
+		return value
+
+	def set(self, table, uri, value):
+		"""Store the possibilities of the given entity."""
+		self.tables[table][uri] = value
+
+	def invalidate(self):
+		"""Forget all possibilities (ex: after a change of names)."""
+		self.tables.clear()
+		self.hits = 0
+		self.misses = 0
+
+	def log_stats(self, stage):
+		"""Log the hit rate of the memo for the given stage."""
+		lookups = self.hits + self.misses
+		LOGGER.debug(
+			"{}: possibilities memo: {} hits / {} lookups ({:.1%})".format(
+				stage, self.hits, lookups,
+				float(self.hits) / lookups if lookups else 0
+			)
+		)
 
 
-def getSetOfCadbiomPossibilities(entity, dictPhysicalEntity):
+def getSetOfCadbiomPossibilities(entity, dictPhysicalEntity, memo=None):
 	"""
 	set de composants possibles pour 1 complexe
 
 	:param entity: A Physical entity object that is a controller.
 	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
 		created by the function query.getPhysicalEntities()
+	:param memo: (optional) Memo tables of possibilities.
 	:type entity: <PhysicalEntity>
 	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
 		keys: uris; values entity objects
+	:type memo: <PossibilitiesMemo>
 	:return:
 	:rtype: <set>
 	"""
+	if memo is not None:
+		cadbiomPossibilities = memo.get('cadbiom_possibilities', entity.uri)
+		if cadbiomPossibilities is not None:
+			return cadbiomPossibilities
+
 	cadbiomPossibilities = set()
 
 	# TODO: pourquoi ces conditions ??!
@@ -507,15 +985,18 @@ def getSetOfCadbiomPossibilities(entity, dictPhysicalEntity):
 				cadbiomPossibilities |= \
 					getSetOfCadbiomPossibilities(
 						dictPhysicalEntity[subEntity],
-						dictPhysicalEntity
+						dictPhysicalEntity,
+						memo
 					)
 	else:
 		cadbiomPossibilities.add(entity.cadbiomName)
 
+	if memo is not None:
+		memo.set('cadbiom_possibilities', entity.uri, cadbiomPossibilities)
 	return cadbiomPossibilities
 
 
-def get_control_group_condition(controls, dictPhysicalEntity):
+def get_control_group_condition(controls, dictPhysicalEntity, memo=None):
 	"""Get condition for a group of controllers.
 
 	Activators are linked by a logical 'OR',
@@ -527,10 +1008,12 @@ def get_control_group_condition(controls, dictPhysicalEntity):
 	:param controls: Set of Control objects.
 	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
 		created by the function query.getPhysicalEntities()
+	:param memo: (optional) Memo tables of possibilities.
 	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
 		keys: uris; values entity objects
-	:return: Sympy condition.
-	:rtype: <sympy.core.symbol.Symbol>
+	:type memo: <PossibilitiesMemo>
+	:return: Condition (see biopax2cadbiom.conditions).
+	:rtype: <biopax2cadbiom.conditions.Expr>
 	"""
 
 	activators_condition = None
@@ -542,7 +1025,7 @@ def get_control_group_condition(controls, dictPhysicalEntity):
 		if main_condition is None:
 			return child_condition
 		else:
-			return sympy.Or(main_condition, child_condition)
+			return conditions.Or(main_condition, child_condition)
 
 	# set of Control objects for the same reaction
 	for control in controls:
@@ -550,11 +1033,12 @@ def get_control_group_condition(controls, dictPhysicalEntity):
 		possibilities = \
 			getSetOfCadbiomPossibilities(
 				dictPhysicalEntity[control.controller],
-				dictPhysicalEntity
+				dictPhysicalEntity,
+				memo
 			)
 
-		conds = [sympy.Symbol(possibility) for possibility in possibilities]
-		sub_cond = sympy.Or(*conds)
+		conds = [conditions.Symbol(possibility) for possibility in possibilities]
+		sub_cond = conditions.Or(*conds)
 
 		if control.controlType == 'ACTIVATION':
 			activators_condition = \
@@ -571,34 +1055,70 @@ def get_control_group_condition(controls, dictPhysicalEntity):
 	# Glue activators and inhibitors conditions by a logical and
 	# and put a Not for all inhibitors
 	if activators_condition and inhibitors_condition:
-		return sympy.And(activators_condition, sympy.Not(inhibitors_condition))
+		return conditions.And(activators_condition, conditions.Not(inhibitors_condition))
 	elif activators_condition:
 		return activators_condition
 	elif inhibitors_condition:
-		return sympy.Not(inhibitors_condition)
+		return conditions.Not(inhibitors_condition)
 	else:
 		raise AssertionError("You should never have been there!")
 
 
-def addCadbiomSympyCondToReactions(dictReaction, dictPhysicalEntity):
+def numerotateReactions(dictReaction):
+	"""Set the event of each reaction.
+
+	Events are numbered from 1 in the order of the uris of reactions:
+	"_h_<number>"; the same reactions always get the same events,
+	whatever the order of dictReaction.
+
+	:param dictReaction: Dictionnary of biopax reactions,
+		created by the function query.getReactions()
+	:type dictReaction: <dict <str>: <Reaction>>
+		keys: uris; values reaction objects
+	"""
+
+	# Begin event's numeration from 1
+	for event_number, uri in enumerate(sorted(dictReaction), 1):
+		dictReaction[uri].event = "_h_" + str(event_number)
+
+
+def addCadbiomSympyCondToReactions(dictReaction, dictPhysicalEntity, memo=None,
+								   numerotateEvents=True):
 	"""Forge condition for each reaction.
 
+	.. note:: Reactions controlled by the same group of controllers
+		(same controllers with the same types of control) share the same
+		condition; it is built only once.
+
 	:param dictReaction: Dictionnary of biopax reactions,
 		created by the function query.getReactions()
 	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
 		created by the function query.getPhysicalEntities()
+	:param memo: (optional) Memo tables of possibilities;
+		a new one is used by default.
+	:param numerotateEvents: (optional) If True (default), events of
+		reactions are set (see numerotateReactions()).
 	:type dictReaction: <dict <str>: <Reaction>>
 		keys: uris; values reaction objects
 	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
 		keys: uris; values entity objects
+	:type memo: <PossibilitiesMemo>
+	:type numerotateEvents: <bool>
 	"""
 
-	# Begin event's numeration from 1
-	for event_number, (_, reaction) in enumerate(dictReaction.iteritems(), 1):
+	if memo is None:
+		memo = PossibilitiesMemo()
+
+	# Conditions of groups of controllers
+	# keys: frozenset of tuples (controller, controlType); values: conditions
+	group_conditions = dict()
+	nb_controlled_reactions = 0
+
+	for reaction in dictReaction.itervalues():
 
 		if not reaction.controllers:
 			# If no controllers for this reaction we go to the next
-			reaction.cadbiomSympyCond = sympy.sympify(True)
+			reaction.cadbiomSympyCond = conditions.TRUE
 
 		else:
 			# Get all controllers that regulate the same reaction
@@ -606,21 +1126,51 @@ def addCadbiomSympyCondToReactions(dictReaction, dictPhysicalEntity):
 			# Activators are linked by a logical 'OR',
 			# inhibitors are linked by a logical 'OR',
 			# activators and inhibitors are linked together by a logical 'AND'.
-			reaction.cadbiomSympyCond = \
-				get_control_group_condition(
-					reaction.controllers,
-					dictPhysicalEntity
-				)
+			nb_controlled_reactions += 1
+			group = frozenset(
+				(control.controller, control.controlType)
+				for control in reaction.controllers
+			)
+			group_condition = group_conditions.get(group)
+			if group_condition is None:
+				group_condition = \
+					get_control_group_condition(
+						reaction.controllers,
+						dictPhysicalEntity,
+						memo
+					)
+				group_conditions[group] = group_condition
 
-		reaction.event = "_h_" + str(event_number)
+			reaction.cadbiomSympyCond = group_condition
 
+	if numerotateEvents:
+		numerotateReactions(dictReaction)
 
-def getListOfPossibilitiesAndCadbiomNames(entity, dictPhysicalEntity):
+	memo.log_stats("Conditions of reactions")
+	LOGGER.debug(
+		"Conditions of reactions: {} controlled reactions, "
+		"{} groups of controllers, {} unique conditions".format(
+			nb_controlled_reactions,
+			len(group_conditions),
+			len(set(group_conditions.itervalues()))
+		)
+	)
+
+
+def getListOfPossibilitiesAndCadbiomNames(entity, dictPhysicalEntity, memo=None):
 	"""
+	:param memo: (optional) Memo tables of possibilities.
+	:type memo: <PossibilitiesMemo>
 	:return: list of tuples (uris, name)
 	:rtype: <list>
 	"""
 
+	if memo is not None:
+		listOfEquivalentsAndCadbiomName = \
+			memo.get('equivalents_and_names', entity.uri)
+		if listOfEquivalentsAndCadbiomName is not None:
+			return listOfEquivalentsAndCadbiomName
+
 	listOfEquivalentsAndCadbiomName = []
 
 	if len(entity.listOfFlatComponents) != 0:
@@ -636,51 +1186,100 @@ def getListOfPossibilitiesAndCadbiomNames(entity, dictPhysicalEntity):
 				listOfEquivalentsAndCadbiomName.append((tuple([entity.uri]),entity.cadbiomName))
 			else:
 				listOfEquivalentsAndCadbiomName += \
-					getListOfPossibilitiesAndCadbiomNames(dictPhysicalEntity[subEntity], dictPhysicalEntity)
+					getListOfPossibilitiesAndCadbiomNames(dictPhysicalEntity[subEntity], dictPhysicalEntity, memo)
 	else:
 		listOfEquivalentsAndCadbiomName.append((tuple([entity.uri]),entity.cadbiomName))
 
+	if memo is not None:
+		memo.set('equivalents_and_names', entity.uri, listOfEquivalentsAndCadbiomName)
 	return listOfEquivalentsAndCadbiomName
 
 
-def refInCommon(entities1, entities2, dictPhysicalEntity):
-	"""Check common references between 2 sets of entities.
-
-	.. note:: This function is used to make a transition between 2 set of
-		entities. => Is there any transition between these 2 sets ?
+def getEquivalentsBitsets(entityToListOfEquivalentsAndCadbiomName,
+						  dictPhysicalEntity):
+	"""Encode uris and entityRefs of equivalents of entities as bitsets.
 
+	Bits are numbered over the uris and entityRefs met in the given entities
+	(i.e. the local universe of a reaction); so the subset tests between
+	equivalents become bitwise operations (see bitsetsInCommon()).
 
-	:param entities1: List of uris of entities.
-	:param entities2: List of uris of entities.
+	:param entityToListOfEquivalentsAndCadbiomName: Possibilities of each
+		entity (see getListOfPossibilitiesAndCadbiomNames()).
+		keys: uris; values: list of tuples (uris, name)
 	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
 		created by the function query.getPhysicalEntities()
-	:type entities1: <list>
-	:type entities2: <list>
+	:type entityToListOfEquivalentsAndCadbiomName: <dict <str>: <list>>
 	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
 		keys: uris; values entity objects
-	:return: False if a set of entities have no entityRefs or if
-		entityRefs in 1 are not in 2 and if entityRefs in 2 are not in 1.
-		True otherwhise or if entities1 is a subset of entities2,
-		or if entities2 is a subset of entities1.
+	:return: List of tuples (bitset of uris, bitset of entityRefs) for
+		each entity; tuples are in the same order as the possibilities.
+	:rtype: <dict <str>: <list <tuple <int>, <int>>>>
+	"""
+
+	uri_bits = dict()
+	entity_ref_bits = dict()
+	entityToBitsets = dict()
+
+	for entity, equivalents_and_names in \
+		entityToListOfEquivalentsAndCadbiomName.iteritems():
+
+		bitsets = list()
+		for equis, _ in equivalents_and_names:
+			uris = entity_refs = 0
+			for uri in equis:
+				bit = uri_bits.get(uri)
+				if bit is None:
+					bit = uri_bits[uri] = 1 << len(uri_bits)
+				uris |= bit
+
+				entity_ref = dictPhysicalEntity[uri].entityRef
+				if entity_ref is None:
+					continue
+				bit = entity_ref_bits.get(entity_ref)
+				if bit is None:
+					bit = entity_ref_bits[entity_ref] = 1 << len(entity_ref_bits)
+				entity_refs |= bit
+
+			bitsets.append((uris, entity_refs))
+		entityToBitsets[entity] = bitsets
+
+	return entityToBitsets
+
+
+def bitsetsInCommon(bitsets1, bitsets2):
+	"""Check common references between 2 sets of entities encoded as bitsets
+	(built by getEquivalentsBitsets()).
+
+	.. note:: This function is used to make a transition between 2 set of
+		entities. => Is there any transition between these 2 sets ?
+
+	.. note:: See refInCommon() in test/benchmarks.py for the reference
+		implementation on sets of uris.
+
+	:param bitsets1: Tuple (bitset of uris, bitset of entityRefs).
+	:param bitsets2: Tuple (bitset of uris, bitset of entityRefs).
+	:type bitsets1: <tuple <int>, <int>>
+	:type bitsets2: <tuple <int>, <int>>
+	:return: True if a set of entities is a subset of the other,
+		or if entityRefs of a set are a subset of the entityRefs of
+		the other; False otherwise or if a set of entities has
+		no entityRef.
 	:rtype: <bool>
 	"""
 
+	uris1, entity_refs1 = bitsets1
+	uris2, entity_refs2 = bitsets2
+
 	# Check if entities in 1 are in 2, or entities in 2 are in 1
-	if set(entities1) <= set(entities2) or set(entities1) >= set(entities2):
+	common = uris1 & uris2
+	if common == uris1 or common == uris2:
 		return True
 
-	# Get all entityRefs from entities1 (if they are present in these entities)
-	g = (dictPhysicalEntity[entity_uri].entityRef for entity_uri in entities1)
-	entityRefs1 = {entity_ref for entity_ref in g if entity_ref != None}
-
-	# Get all entityRefs from entities2 (if they are present in these entities)
-	g = (dictPhysicalEntity[entity_uri].entityRef for entity_uri in entities2)
-	entityRefs2 = {entity_ref for entity_ref in g if entity_ref != None}
-
-	if len(entityRefs1) == 0 or len(entityRefs2) == 0:
+	if not entity_refs1 or not entity_refs2:
 		return False
-	# Check if entities in 1 are in 2, or entities in 2 are in 1
-	return (entityRefs1 <= entityRefs2) or (entityRefs1 >= entityRefs2)
+	# Check if entityRefs in 1 are in 2, or entityRefs in 2 are in 1
+	common = entity_refs1 & entity_refs2
+	return common == entity_refs1 or common == entity_refs2
 
 
 def getProductCadbioms(entities, entityToListOfEquivalentsAndCadbiomName):
@@ -693,6 +1292,8 @@ def getProductCadbioms(entities, entityToListOfEquivalentsAndCadbiomName):
 		Output:
 		[(u'AP_2_adaptor_complex', 'IL8_CXCR2_v2_integral_to_membrane', u'beta_Arrestin1'), (u'AP_2_adaptor_complex', 'IL8_CXCR2_v2_integral_to_membrane', 'beta_Arrestin2_v1')]
 
+	.. note:: Entities are taken in the order of their uris; sub-events of
+		transitions are numbered in the same order in all conversions.
 	"""
 
 	# Get a list of cadbiom names, for each entity
@@ -700,7 +1301,7 @@ def getProductCadbioms(entities, entityToListOfEquivalentsAndCadbiomName):
 	[cadbiom_names_per_entity.append(
 		# Get all possible names for this entity
 		[name for _, name in entityToListOfEquivalentsAndCadbiomName[uri]]
-	) for uri in entities]
+	) for uri in sorted(entities)]
 
 	return it.product(*cadbiom_names_per_entity)
 
@@ -713,7 +1314,7 @@ def getProductCadbiomsMatched(entities, entityToListOfEquivalentsAndCadbiomName,
 	[cadbiom_names_per_entity.append(
 		# Get all possible names for this entity
 		[name for _, name in entityToListOfEquivalentsAndCadbiomName[uri]]
-	) for uri in entities if entityToEntitiesMatched[uri] != set()]
+	) for uri in sorted(entities) if entityToEntitiesMatched[uri] != set()]
 
 	return it.product(*cadbiom_names_per_entity)
 
@@ -725,9 +1326,49 @@ def getEntityNameUnmatched(entities, entityToEntitiesMatched,
 		if entityToEntitiesMatched[entity] == set()}
 
 
-def updateTransitions(reaction, dictPhysicalEntity, dictTransition):
+def getOtherReactantsConditions(condition, cadbiomNames):
+	"""Get, for each name, the given condition linked by a logical 'AND' to
+	the symbols of all the other names.
+
+	Conjunctions are built with prefixes and suffixes: each symbol is added
+	once to a prefix and once to a suffix, instead of folding all the other
+	symbols for each name.
+
+	.. note:: Same as folding And(condition, Symbol(other)) over
+		set(cadbiomNames) - {name}, since And is flattened and deduplicated.
+
+	:param condition: Condition of the reaction.
+	:param cadbiomNames: Cadbiom names of the reactants (left entities).
+	:type condition: <biopax2cadbiom.conditions.Expr>
+	:type cadbiomNames: <tuple <str>>
+	:return: Conditions of transitions.
+		keys: cadbiom names; values: conditions
+	:rtype: <dict <str>: <biopax2cadbiom.conditions.Expr>>
 	"""
 
+	names = list(set(cadbiomNames))
+	symbols = [conditions.Symbol(name) for name in names]
+
+	# suffixes[i]: conjunction of symbols[i:]
+	suffixes = [conditions.TRUE] * (len(symbols) + 1)
+	for i in range(len(symbols) - 1, -1, -1):
+		suffixes[i] = conditions.And(symbols[i], suffixes[i + 1])
+
+	otherReactantsConditions = dict()
+	# prefix: condition and symbols[:i]
+	prefix = condition
+	for i, name in enumerate(names):
+		otherReactantsConditions[name] = conditions.And(prefix, suffixes[i + 1])
+		prefix = conditions.And(prefix, symbols[i])
+
+	return otherReactantsConditions
+
+
+def updateTransitions(reaction, dictPhysicalEntity, dictTransition, memo=None):
+	"""
+
+	:param memo: (optional) Memo tables of possibilities.
+	:type memo: <PossibilitiesMemo>
 	"""
 
 
@@ -736,11 +1377,7 @@ def updateTransitions(reaction, dictPhysicalEntity, dictTransition):
 		"""
 
 		subDictTransition[(left_entity, right_entity)].append(
-			{
-				'event': event,
-				'reaction': reaction.uri,
-				'sympyCond': cond,
-			}
+			Transition(event, reaction.uri, cond)
 		)
 
 
@@ -750,15 +1387,22 @@ def updateTransitions(reaction, dictPhysicalEntity, dictTransition):
 	entityToListOfEquivalentsAndCadbiomName = {}
 	for entity in leftEntities|rightEntities:
 		entityToListOfEquivalentsAndCadbiomName[entity] = \
-			getListOfPossibilitiesAndCadbiomNames(dictPhysicalEntity[entity], dictPhysicalEntity)
+			getListOfPossibilitiesAndCadbiomNames(dictPhysicalEntity[entity], dictPhysicalEntity, memo)
+
+	# Uris and entityRefs of equivalents, encoded once for all pairs
+	entityToBitsets = getEquivalentsBitsets(
+		entityToListOfEquivalentsAndCadbiomName, dictPhysicalEntity
+	)
 
 	cadbiomToCadbiomsMatched = defaultdict(set)
 	entityToEntitiesMatched = defaultdict(set)
 	match = False
 	for entity1, entity2 in it.combinations(entityToListOfEquivalentsAndCadbiomName.keys(),2):
-		for equis1,cadbiom1 in entityToListOfEquivalentsAndCadbiomName[entity1]:
-			for equis2,cadbiom2 in entityToListOfEquivalentsAndCadbiomName[entity2]:
-				if refInCommon(equis1, equis2, dictPhysicalEntity):
+		for (_, cadbiom1), bitsets1 in it.izip(
+			entityToListOfEquivalentsAndCadbiomName[entity1], entityToBitsets[entity1]):
+			for (_, cadbiom2), bitsets2 in it.izip(
+				entityToListOfEquivalentsAndCadbiomName[entity2], entityToBitsets[entity2]):
+				if bitsetsInCommon(bitsets1, bitsets2):
 					cadbiomToCadbiomsMatched[cadbiom1].add(cadbiom2)
 					cadbiomToCadbiomsMatched[cadbiom2].add(cadbiom1)
 					entityToEntitiesMatched[entity1].add(entity2)
@@ -776,23 +1420,25 @@ def updateTransitions(reaction, dictPhysicalEntity, dictTransition):
 
 	if not match or not presenceOfMembers:
 		for productCadbiomsL in getProductCadbioms(leftEntities, entityToListOfEquivalentsAndCadbiomName):
+			# Conditions with the other left entities, for each left entity
+			otherReactantsConditions = getOtherReactantsConditions(
+				reaction.cadbiomSympyCond, productCadbiomsL
+			)
 			for productCadbiomsR in getProductCadbioms(rightEntities, entityToListOfEquivalentsAndCadbiomName):
+				# The event is shared by the transitions of the products
+				event = reaction.event + "_" + str(subH)
 				for cadbiomL, cadbiomR in it.product(productCadbiomsL,productCadbiomsR):
-					transitionSympyCond = reaction.cadbiomSympyCond
-					for otherCadbiomL in set(productCadbiomsL)-set([cadbiomL]):
-						sympySymbol = sympy.Symbol(otherCadbiomL)
-						transitionSympyCond = sympy.And(transitionSympyCond, sympySymbol)
-
 					update_subtransitions(
-						cadbiomL, cadbiomR,
-						reaction.event + "_" + str(subH),
-						transitionSympyCond,
+						cadbiomL, cadbiomR, event,
+						otherReactantsConditions[cadbiomL],
 					)
 
 				subH += 1
 
 	else:
 		for productCadbiomsL in getProductCadbiomsMatched(leftEntities, entityToListOfEquivalentsAndCadbiomName, entityToEntitiesMatched):
+			# Built on the first valid transition of this left product
+			otherReactantsConditions = None
 			for productCadbiomsR in getProductCadbiomsMatched(rightEntities, entityToListOfEquivalentsAndCadbiomName, entityToEntitiesMatched):
 
 				isValidTransition = True
@@ -807,20 +1453,22 @@ def updateTransitions(reaction, dictPhysicalEntity, dictTransition):
 				if isValidTransition:
 					cadbiomsR = set(productCadbiomsR)|getEntityNameUnmatched(rightEntities, entityToEntitiesMatched, dictPhysicalEntity)
 
-					for cadbiomL, cadbiomR in it.product(productCadbiomsL,cadbiomsR):
-						transitionSympyCond = reaction.cadbiomSympyCond
-						for otherCadbiomL in set(productCadbiomsL)-set([cadbiomL]):
-							sympySymbol = sympy.Symbol(otherCadbiomL)
-							transitionSympyCond = sympy.And(transitionSympyCond, sympySymbol)
+					if otherReactantsConditions is None:
+						# Conditions with the other left entities,
+						# for each left entity
+						otherReactantsConditions = getOtherReactantsConditions(
+							reaction.cadbiomSympyCond, productCadbiomsL
+						)
 
+					event = reaction.event + "_" + str(subH)
+					for cadbiomL, cadbiomR in it.product(productCadbiomsL,cadbiomsR):
 						update_subtransitions(
-							cadbiomL, cadbiomR,
-							reaction.event + "_" + str(subH),
-							transitionSympyCond,
+							cadbiomL, cadbiomR, event,
+							otherReactantsConditions[cadbiomL],
 						)
 					subH += 1
 
-		for entityR in rightEntities:
+		for entityR in sorted(rightEntities):
 			if entityToEntitiesMatched[entityR] == set():
 				nameEntityR = dictPhysicalEntity[entityR].cadbiomName
 				for subEquis,subCadbiom in entityToListOfEquivalentsAndCadbiomName[entityR]:
@@ -834,40 +1482,345 @@ def updateTransitions(reaction, dictPhysicalEntity, dictTransition):
 					subH += 1
 
 		currentKeys = list(subDictTransition.keys())
+		# Conditions of transitions with their left entity; they don't
+		# depend on the unmatched left entity, so they are built only once
+		# keys: (left entity, condition); values: conditions
+		leftConditions = dict()
 		for entityL in leftEntities:
 			if entityToEntitiesMatched[entityL] == set():
 				for equisL,cadbiomL in entityToListOfEquivalentsAndCadbiomName[entityL]:
 					for left,right in currentKeys:
 						for transition in subDictTransition[(left,right)]:
-							transitionSympyCond = transition['sympyCond']
-							sympySymbol = sympy.Symbol(left)
-							transitionSympyCond = sympy.And(transitionSympyCond, sympySymbol)
+							key = (left, transition.sympyCond)
+							transitionSympyCond = leftConditions.get(key)
+							if transitionSympyCond is None:
+								transitionSympyCond = conditions.And(
+									transition.sympyCond,
+									conditions.Symbol(left)
+								)
+								leftConditions[key] = transitionSympyCond
 
 							update_subtransitions(
 								cadbiomL, right,
-								transition['event'],
+								transition.event,
 								transitionSympyCond,
 							)
 
+	if subH <= 2:
+		# Only 1 sub-event: transitions take the event of the reaction
+		for transitions in subDictTransition.itervalues():
+			for transition in transitions:
+				transition.event = reaction.event
+
+	# Transitions are added as they are (no copy)
 	for left_right, transitions in subDictTransition.iteritems():
-		for transition in transitions:
-			if subH > 2:
-				event = transition['event']
-			else:
-				event = reaction.event
+		dictTransition[left_right].extend(transitions)
+
+
+class ModelNodes(object):
+	"""Nodes of the cadbiom model, collected while names of entities and
+	transitions are created (see createCadbiomFile()).
+
+		Attributes:
+			names	=> names of the nodes in transitions and in their
+						conditions
+			uris	=> uri of each cadbiom name
+						keys: cadbiom names; values: uris
+
+	.. note:: Atoms of a condition shared by several transitions are
+		collected only once.
+	"""
+
+	def __init__(self):
+		self.names = set()
+		self.uris = dict()
+		# Conditions whose atoms are already in names
+		self.conditions = set()
+
+	def add_transition(self, left_right, condition):
+		"""Add the nodes of a transition (ori/ext nodes and atoms of its
+		condition)."""
+		self.names.update(left_right)
+		if condition not in self.conditions:
+			self.conditions.add(condition)
+			self.names.update(str(atom) for atom in condition.atoms())
+
+
+class TransitionsRecorder(object):
+	"""Replacement of dictTransition for updateTransitions() that records
+	the transitions in the order they are added.
+
+	Transitions can then be added to dictTransition in the same order
+	(see addRecordedTransitions()).
+	"""
+
+	def __init__(self):
+		# List of tuples (ori/ext nodes, transition)
+		self.transitions = list()
+
+	def __getitem__(self, left_right):
+		return RecordedTransitions(self.transitions, left_right)
+
+
+class RecordedTransitions(object):
+	"""Transitions of a couple of ori/ext nodes in a TransitionsRecorder."""
+
+	def __init__(self, transitions, left_right):
+		self.transitions = transitions
+		self.left_right = left_right
+
+	def append(self, transition):
+		self.transitions.append((self.left_right, transition))
+
+	def extend(self, transitions):
+		left_right = self.left_right
+		self.transitions.extend(
+			(left_right, transition) for transition in transitions
+		)
+
+
+def addRecordedTransitions(dictTransition, recorded_transitions, nodes=None):
+	"""Add transitions recorded by a TransitionsRecorder to the store of
+	transitions, and their nodes to the nodes of the model.
+
+	:param dictTransition: Store of transitions
+		(see :mod:`biopax2cadbiom.transition_store`).
+	:param recorded_transitions: List of tuples (ori/ext nodes, transition).
+	:param nodes: (optional) Nodes of the model.
+	:type dictTransition: <MemoryTransitionStore> or <SQLiteTransitionStore>
+	:type recorded_transitions: <list <tuple <tuple <str>, <str>>, <Transition>>>
+	:type nodes: <ModelNodes>
+	"""
+	for left_right, transition in recorded_transitions:
+		dictTransition.add(left_right, transition)
+		if nodes is not None:
+			nodes.add_transition(left_right, transition.sympyCond)
+
+
+def transitionsWorker(reaction_uris):
+	"""Compute transitions of the given reactions in a process of the pool
+	of getTransitionsInParallel().
+
+	:param reaction_uris: Uris of reactions handled by updateTransitions().
+	:type reaction_uris: <list <str>>
+	:return: List of tuples (reaction uri, recorded transitions).
+	:rtype: <list <tuple <str>, <list>>>
+	"""
+
+	dictReaction, dictPhysicalEntity, memo = TRANSITIONS_CONTEXT
+
+	reactions_transitions = list()
+	for reaction_uri in reaction_uris:
+		recorder = TransitionsRecorder()
+		updateTransitions(
+			dictReaction[reaction_uri], dictPhysicalEntity, recorder, memo
+		)
+		reactions_transitions.append((reaction_uri, recorder.transitions))
+	return reactions_transitions
+
+
+def getTransitionsInParallel(reaction_uris, dictReaction, dictPhysicalEntity,
+							 memo, workers, dictTransition, nodes=None):
+	"""Compute transitions of the given reactions with a pool of processes.
+
+	Entities, reactions and the memo of possibilities are inherited by the
+	processes at their creation (fork); they are never sent to them.
+	Only uris of reactions and the transitions are exchanged.
+
+	Transitions are added to the store as soon as the processes return
+	them; so they are never all kept in the main process.
+
+	.. note:: Reactions are read-only for updateTransitions(): they can be
+		handled in any order. Transitions are added in the order of the
+		results; the writers sort the events of transitions and their
+		reactions, so the model is the same as with 1 process.
+
+	:param reaction_uris: Uris of reactions handled by updateTransitions().
+	:param dictReaction: Dictionnary of biopax reactions,
+		created by the function query.getReactions()
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param memo: Memo tables of possibilities.
+	:param workers: Number of processes.
+	:type reaction_uris: <list <str>>
+	:type dictReaction: <dict <str>: <Reaction>>
+		keys: uris; values reaction objects
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:param dictTransition: Store of transitions
+		(see :mod:`biopax2cadbiom.transition_store`).
+	:param nodes: (optional) Nodes of the model, updated with the nodes of
+		transitions.
+	:type memo: <PossibilitiesMemo>
+	:type workers: <int>
+	:type dictTransition: <MemoryTransitionStore> or <SQLiteTransitionStore>
+	:type nodes: <ModelNodes>
+	"""
+
+	global TRANSITIONS_CONTEXT
+
+	# Small chunks balance the load between processes
+	chunk_size = max(1, len(reaction_uris) // (workers * 8))
+	chunks = [reaction_uris[i:i + chunk_size]
+				for i in range(0, len(reaction_uris), chunk_size)]
+
+	TRANSITIONS_CONTEXT = (dictReaction, dictPhysicalEntity, memo)
+	pool = mp.Pool(workers)
+	try:
+		for chunk_transitions in pool.imap_unordered(transitionsWorker, chunks):
+			for _, recorded_transitions in chunk_transitions:
+				addRecordedTransitions(
+					dictTransition, recorded_transitions, nodes
+				)
+		pool.close()
+	except:
+		pool.terminate()
+		raise
+	finally:
+		pool.join()
+		TRANSITIONS_CONTEXT = None
+
+	LOGGER.info("Transitions of {} reactions computed by {} processes".format(
+		len(reaction_uris), workers
+	))
+
+
+def shardWorker(shard_index):
+	"""Compute conditions and transitions of the reactions of a shard.
+
+	dictReaction and dictPhysicalEntity are restricted to the reactions and
+	entities of the shard: the other objects inherited from the main process
+	are never accessed (their memory pages are not copied).
+
+	:param shard_index: Index of the shard in SHARDS_CONTEXT.
+	:type shard_index: <int>
+	:return: Tuple of conditions of reactions (keys: reaction uris;
+		values: conditions), and list of tuples (reaction uri, recorded
+		transitions) for the reactions handled by updateTransitions().
+	:rtype: <tuple <dict>, <list>>
+	"""
+
+	all_reactions, all_entities, shards = SHARDS_CONTEXT
+	reaction_uris, entity_uris = shards[shard_index]
+	dictReaction = {uri: all_reactions[uri] for uri in reaction_uris}
+	dictPhysicalEntity = {uri: all_entities[uri] for uri in entity_uris}
+
+	memo = PossibilitiesMemo()
+	addCadbiomSympyCondToReactions(
+		dictReaction, dictPhysicalEntity, memo, numerotateEvents=False
+	)
+
+	reactions_conditions = dict()
+	reactions_transitions = list()
+	for reaction_uri, reaction in dictReaction.iteritems():
+		reactions_conditions[reaction_uri] = reaction.cadbiomSympyCond
+
+		if reaction.reactiontype in TRANSITION_REACTION_TYPES:
+			recorder = TransitionsRecorder()
+			updateTransitions(reaction, dictPhysicalEntity, recorder, memo)
+			reactions_transitions.append((reaction_uri, recorder.transitions))
+
+	return reactions_conditions, reactions_transitions
+
+
+def getShardedConditionsAndTransitions(dictReaction, dictPhysicalEntity,
+									   dictTransition, workers=1, nodes=None):
+	"""Compute conditions and transitions of reactions, connected component
+	by connected component.
+
+	Connected components of the graph of reactions and entities are packed
+	into shards (see :mod:`biopax2cadbiom.sharding`); each shard is handled
+	by a process of a pool that only accesses its reactions and entities
+	(they are inherited at fork; only the results are sent back).
+	Names of entities and events of reactions are set globally before;
+	so they are consistent between shards.
+
+	.. note:: Conditions are set on reactions; transitions of shards are added
+		to the store as soon as they are returned. The other transitions
+		are added by getTransitions() (see its parameter
+		computed_reactions).
+
+	:param dictReaction: Dictionnary of biopax reactions,
+		created by the function query.getReactions()
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param dictTransition: Store of transitions
+		(see :mod:`biopax2cadbiom.transition_store`).
+	:param workers: (optional) Number of processes; 1 by default
+		(shards are then handled by the current process).
+	:param nodes: (optional) Nodes of the model, updated with the nodes of
+		transitions.
+	:type dictReaction: <dict <str>: <Reaction>>
+		keys: uris; values reaction objects
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:type dictTransition: <MemoryTransitionStore> or <SQLiteTransitionStore>
+	:type workers: <int>
+	:type nodes: <ModelNodes>
+	:return: Uris of reactions whose transitions are added to the store.
+	:rtype: <set <str>>
+	"""
+
+	global SHARDS_CONTEXT
+
+	numerotateReactions(dictReaction)
+
+	shards = packComponents(
+		getConnectedComponents(dictReaction, dictPhysicalEntity),
+		workers * 4
+	)
+
+	def add_results(results):
+		"""Set conditions of reactions and add transitions of the shards
+		as soon as they are computed"""
+		for reactions_conditions, shard_transitions in results:
+			for reaction_uri, condition in reactions_conditions.iteritems():
+				dictReaction[reaction_uri].cadbiomSympyCond = condition
+			for reaction_uri, recorded_transitions in shard_transitions:
+				addRecordedTransitions(
+					dictTransition, recorded_transitions, nodes
+				)
+				computed_reactions.add(reaction_uri)
+
+	computed_reactions = set()
+	SHARDS_CONTEXT = (dictReaction, dictPhysicalEntity, shards)
+	try:
+		if workers > 1:
+			pool = mp.Pool(workers)
+			try:
+				add_results(
+					pool.imap_unordered(shardWorker, range(len(shards)))
+				)
+				pool.close()
+			except:
+				pool.terminate()
+				raise
+			finally:
+				pool.join()
+		else:
+			add_results(shardWorker(index) for index in range(len(shards)))
+	finally:
+		SHARDS_CONTEXT = None
 
-			dictTransition[left_right].append({
-				'event': event,
-				'reaction': reaction.uri,
-				'sympyCond': transition['sympyCond']
-			})
+	return computed_reactions
 
 
-def getTransitions(dictReaction, dictPhysicalEntity):
+def getTransitions(dictReaction, dictPhysicalEntity, memo=None, workers=1,
+				   computed_reactions=None, nodes=None, store=None):
 	"""Return transitions with (ori/ext nodes) and their respective events.
 
 	.. warning:: dictPhysicalEntity is modified in place.
-		We add "virtual nodes" for genes that are not in BioPAX format.
+		We add "virtual nodes" for genes that are not in BioPAX format
+		(GeneEntity objects, 1 per entity produced, added for each uri of
+		TemplateReaction).
+
+	.. note:: With more than 1 worker, transitions of reactions handled by
+		updateTransitions() are computed by a pool of processes
+		(see getTransitionsInParallel()); other reactions (degradations,
+		transcriptions) are handled in the main process.
+		Transitions are added to the store in the order the processes
+		return them; the writers sort them, so the model is the same as
+		with 1 worker.
 
 	.. todo:: handle TRASH nodes => will crash cadbiom writer because
 		they are not entities...
@@ -876,50 +1829,97 @@ def getTransitions(dictReaction, dictPhysicalEntity):
 		created by the function query.getReactions()
 	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
 		created by the function query.getPhysicalEntities()
+	:param memo: (optional) Memo tables of possibilities;
+		a new one is used by default.
+	:param workers: (optional) Number of processes used to compute
+		transitions; 1 by default.
+	:param computed_reactions: (optional) Uris of reactions whose
+		transitions are already in the store
+		(see getShardedConditionsAndTransitions()); workers are not used
+		if they are given.
+	:param nodes: (optional) Nodes of the model, updated with the nodes of
+		transitions and with the names of genes.
+	:param store: (optional) Store of the transitions
+		(see :mod:`biopax2cadbiom.transition_store`); transitions are kept
+		in memory by default.
 	:type dictReaction: <dict <str>: <Reaction>>
 		keys: uris; values reaction objects
 	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
 		keys: uris; values entity objects
-	:return: Dictionnary of transitions and their respective set of events.
+	:type memo: <PossibilitiesMemo>
+	:type workers: <int>
+	:type computed_reactions: <set <str>>
+	:type nodes: <ModelNodes>
+	:type store: <MemoryTransitionStore> or <SQLiteTransitionStore>
+	:return: Dictionnary (store) of transitions and their respective set
+		of events.
 		.. example::
-			subDictTransition[(cadbiomL,right)].append({
-				'event': transition['event'],
-				'reaction': reaction,
-				'sympyCond': transitionSympyCond
-			}
-	:rtype: <dict <tuple <str>, <str>>: <list <dict>>>
+			dictTransition[(cadbiomL,right)].append(
+				Transition(event, reaction.uri, transitionSympyCond)
+			)
+	:rtype: <MemoryTransitionStore> or <SQLiteTransitionStore>
 	"""
 
+	def add_transition(left_right, transition):
+		"""Add a transition to dictTransition and its nodes to nodes"""
+		dictTransition.add(left_right, transition)
+		if nodes is not None:
+			nodes.add_transition(left_right, transition.sympyCond)
+
 	def update_transitions(left_entity, right_entity, reaction):
 		""".. todo: Move this function and reuse it elsewhere.
 		"""
 
-		dictTransition[(left_entity, right_entity)].append(
-			{
-				'event': reaction.event,
-				'reaction': reaction.uri,
-				'sympyCond': reaction.cadbiomSympyCond
-			}
+		add_transition(
+			(left_entity, right_entity),
+			Transition(
+				reaction.event, reaction.uri, reaction.cadbiomSympyCond
+			)
 		)
 
 
-	dictTransition = defaultdict(list)
+	if memo is None:
+		memo = PossibilitiesMemo()
+
+	dictTransition = MemoryTransitionStore() if store is None else store
+	# Genes of entities produced by TemplateReactions
+	# keys: uris of products; values: GeneEntity objects
+	genes = dict()
 
-	reaction_types = ("BiochemicalReaction", "ComplexAssembly", "Transport",
-			"TransportWithBiochemicalReaction")
+	reaction_types = TRANSITION_REACTION_TYPES
 	regulator_types = ("Catalysis", "Control", "TemplateReactionRegulation")
 
-	for reaction_uri, reaction in dictReaction.iteritems():
+	# Transitions computed by a pool of processes are added to the store
+	if computed_reactions is None:
+		computed_reactions = set()
+		if workers > 1:
+			computed_reactions = [
+				reaction_uri for reaction_uri, reaction in dictReaction.iteritems()
+					if reaction.reactiontype in reaction_types
+			]
+			getTransitionsInParallel(
+				computed_reactions, dictReaction, dictPhysicalEntity, memo,
+				workers, dictTransition, nodes
+			)
+			computed_reactions = set(computed_reactions)
 
+	# Reactions are taken in the order of their uris: the transitions and
+	# the genes (uri of their first reaction) are the same in all conversions
+	for reaction_uri in sorted(dictReaction):
+
+		reaction = dictReaction[reaction_uri]
 		typeName = reaction.reactiontype
 
 		if typeName in reaction_types:
+			if reaction_uri in computed_reactions:
+				# Transitions already in the store
+				continue
+
 			# ATTENTION: que faire si 'leftComponents'
 			# ou bien 'rightComponents' sont vides ?
-			# /!\ This modifies dictTransition in place
-			updateTransitions(
-				reaction, dictPhysicalEntity, dictTransition
-			)
+			recorder = TransitionsRecorder()
+			updateTransitions(reaction, dictPhysicalEntity, recorder, memo)
+			addRecordedTransitions(dictTransition, recorder.transitions, nodes)
 
 		elif typeName == "Degradation":
 			# Reaction of degradation = Suppression of entities
@@ -949,10 +1949,19 @@ def getTransitions(dictReaction, dictPhysicalEntity):
 			else:
 				# Update dictPhysicalEntity with entities corresponding to genes
 				# PS: These entities are not in BioPAX formalisation
+				# PS: The gene is shared by all reactions of the same product
 				cadbiomR = dictPhysicalEntity[entityR]
-				cadbiomL = copy.deepcopy(cadbiomR)
-				cadbiomL.cadbiomName += '_gene'
-				cadbiomL.uri = reaction_uri
+				cadbiomL = genes.get(entityR)
+				if cadbiomL is None:
+					cadbiomL = GeneEntity(
+						reaction_uri, entityR, cadbiomR.cadbiomName + '_gene'
+					)
+					genes[entityR] = cadbiomL
+					if nodes is not None:
+						# Names of entities have priority
+						nodes.uris.setdefault(
+							cadbiomL.cadbiomName, cadbiomL.uri
+						)
 				# /!\ This modifies dictPhysicalEntity in place
 				dictPhysicalEntity[reaction_uri] = cadbiomL
 
@@ -968,9 +1977,341 @@ def getTransitions(dictReaction, dictPhysicalEntity):
 			LOGGER.error("UNEXCEPTED REACTION: " + reaction_uri)
 			raise AssertionError("UNEXCEPTED REACTION: " + reaction_uri)
 
+	memo.log_stats("Transitions")
 	return dictTransition
 
 
+def estimateCadbiomNames(entity_uri, dictPhysicalEntity, flat_estimates,
+						 names_estimates):
+	"""Get the number of cadbiom names of the given entity, without computing
+	them.
+
+	.. note:: This is the number of items that would be returned by
+		getListOfPossibilitiesAndCadbiomNames().
+
+	:param entity_uri: Uri of an entity.
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param flat_estimates: Numbers of flat components already computed
+		for complexes (see estimateFlatComponents()).
+		This dict is updated in place.
+	:param names_estimates: Numbers of names already computed.
+		This dict is updated in place.
+	:type entity_uri: <str>
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:type flat_estimates: <dict <str>: <int>>
+	:type names_estimates: <dict <str>: <int>>
+	:return: Number of cadbiom names.
+	:rtype: <int>
+	"""
+
+	if entity_uri in names_estimates:
+		return names_estimates[entity_uri]
+
+	entity = dictPhysicalEntity[entity_uri]
+	nb_names = 0
+	if entity.entityType == "Complex":
+		nb_names = estimateFlatComponents(
+			entity_uri, dictPhysicalEntity, flat_estimates
+		)
+
+	# Complexes without flat components (classes of complexes) are
+	# expanded to their members like the other entities
+	if nb_names == 0 and len(entity.membersUsed) > 0:
+		# Cycles in members are counted once
+		names_estimates[entity_uri] = 1
+		nb_names = sum(
+			1 if sub_entity == entity_uri else \
+			estimateCadbiomNames(sub_entity, dictPhysicalEntity,
+								 flat_estimates, names_estimates)
+			for sub_entity in entity.membersUsed
+		)
+
+	elif nb_names == 0:
+		nb_names = 1
+
+	names_estimates[entity_uri] = nb_names
+	return nb_names
+
+
+def estimateTransitions(reaction, dictPhysicalEntity, flat_estimates,
+						names_estimates):
+	"""Get the number of transitions of the given reaction, without
+	computing them.
+
+	.. note:: The number is exact for reactions without classes or complexes
+		with several possible names. Otherwise, it is an upper bound of the
+		number of transitions computed by updateTransitions().
+
+	:param reaction: Reaction object.
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param flat_estimates: See estimateCadbiomNames().
+	:param names_estimates: See estimateCadbiomNames().
+	:type reaction: <Reaction>
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:type flat_estimates: <dict <str>: <int>>
+	:type names_estimates: <dict <str>: <int>>
+	:return: Tuple: number of transitions, True if this number is exact.
+	:rtype: <tuple <int>, <bool>>
+	"""
+
+	if reaction.reactiontype == "TemplateReaction":
+		return int(reaction.productComponent is not None), True
+
+	if reaction.reactiontype == "Degradation":
+		return len(reaction.leftComponents), True
+
+	if reaction.reactiontype not in TRANSITION_REACTION_TYPES:
+		return 0, True
+
+	def nb_names(entity_uri):
+		return estimateCadbiomNames(
+			entity_uri, dictPhysicalEntity, flat_estimates, names_estimates
+		)
+
+	names_left = [nb_names(uri) for uri in reaction.leftComponents]
+	names_right = [nb_names(uri) for uri in reaction.rightComponents]
+	products = reduce(lambda x, y: x * y, names_left + names_right, 1)
+
+	# All products of names on the left and on the right sides;
+	# 1 transition for each pair of entities.
+	nb_transitions = products * len(names_left) * len(names_right)
+	if products == 1:
+		return nb_transitions, True
+
+	# Matched entities: transitions for unmatched entities are added
+	# on the right side, then duplicated for each name on the left side
+	nb_transitions += sum(names_right)
+	nb_transitions *= 1 + sum(names_left)
+	return nb_transitions, False
+
+
+def getConversionEstimates(dictReaction, dictPhysicalEntity, entities=None):
+	"""Estimate the size of the combinatorial stages of the conversion
+	without materializing them.
+
+	.. note:: Only 'reactions' and 'membersUsed' attributes of entities are
+		needed (see addReactionToEntities() and detectMembersUsedInEntities()).
+
+	:param dictReaction: Dictionnary of biopax reactions,
+		created by the function query.getReactions()
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param entities: (optional) Uris of entities that would be converted
+		(see getEntitiesUsedInReactions()). All entities by default.
+	:type dictReaction: <dict <str>: <Reaction>>
+		keys: uris; values reaction objects
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:type entities: <set <str>>
+	:return: Dictionnary with 3 keys:
+		- 'flatComponents': number of flat components per complex,
+		- 'cadbiomNames': number of cadbiom names per entity,
+		- 'transitions': tuple (number of transitions, exact or not)
+		per reaction.
+	:rtype: <dict <str>: <dict>>
+	"""
+
+	if entities is None:
+		entities = dictPhysicalEntity.viewkeys()
+
+	flat_estimates = dict()
+	names_estimates = dict()
+	[estimateCadbiomNames(uri, dictPhysicalEntity, flat_estimates,
+						  names_estimates)
+		for uri in entities]
+
+	transitions = {
+		uri: estimateTransitions(reaction, dictPhysicalEntity, flat_estimates,
+								 names_estimates)
+		for uri, reaction in dictReaction.iteritems()
+	}
+
+	return {
+		'flatComponents': flat_estimates,
+		'cadbiomNames': names_estimates,
+		'transitions': transitions,
+	}
+
+
+def printConversionEstimates(estimates, top=10):
+	"""Print totals and top offenders of the given estimates.
+
+	:param estimates: Dictionnary returned by getConversionEstimates().
+	:param top: (optional) Number of offenders printed for each category.
+	:type estimates: <dict <str>: <dict>>
+	:type top: <int>
+	"""
+
+	flat_components = estimates['flatComponents']
+	cadbiom_names = estimates['cadbiomNames']
+	transitions = estimates['transitions']
+
+	print("Complexes: {}; flat components: {}".format(
+		len(flat_components), sum(flat_components.itervalues())
+	))
+	print("Entities: {}; cadbiom names: {}".format(
+		len(cadbiom_names), sum(cadbiom_names.itervalues())
+	))
+	print("Reactions: {}; transitions: {} (upper bound; exact for {} "
+		  "reactions)".format(
+		len(transitions),
+		sum(nb for nb, _ in transitions.itervalues()),
+		sum(exact for _, exact in transitions.itervalues()),
+	))
+
+	def print_top(title, items):
+		print("\nTop {} {}:".format(top, title))
+		for uri, nb in sorted(items, key=lambda item: (-item[1], item[0]))[:top]:
+			print("{:>20} {}".format(nb, uri))
+
+	print_top("complexes (flat components)", flat_components.iteritems())
+	print_top("entities (cadbiom names)", cadbiom_names.iteritems())
+	print_top("reactions (transitions)",
+			  ((uri, nb) for uri, (nb, _) in transitions.iteritems()))
+
+
+def getSeedsNeighbourhood(seeds, radius, dictPhysicalEntity, dictReaction,
+						  dictControl):
+	"""Get the entities, reactions and controls at most 'radius' reactions
+	away from the given seed entities.
+
+	The neighbourhood is built by a bounded breadth-first search:
+	at each step, the reactions involving the entities of the frontier
+	(as participants or controllers) are added, with all their participants
+	and controllers.
+	Complexes and classes containing an entity (recursively) are reached
+	at the same step as this entity.
+
+	.. note:: Members and components of the entities reached are kept
+		(recursively) because they are needed to develop these entities;
+		they do not extend the search.
+
+	.. note:: Seeds are uris, names or synonyms of entities.
+		All the entities matching a seed are used (ex: the same protein
+		in different locations).
+
+	:param seeds: Uris, names or synonyms of seed entities.
+	:param radius: Maximum number of reactions between the seeds and the
+		entities kept.
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param dictReaction: Dictionnary of biopax reactions,
+		created by the function query.getReactions()
+	:param dictControl: Dictionnary of biopax controls,
+		created by the function query.getControls()
+	:type seeds: <list <str>>
+	:type radius: <int>
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:type dictReaction: <dict <str>: <Reaction>>
+		keys: uris; values reaction objects
+	:type dictControl: <dict <str>: <Control>>
+		keys: uris; values control objects
+	:return: Tuple of dictPhysicalEntity, dictReaction and dictControl
+		restricted to the neighbourhood.
+	:rtype: <tuple <dict>, <dict>, <dict>>
+	"""
+
+	def get_participants(reaction):
+		participants = reaction.leftComponents | reaction.rightComponents
+		if reaction.productComponent is not None:
+			participants.add(reaction.productComponent)
+		if reaction.participantComponent is not None:
+			participants.add(reaction.participantComponent)
+		return participants
+
+	def get_ancestors(uris):
+		ancestors = set(uris)
+		stack = list(uris)
+		while stack:
+			for parent in parents[stack.pop()]:
+				if parent not in ancestors:
+					ancestors.add(parent)
+					stack.append(parent)
+		return ancestors
+
+	# Seeds
+	seeds = set(seeds)
+	seed_uris = set()
+	seeds_found = set()
+	for uri, entity in dictPhysicalEntity.iteritems():
+		matches = seeds & (entity.synonyms | {uri, entity.name})
+		if matches:
+			seed_uris.add(uri)
+			seeds_found |= matches
+
+	for seed in seeds - seeds_found:
+		LOGGER.warning("Seed not found: " + seed)
+
+	# Reactions of entities, controllers of reactions, parents of entities
+	entity_reactions = defaultdict(set)
+	for reaction_uri, reaction in dictReaction.iteritems():
+		for entity_uri in get_participants(reaction):
+			entity_reactions[entity_uri].add(reaction_uri)
+
+	reaction_controllers = defaultdict(set)
+	for control in dictControl.itervalues():
+		if control.controller is not None and control.reaction in dictReaction:
+			entity_reactions[control.controller].add(control.reaction)
+			reaction_controllers[control.reaction].add(control.controller)
+
+	parents = defaultdict(set)
+	for uri, entity in dictPhysicalEntity.iteritems():
+		for sub_entity in entity.components | entity.members:
+			parents[sub_entity].add(uri)
+
+	# Bounded breadth-first search
+	entities = get_ancestors(seed_uris)
+	frontier = set(entities)
+	reactions = set()
+	for _ in range(radius):
+		new_reactions = {reaction_uri for entity_uri in frontier
+							for reaction_uri in entity_reactions[entity_uri]
+								if reaction_uri not in reactions}
+		if not new_reactions:
+			break
+		reactions |= new_reactions
+
+		new_entities = {
+			entity_uri for reaction_uri in new_reactions
+				for entity_uri in get_participants(dictReaction[reaction_uri])
+					| reaction_controllers[reaction_uri]
+					if entity_uri in dictPhysicalEntity and \
+						entity_uri not in entities
+		}
+		frontier = get_ancestors(new_entities) - entities
+		entities |= frontier
+
+	# Members and components needed to develop the entities reached
+	stack = list(entities)
+	while stack:
+		entity = dictPhysicalEntity[stack.pop()]
+		for sub_entity in entity.components | entity.members:
+			if sub_entity in dictPhysicalEntity and sub_entity not in entities:
+				entities.add(sub_entity)
+				stack.append(sub_entity)
+
+	LOGGER.info(
+		"Neighbourhood of {} seed entities (radius {}): "
+		"{}/{} entities, {}/{} reactions".format(
+			len(seed_uris), radius,
+			len(entities), len(dictPhysicalEntity),
+			len(reactions), len(dictReaction),
+		)
+	)
+
+	return (
+		{uri: dictPhysicalEntity[uri] for uri in entities},
+		{uri: dictReaction[uri] for uri in reactions},
+		{uri: control for uri, control in dictControl.iteritems()
+			if control.reaction in reactions},
+	)
+
+
 def filter_control(controls, pathways_names, cofactors=set()):
 	"""Remove pathways from controls and keep others (entities + ?).
 
@@ -1085,6 +2426,193 @@ def createControlFromEntityOnBothSides(dictReaction, dictControl):
 			dictControl[control.uri] = control
 
 
+def pathwayModelWorker(pathway):
+	"""Write the model of a top-level pathway in a process of the pool of
+	writeModelsByPathway().
+
+	:param pathway: Uri of the top-level pathway.
+	:type pathway: <str>
+	:return: Uri of the pathway, and True if the model was written
+		(False if it was unchanged).
+	:rtype: <tuple <str>, <bool>>
+	"""
+
+	pathwaysTransitions, dictPhysicalEntity, paths, (no_scc_fix, compact) = \
+		PATHWAYS_CONTEXT
+
+	written = createCadbiomFile(
+		pathwaysTransitions[pathway],
+		dictPhysicalEntity,
+		pathway,			# model name
+		paths[pathway],		# model path
+		no_scc_fix,
+		compact,
+	)
+	return pathway, written
+
+
+def writeModelsByPathway(dictTransition, dictReaction, dictControl,
+						 dictPhysicalEntity, dictPathwayName,
+						 pathwayToSuperPathways, params, graph_store=None):
+	"""Write one model per top-level pathway, and a manifest of the models.
+
+	Transitions of the full model are split according to the pathways of
+	their reactions (see :mod:`biopax2cadbiom.pathways`); models are written
+	by a pool of processes that inherit the transitions at fork.
+
+	Models are named after the model given in params (--cadbiomFile):
+	<root>_<name of the pathway><extension>. The manifest
+	(<root>_manifest.json) gives for each model: its pathway, its files
+	and their sizes, the numbers of transitions and of entities involved
+	in the pathway.
+
+	.. note:: Top-level pathways without transitions have no model.
+
+	:param dictTransition: Dictionnary of transitions (see getTransitions()).
+	:param dictReaction: Dictionnary of biopax reactions.
+	:param dictControl: Dictionnary of biopax controls.
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities.
+	:param dictPathwayName: Names of pathways created by query.getPathways().
+	:param pathwayToSuperPathways: Direct super pathways of pathways,
+		created by query.getPathwayAncestorsHierarchy().
+	:param params: Settings of the conversion (cadbiomFile, no_scc_fix,
+		compactModel, workers).
+	:param graph_store: (optional) Columnar store of the graph; if set,
+		the entities of pathways are computed by the store.
+	:type dictTransition: <dict <tuple <str>, <str>>: <list <Transition>>>
+	:type dictReaction: <dict <str>: <Reaction>>
+	:type dictControl: <dict <str>: <Control>>
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+	:type dictPathwayName: <dict <str>: <str>>
+	:type pathwayToSuperPathways: <dict <str>: <set <str>>>
+	:type params: <dict>
+	:type graph_store: <GraphStore>
+	:return: Path of the manifest.
+	:rtype: <str>
+	"""
+
+	global PATHWAYS_CONTEXT
+
+	pathways = set(dictPathwayName)
+	for reaction in dictReaction.itervalues():
+		pathways |= reaction.pathways
+	topLevelPathways = getTopLevelPathways(pathways, pathwayToSuperPathways)
+
+	pathwaysTransitions, nb_unassigned = splitTransitionsByPathway(
+		dictTransition, dictReaction, topLevelPathways
+	)
+	# Pathways without transitions are ignored
+	pathwaysTransitions = {
+		pathway: transitions
+			for pathway, transitions in pathwaysTransitions.iteritems()
+				if transitions
+	}
+
+	root, extension = splitModelPath(params['cadbiomFile'])
+	paths = getPathwayModelPaths(
+		root, extension, pathwaysTransitions, dictPathwayName
+	)
+
+	# Biggest models first: they are not the last ones to be written
+	pathways = sorted(
+		pathwaysTransitions,
+		key=lambda pathway: (-len(pathwaysTransitions[pathway]), pathway)
+	)
+	workers = params.get('workers', 1)
+
+	PATHWAYS_CONTEXT = (
+		pathwaysTransitions, dictPhysicalEntity, paths,
+		(params['no_scc_fix'], params.get('compactModel', False))
+	)
+	try:
+		if workers > 1 and len(pathways) > 1:
+			pool = mp.Pool(min(workers, len(pathways)))
+			try:
+				results = dict(
+					pool.imap_unordered(pathwayModelWorker, pathways)
+				)
+				pool.close()
+			except:
+				pool.terminate()
+				raise
+			finally:
+				pool.join()
+		else:
+			results = dict(pathwayModelWorker(pathway) for pathway in pathways)
+	finally:
+		PATHWAYS_CONTEXT = None
+
+	# Manifest
+	if graph_store is not None:
+		pathwayToPhysicalEntities = \
+			graph_store.get_pathway_to_physical_entities()
+	else:
+		pathwayToPhysicalEntities = getPathwayToPhysicalEntities(
+			dictReaction, dictControl, dictPhysicalEntity
+		)
+	models = list()
+	for pathway in sorted(pathwaysTransitions):
+		files = [paths[pathway]]
+		if not params['no_scc_fix']:
+			files.append(getModelWithoutSCCPath(paths[pathway]))
+
+		entities = set()
+		for sub_pathway in topLevelPathways[pathway]:
+			entities |= pathwayToPhysicalEntities.get(sub_pathway, set())
+
+		models.append({
+			'pathway': pathway,
+			'name': dictPathwayName.get(pathway, pathway),
+			'files': {
+				os.path.basename(path): os.path.getsize(path) for path in files
+			},
+			'written': results[pathway],
+			'sub_pathways': len(topLevelPathways[pathway]) - 1,
+			'transitions': sum(
+				len(transitions)
+					for transitions in pathwaysTransitions[pathway].itervalues()
+			),
+			'entities': len(entities),
+		})
+
+	manifest_path = root + "_manifest.json"
+	with open(manifest_path, 'w') as f_d:
+		json.dump(
+			{
+				'model': str(params['listOfGraphUri']),
+				'models': models,
+				'total_size': sum(
+					size for model in models
+						for size in model['files'].itervalues()
+				),
+				'transitions_without_pathway': nb_unassigned,
+			},
+			f_d, indent=2, sort_keys=True
+		)
+
+	LOGGER.info("{} models of pathways written; manifest: {}".format(
+		len(models), manifest_path
+	))
+	return manifest_path
+
+
+def isSameQueries(params_loaded, params):
+	"""Check if the parameters of a backup of queries define the same queries
+	as the given parameters.
+
+	.. note:: Only QUERY_PARAMS are compared; a backup can be reused with
+		other options of the model, seeds, processes, stores...
+
+	:param params_loaded: Parameters saved in the backup.
+	:param params: Parameters of the conversion.
+	:type params_loaded: <dict>
+	:type params: <dict>
+	:rtype: <bool>
+	"""
+	return {k: params_loaded.get(k) for k in QUERY_PARAMS} == \
+		{k: params.get(k) for k in QUERY_PARAMS}
+
+
 def main(params):
 	"""Entry point
 
@@ -1133,49 +2661,154 @@ def main(params):
 	if params['pickleBackup'] and not backup_file_status:
 
 		LOGGER.debug("Variables saving...")
-		dill.dump(
-			[
+		if params.get('backupFormat') == 'snapshot':
+			write_snapshot(
+				params['pickleDir'],
 				dictPhysicalEntity, dictReaction, dictLocation, dictControl,
 				blacklisted_entities, params
-			],
-			open(params['pickleDir'], "wb")
-		)
+			)
+		else:
+			dill.dump(
+				[
+					dictPhysicalEntity, dictReaction, dictLocation, dictControl,
+					blacklisted_entities, params
+				],
+				open(params['pickleDir'], "wb")
+			)
 
 	# Pickle and backup file => load queries
 	if params['pickleBackup'] and backup_file_status:
 
 		LOGGER.debug("Variables loading...")
-		dictPhysicalEntity, dictReaction, dictLocation, dictControl, \
-		blacklisted_entities, params_loaded = \
-			dill.load(open(params['pickleDir'], "rb"))
+		if params.get('backupFormat') == 'snapshot':
+			dictPhysicalEntity, dictReaction, dictLocation, dictControl, \
+			blacklisted_entities, params_loaded = \
+				load_snapshot(params['pickleDir'])
+		else:
+			dictPhysicalEntity, dictReaction, dictLocation, dictControl, \
+			blacklisted_entities, params_loaded = \
+				dill.load(open(params['pickleDir'], "rb"))
 
 		# Check if given parameters are equal to those loaded from backup
-		assert params_loaded == params, \
+		assert isSameQueries(params_loaded, params), \
 			"The settings are different from those you have previously entered!"
 
+	if params.get('seeds', None):
+		# Convert only the neighbourhood of seeds
+		dictPhysicalEntity, dictReaction, dictControl = getSeedsNeighbourhood(
+			params['seeds'], params.get('radius', 1),
+			dictPhysicalEntity, dictReaction, dictControl
+		)
+
 
 	# Do the magic...
 	removeEntitiesBlacklistedFromReactions(dictReaction, blacklisted_entities)
 
 	createControlFromEntityOnBothSides(dictReaction, dictControl)
 
-	addReactionToEntities(dictReaction, dictControl, dictPhysicalEntity)
+	graph_store = None
+	if params.get('columnarStore', False):
+		# Columnar passes; 'reactions' attributes of entities are not filled
+		graph_store = GraphStore(dictPhysicalEntity, dictReaction, dictControl)
+		graph_store.detect_members_used(params['convertFullGraph'])
+		used_entities = graph_store.get_used_entities()
+	else:
+		addReactionToEntities(dictReaction, dictControl, dictPhysicalEntity)
 
-	detectMembersUsedInEntities(dictPhysicalEntity, params['convertFullGraph'])
-	developComplexs(dictPhysicalEntity)
-	addControllersToReactions(dictReaction, dictControl)
-	numerotateLocations(dictLocation, params['fullCompartmentsNames'])
-	addCadbiomNameToEntities(dictPhysicalEntity, dictLocation)
-	addCadbiomSympyCondToReactions(dictReaction, dictPhysicalEntity)
+		detectMembersUsedInEntities(
+			dictPhysicalEntity, params['convertFullGraph']
+		)
+		used_entities = getEntitiesUsedInReactions(dictPhysicalEntity)
 
-	# Compute final transitions
-	dictTransition = getTransitions(dictReaction, dictPhysicalEntity)
+	if params.get('dryRun', False):
+		# Only estimate the size of combinatorial stages
+		printConversionEstimates(
+			getConversionEstimates(
+				dictReaction, dictPhysicalEntity, used_entities
+			)
+		)
+		return
 
-	# Make the Cadbiom model
-	createCadbiomFile(
-		dictTransition,
+	# Develop only complexes that can reach transitions
+	developComplexs(
 		dictPhysicalEntity,
-		str(params['listOfGraphUri']), # model name
-		params['cadbiomFile'],		 # model path
-		params['no_scc_fix'],
+		used_entities,
+		params.get('maxFlatComponents', None),
+		params.get('overLimitStrategy', 'parent'),
 	)
+	addControllersToReactions(dictReaction, dictControl)
+	numerotateLocations(dictLocation, params['fullCompartmentsNames'])
+	# Names of flat components are built only for entities that can reach
+	# transitions; possibilities of entities are computed on demand
+	# Nodes of the model are collected with names and transitions
+	model_nodes = ModelNodes()
+	addCadbiomNameToEntities(
+		dictPhysicalEntity, dictLocation, params.get('namesCache', None),
+		used_entities, model_nodes
+	)
+
+	# Transitions are kept in memory or stored on disk
+	if params.get('transitionStore') == 'sqlite':
+		# PS: The database is in the directory of the model
+		# (the temporary directory may be in memory)
+		dictTransition = SQLiteTransitionStore(
+			os.path.dirname(os.path.abspath(params['cadbiomFile'])),
+			params.get('memoryBudget', 256)
+		)
+	else:
+		dictTransition = MemoryTransitionStore()
+
+	try:
+		# Possibilities of entities are shared by conditions and transitions
+		possibilities_memo = PossibilitiesMemo()
+		computed_reactions = None
+		if params.get('shardByComponent', False):
+			# Conditions and transitions computed by connected components
+			computed_reactions = getShardedConditionsAndTransitions(
+				dictReaction, dictPhysicalEntity, dictTransition,
+				params.get('workers', 1), model_nodes
+			)
+		else:
+			addCadbiomSympyCondToReactions(
+				dictReaction, dictPhysicalEntity, possibilities_memo
+			)
+
+		# Compute final transitions
+		getTransitions(
+			dictReaction, dictPhysicalEntity, possibilities_memo,
+			params.get('workers', 1), computed_reactions, model_nodes,
+			dictTransition
+		)
+
+		if params.get('splitByPathway', False):
+			# Make 1 Cadbiom model per top-level pathway
+			# PS: Pathways are not in the backup of queries: they are queried
+			# here (small queries)
+			writeModelsByPathway(
+				dictTransition, dictReaction, dictControl, dictPhysicalEntity,
+				query.getPathways(params['listOfGraphUri']),
+				query.getPathwayAncestorsHierarchy(params['listOfGraphUri']),
+				params, graph_store
+			)
+		else:
+			# Make the Cadbiom model
+			createCadbiomFile(
+				dictTransition,
+				dictPhysicalEntity,
+				str(params['listOfGraphUri']), # model name
+				params['cadbiomFile'],		 # model path
+				params['no_scc_fix'],
+				params.get('compactModel', False),
+				model_nodes,
+			)
+
+		if params.get('jsonLinesFile'):
+			createJsonLinesFile(
+				dictTransition,
+				dictPhysicalEntity,
+				str(params['listOfGraphUri']),
+				params['jsonLinesFile'],
+				model_nodes,
+			)
+	finally:
+		dictTransition.close()
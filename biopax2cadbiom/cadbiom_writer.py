@@ -25,23 +25,112 @@
 
 """
 This module is used to export biopax processed data to cabiom model file format.
+
+Model files are compressed according to their extension:
+'.gz' (gzip) or '.zst' (zstd; the package zstandard must be installed).
 """
 from __future__ import unicode_literals
 from __future__ import print_function
 
 # Standard imports
-import sympy
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
 from lxml import etree as ET
 
 # Custom imports
-import cadbiom.models.guard_transitions.analyser.model_corrections as mc
+from biopax2cadbiom import conditions
+from biopax2cadbiom.scc import getFrontierSCCs
+from biopax2cadbiom.classes import StringTable
+from biopax2cadbiom.transition_store import iterSortedTransitions
+import biopax2cadbiom.commons as cm
+
+LOGGER = cm.logger()
+
+# Extensions of compressed model files
+COMPRESSED_EXTENSIONS = ('.gz', '.zst')
+# Comment written after the model (see createCadbiomFile())
+CONTENT_HASH_COMMENT = b"<!-- content hash: {} -->"
+CONTENT_HASH_PATTERN = re.compile(br"<!-- content hash: ([0-9a-f]{40}) -->")
+
 
+def formatCondition(condition, memo=None):
+	"""Format a condition built with the module conditions.
 
-def formatCadbiomSympyCond(cadbiomSympyCond):
+	.. note:: The condition is walked iteratively (no recursion limit).
+		Conditions are hash-consed: subexpressions shared by several
+		conditions (ex: groups of controllers) are formatted only once
+		with the same memo.
+
+	:param condition: Condition of a transition.
+	:param memo: (optional) Formatted conditions; updated in place.
+	:type condition: <biopax2cadbiom.conditions.Expr>
+	:type memo: <dict <biopax2cadbiom.conditions.Expr>: <str>>
+	:return type: <str>
 	"""
+
+	if memo is None:
+		memo = dict()
+
+	try:
+		return memo[condition]
+	except KeyError:
+		pass
+
+	# Post-order walk: a node is formatted when all its args are formatted
+	stack = [condition]
+	while stack:
+		expr = stack[-1]
+		if expr in memo:
+			stack.pop()
+			continue
+
+		args = expr.args if isinstance(expr, conditions.LatticeOp) else \
+			(expr.arg,) if type(expr) is conditions.Not else ()
+		missing_args = [arg for arg in args if arg not in memo]
+		if missing_args:
+			stack.extend(missing_args)
+			continue
+
+		stack.pop()
+		if expr is conditions.TRUE:
+			memo[expr] = ''
+		elif type(expr) is conditions.Or:
+			memo[expr] = "(" + " or ".join([memo[arg] for arg in args]) + ")"
+		elif type(expr) is conditions.And:
+			memo[expr] = "(" + " and ".join([memo[arg] for arg in args]) + ")"
+		elif type(expr) is conditions.Not:
+			subCadbiomStrCond = memo[expr.arg]
+			if subCadbiomStrCond[:1] == "(":
+				memo[expr] = "not" + subCadbiomStrCond
+			else:
+				memo[expr] = "not(" + subCadbiomStrCond + ")"
+		else:
+			memo[expr] = str(expr)
+
+	return memo[condition]
+
+
+def formatCadbiomSympyCond(cadbiomSympyCond, memo=None):
+	"""Format a condition (built with the module conditions or with sympy).
+
+	:param cadbiomSympyCond: Condition of a transition.
+	:param memo: (optional) Formatted conditions built with the module
+		conditions (see formatCondition()).
+	:type memo: <dict <biopax2cadbiom.conditions.Expr>: <str>>
 	:return type: <str>
 	"""
 
+	if isinstance(cadbiomSympyCond, conditions.Expr):
+		return formatCondition(cadbiomSympyCond, memo)
+
+	# sympy is only imported for conditions built with it
+	import sympy
+
 	if cadbiomSympyCond == True:
 		return ''
 	elif type(cadbiomSympyCond) == sympy.Or:
@@ -58,19 +147,135 @@ def formatCadbiomSympyCond(cadbiomSympyCond):
 	return str(cadbiomSympyCond)
 
 
-def formatEventAndCond(setOfEventAndCond):
-	"""
+def formatEventAndCond(setOfEventAndCond, memo=None):
+	"""Format the events of a transition merged with the operator 'default':
+
+		((event1) when (cond1)) default (((event2) when (cond2)) default (...))
+
+	.. note:: Events are sorted (by name, then by condition); the same
+		events are always formatted in the same order. The given set is
+		emptied; the string is built in one pass, without recursion.
+
+	:param setOfEventAndCond: Set of tuples (event, condition).
+	:param memo: (optional) Formatted conditions (see formatCondition()).
+	:type setOfEventAndCond: <set <tuple <str>, <conditions.Expr>>>
+	:type memo: <dict <biopax2cadbiom.conditions.Expr>: <str>>
 	:return type: <str>
 	"""
 
-	# remove and return an arbitrary element from s; raises KeyError if empty ?????????????????????
-	event, cond = setOfEventAndCond.pop()
-	condition_str = '({}) when ({})'.format(event, formatCadbiomSympyCond(cond))
-	if len(setOfEventAndCond) == 0:
-		return condition_str
-	else:
-		return '({}) default ({})'.format(condition_str,
-										  formatEventAndCond(setOfEventAndCond))
+	events_conds = list()
+	while setOfEventAndCond:
+		event, cond = setOfEventAndCond.pop()
+		events_conds.append((event, formatCadbiomSympyCond(cond, memo)))
+	events_conds.sort()
+
+	parts = list()
+	for event, cond in events_conds[:-1]:
+		parts.append('(({}) when ({})) default ('.format(event, cond))
+
+	event, cond = events_conds[-1]
+	parts.append('({}) when ({})'.format(event, cond))
+	parts.append(')' * (len(events_conds) - 1))
+	return ''.join(parts)
+
+
+def splitModelPath(filePath):
+	"""Split the path of a model file into its root and its extension.
+
+	The extension of compression is kept with the extension of the model:
+
+		>>> splitModelPath("output/model.bcx.gz")
+		('output/model', '.bcx.gz')
+
+	:param filePath: Path of the model file.
+	:type filePath: <str>
+	:return: Root of the path and extension(s).
+	:rtype: <tuple <str>, <str>>
+	"""
+
+	root, extension = os.path.splitext(filePath)
+	if extension in COMPRESSED_EXTENSIONS:
+		root, model_extension = os.path.splitext(root)
+		extension = model_extension + extension
+	return root, extension
+
+
+def getModelWithoutSCCPath(filePath):
+	"""Get the path of the model without strongly connected components
+	("_without_scc" suffix in filename).
+
+	:param filePath: Path of the model file.
+	:type filePath: <str>
+	:rtype: <str>
+	"""
+	filename, file_extension = splitModelPath(filePath)
+	return filename + "_without_scc" + file_extension
+
+
+def openModelFile(filePath, mode='wb'):
+	"""Open a model file; the file is compressed according to its
+	extension ('.gz' or '.zst').
+
+	.. note:: gzip files do not contain the time of their creation;
+		the same model gives the same file.
+
+	:param filePath: Path of the model file.
+	:param mode: (optional) 'wb' (default) to write the file,
+		'rb' to read it.
+	:type filePath: <str>
+	:type mode: <str>
+	:return: File object opened in binary mode.
+	"""
+
+	extension = os.path.splitext(filePath)[1]
+	if extension == '.gz':
+		# Default level (9) is much slower for a few % of size
+		return gzip.GzipFile(filePath, mode, compresslevel=6, mtime=0)
+
+	if extension == '.zst':
+		# zstandard is only imported for zstd files
+		try:
+			import zstandard
+		except ImportError:
+			LOGGER.error("The package zstandard is required to read/write "
+						 "zstd files (" + filePath + ")")
+			raise
+		if mode == 'rb':
+			return zstandard.ZstdDecompressor().stream_reader(
+				open(filePath, 'rb')
+			)
+		return zstandard.ZstdCompressor(level=3).stream_writer(
+			open(filePath, 'wb')
+		)
+
+	return open(filePath, mode)
+
+
+def readModelHash(filePath):
+	"""Get the content hash written in a model file by createCadbiomFile().
+
+	:param filePath: Path of the model file.
+	:type filePath: <str>
+	:return: The hash; None if the file doesn't exist or has no hash.
+	:rtype: <str> or None
+	"""
+
+	if not os.path.isfile(filePath):
+		return None
+
+	try:
+		with openModelFile(filePath, 'rb') as fd:
+			# The comment is in the last line (after the model)
+			# PS: Compressed files are read until the end
+			tail = b""
+			for chunk in iter(lambda: fd.read(65536), b""):
+				tail = (tail + chunk)[-256:]
+	except (IOError, EOFError):
+		# Truncated or corrupted file
+		return None
+
+	found = CONTENT_HASH_PATTERN.search(tail)
+	return found.group(1) if found else None
 
 
 def get_names_of_missing_physical_entities(dictPhysicalEntity):
@@ -100,108 +305,390 @@ def get_names_of_missing_physical_entities(dictPhysicalEntity):
 	return cadbiomNames
 
 
+def getModelNodes(dictTransition, dictPhysicalEntity, nodes=None):
+	"""Get the names of the nodes of the model and the uris of all names.
+
+	:param arg1: Dictionnary of transitions (see createCadbiomFile()).
+	:param arg2: Dictionnary of biopax physicalEntities.
+	:param arg3: (optional) Nodes of the model collected during the
+		conversion (see biopax_converter.ModelNodes). By default they are
+		searched in dictTransition and dictPhysicalEntity.
+	:type arg1: <dict <tuple <str>, <str>>: <list <Transition>>>
+	:type arg2: <dict <str>: <PhysicalEntity>>
+	:type arg3: <ModelNodes>
+	:return: Names of the nodes, and dictionnary of names as keys
+		and uris as values.
+	:rtype: <tuple <set <str>>, <dict <str>: <str>>>
+	"""
+
+	if nodes is not None:
+		# Nodes already collected
+		return nodes.names, nodes.uris
+
+	# Get all nodes in transitions
+	cadbiomNodes = set()
+	for ori_ext_nodes, transitions in dictTransition.iteritems():
+
+		# In transitions (ori/ext)
+		cadbiomNodes.update(ori_ext_nodes)
+		# In conditions
+		cadbiomNodes.update(
+			str(atom) for transition in transitions
+			for atom in transition.sympyCond.atoms()
+		)
+
+	# We want uri and cadbiom name for each entity in the model
+	return cadbiomNodes, \
+		get_names_of_missing_physical_entities(dictPhysicalEntity)
+
+
 def createCadbiomFile(dictTransition, dictPhysicalEntity, nameModel, filePath,
-					  no_scc_fix):
+					  no_scc_fix, compact=False, nodes=None):
 	"""Export data into a cadbiom model file format.
 
+	.. note:: The model is written incrementally: elements are serialized
+		one by one, and the tree of the whole model is never built.
+		Nodes are written before transitions because the cadbiom model
+		is parsed from the top to the end.
+
+	.. note:: If strongly connected components are fixed, they are found
+		on the transitions in memory (see scc.getFrontierSCCs()), and the
+		model with start nodes ("_without_scc" suffix in filename) is
+		copied from the basic model: start nodes and their transitions
+		are inserted at the positions recorded while the basic model
+		was written.
+
+	.. note:: Files are compressed according to the extension of filePath
+		('.gz' or '.zst', see openModelFile()).
+
+	.. note:: Nodes and transitions are sorted by their names, and
+		a hash of the content of the model is written in a comment
+		after the model. The basic model is written in a temporary file
+		in the directory of filePath, and the hash is computed while it
+		is written; if the existing files have the same hash, they are
+		not replaced, and SCCs are not searched.
+
 	:param arg1: Dictionnary of transitions and their respective set of events.
 		.. example::
-			subDictTransition[(cadbiomL,right)].append({
-				'event': transition['event'],
-				'reaction': reaction,
-				'sympyCond': transitionSympyCond
-			}
+			dictTransition[(cadbiomL,right)].append(
+				Transition(event, reaction.uri, transitionSympyCond)
+			)
 	:param arg2: Dictionnary of biopax physicalEntities,
 		created by the function query.getPhysicalEntities()
 	:param arg3: Name of the model.
 	:param arg4: File path.
-	:type arg1: <dict <tuple <str>, <str>>: <list <dict>>>
+	:param arg5: If True, strongly connected components will NOT be fixed
+		in a second model file.
+	:param arg6: (optional) If True, elements are not indented.
+		By default the file is the same as the pretty print of lxml.
+	:param arg7: (optional) Nodes of the model collected during the
+		conversion (see biopax_converter.ModelNodes): names of nodes and
+		their uris. By default they are searched in dictTransition and
+		dictPhysicalEntity.
+	:type arg1: <dict <tuple <str>, <str>>: <list <Transition>>>
 	:type arg2: <dict <str>: <PhysicalEntity>>
-		keys: uris; values entity objects
 	:type arg3: <str>
 	:type arg4: <str>
+	:type arg5: <bool>
+	:type arg6: <bool>
+	:type arg7: <ModelNodes>
+	:return: True if the model was written; False if it was unchanged.
+	:rtype: <bool>
 	"""
 
+	cadbiomNodes, cadbiomNames = \
+		getModelNodes(dictTransition, dictPhysicalEntity, nodes)
+
+	# Formatted conditions (subexpressions are shared between transitions)
+	memo = dict()
+
+	def get_transitions():
+		"""Yield ori/ext nodes, event, condition and uris of reactions of
+		each transition, in the order of ori/ext nodes"""
+		for ori_ext_nodes, transitions \
+			in iterSortedTransitions(dictTransition):
+
+			if len(transitions) == 1:
+				transition = transitions[0]
+				yield (
+					ori_ext_nodes, transition.event,
+					formatCadbiomSympyCond(transition.sympyCond, memo),
+					"reaction=" + transition.reaction,
+				)
+
+			else:
+				events_conds = \
+					{(transition.event, transition.sympyCond)
+						for transition in transitions}
+
+				# Get all uris of reactions involved in this transition
+				uris = ','.join(
+					sorted(transition.reaction for transition in transitions)
+				)
+
+				yield (
+					ori_ext_nodes, formatEventAndCond(events_conds, memo),
+					"",
+					"reaction=" + uris
+				)
+
+	# Nodes and transitions are sorted: the same model gives the same file
+	cadbiomNodes = sorted(cadbiomNodes)
+
 	# Header
-	model = ET.Element("model", xmlns="http://cadbiom.genouest.org/",
-					   name=nameModel)
+	# PS: The empty element gives the serialization of the start tag
+	model = ET.tostring(
+		ET.Element("model", xmlns="http://cadbiom.genouest.org/",
+				   name=nameModel)
+	)
+	newline, indent = (b"", b"") if compact else (b"\n", b"\n  ")
 
-	# Get all nodes in transitions
+	# Elements reused for each node/transition (attributes are updated)
+	node = ET.Element("CSimpleNode", name="", xloc="0.0", yloc="0.0")
+	transition_element = ET.Element(
+		"transition", ori="", ext="", event="", condition="",
+		#action="", fact_ids="[]"
+	)
 
-	# Put these nodes in the model
-	# PS: why we don't do that in the following iteration of dictTransition ?
-	# Because the cadbiom model is parsed from the top to the end ><
-	# If nodes are at the end, the model will fail to be loaded...
-	# Awesome.
-	def write_nodes(name, uri):
-		"""Convenient func to add CSimpleNode entity"""
-		ET.SubElement(model, "CSimpleNode",
-		   name=name,
-		   xloc="0.0", yloc="0.0"
-		).text = \
-			uri
+	# Models are written in a temporary directory, next to their final path
+	# PS: The names of files are kept (they are in the headers of gzip files)
+	tmp_directory = tempfile.mkdtemp(
+		prefix=".tmp_", dir=os.path.dirname(os.path.abspath(filePath))
+	)
+	tmpFilePath = os.path.join(tmp_directory, os.path.basename(filePath))
 
-	cadbiomNodes = set()
-	for ori_ext_nodes, transitions in dictTransition.iteritems():
+	# Content hash and size of the basic model;
+	# positions of the start nodes and of their transitions in the model
+	# without SCC (see write_model_without_scc())
+	digest = hashlib.sha1()
+	size = [0]
+	positions = list()
 
-		# In transitions (ori/ext)
-		cadbiomNodes.update(ori_ext_nodes)
-		# In conditions
-		cadbiomNodes.update(
-			str(atom) for transition in transitions
-			for atom in transition['sympyCond'].atoms()
+	def write(data):
+		"""Write the given data in the basic model"""
+		digest.update(data)
+		size[0] += len(data)
+		fd.write(data)
+
+	def write_nodes(name, uri):
+		"""Convenient func to write a CSimpleNode entity"""
+		node.set("name", name)
+		node.text = uri
+		write(indent + ET.tostring(node))
+
+	def format_transition(ori_ext_nodes, event, condition, uris):
+		"""Convenient func to serialize a transition"""
+		left_entity, right_entity = ori_ext_nodes
+		transition_element.set("ori", left_entity)
+		transition_element.set("ext", right_entity)
+		transition_element.set("event", event)
+		transition_element.set("condition", condition)
+		transition_element.text = uris
+		return indent + ET.tostring(transition_element)
+
+	def write_model_without_scc(path):
+		"""Write the model with start nodes: the basic model is copied,
+		start nodes and their transitions are inserted at their positions"""
+
+		frontier_sccs = getFrontierSCCs(dictTransition)
+
+		# Only 1 start node in each frontier SCC is sufficient to suppress it
+		# PS: We take the first node in lexicographic order
+		start_nodes = b"".join(
+			indent + ET.tostring(
+				ET.Element("CStartNode", name="__start__" + str(scc_number))
+			)
+			for scc_number in range(len(frontier_sccs))
 		)
+		# Transitions from start nodes
+		start_transitions = list()
+		for scc_number, scc in enumerate(frontier_sccs):
+			LOGGER.debug("SCC {}; first lexicographic node selected:{}".format(
+				scc, scc[0]))
+			start_transitions.append(format_transition(
+				("__start__" + str(scc_number), scc[0]), "", "", None
+			))
+
+		with openModelFile(tmpFilePath, 'rb') as basic_fd, \
+			openModelFile(path) as scc_fd:
+
+			scc_fd.write(
+				b'<?xml version = "1.0" encoding="ASCII" standalone="yes" ?>\n'
+			)
+			position = 0
+			for end, data in zip(positions,
+								 (start_nodes, b"".join(start_transitions))):
+				# Copy the basic model until the insertion
+				while position < end:
+					chunk = basic_fd.read(min(end - position, 65536))
+					if not chunk:
+						break
+					scc_fd.write(chunk)
+					position += len(chunk)
+				scc_fd.write(data)
+
+			# End tag and content hash
+			for chunk in iter(lambda: basic_fd.read(65536), b""):
+				scc_fd.write(chunk)
+
+	try:
+		with openModelFile(tmpFilePath) as fd:
+			# Start tag (an empty model is written as an empty element)
+			write(model[:-2] + b">" if cadbiomNodes else model)
+
+			# Put the nodes in the model
+			# PS: why we don't do that in the following iteration of dictTransition ?
+			# Because the cadbiom model is parsed from the top to the end ><
+			# If nodes are at the end, the model will fail to be loaded...
+			# Awesome.
+			[write_nodes(cadbiomName, cadbiomNames[cadbiomName])
+				for cadbiomName in cadbiomNodes]
+			positions.append(size[0])
+
+			####################################################################
+			# Anyway, next...
+			# Get all transitions
+			[write(format_transition(*transition))
+				for transition in get_transitions()]
+			positions.append(size[0])
+
+			# End tag
+			if cadbiomNodes:
+				write(newline + b"</model>")
+			write(newline)
+
+			# Content hash; read to skip unchanged models
+			content_hash = digest.hexdigest()
+			fd.write(CONTENT_HASH_COMMENT.format(content_hash) + b"\n")
+
+		# The model without SCC is built from the basic model:
+		# it is unchanged if the basic model is unchanged
+		written = list()
+		if readModelHash(filePath) != content_hash:
+			written.append(filePath)
+		if not no_scc_fix:
+			sccFilePath = getModelWithoutSCCPath(filePath)
+			if readModelHash(sccFilePath) != content_hash:
+				write_model_without_scc(
+					os.path.join(tmp_directory, os.path.basename(sccFilePath))
+				)
+				written.append(sccFilePath)
+
+		if not written:
+			LOGGER.info("Model unchanged (content hash: {}); {} not rewritten".format(
+				content_hash, filePath
+			))
+			return False
+
+		for path in written:
+			os.rename(
+				os.path.join(tmp_directory, os.path.basename(path)), path
+			)
 
-	# We want uri and cadbiom name for each entity in the model
-	cadbiomNames = get_names_of_missing_physical_entities(dictPhysicalEntity)
+	finally:
+		shutil.rmtree(tmp_directory, ignore_errors=True)
 
-	[write_nodes(cadbiomName, cadbiomNames[cadbiomName])
-		for cadbiomName in cadbiomNodes]
+	return True
 
-	############################################################################
-	# Anyway, next...
-	# Get all transitions
-	def write_transitions(ori_ext_nodes, event, condition, uris):
-		"""Convenient func to add a transition"""
-		left_entity, right_entity = ori_ext_nodes
-		ET.SubElement(
-			model, "transition",
-			ori=left_entity, ext=right_entity,
-			event=event,
-			condition=condition,
-			#action="", fact_ids="[]"
-		).text = \
-			uris
 
-	for ori_ext_nodes, transitions in dictTransition.iteritems():
+def createJsonLinesFile(dictTransition, dictPhysicalEntity, nameModel,
+						filePath, nodes=None):
+	"""Export nodes and transitions of the model into a JSON-lines file.
 
-		if len(transitions) == 1:
-			transition = transitions[0]
-			write_transitions(
-				ori_ext_nodes, transition["event"],
-				formatCadbiomSympyCond(transition["sympyCond"]),
-				"reaction=" + transition["reaction"],
-			)
+	The file can be loaded without parsing XML; each line is a JSON array
+	whose first item is the type of the record:
 
-		else:
-			events_conds = \
-				{tuple((transition["event"], transition["sympyCond"]))
-					for transition in transitions}
-
-			# Get all uris of reactions involved in this transition
-			uris = \
-				','.join(transition['reaction'] for transition in transitions)
-
-			write_transitions(
-				ori_ext_nodes, formatEventAndCond(events_conds),
-				"",
-				"reaction=" + uris
-			)
+		- ["model", name of the model]
+		- ["strings", [str, ...]]: new strings; their ids follow the ids of
+		  the strings of the previous "strings" records (the first id is 0)
+		- ["node", id of name, id of uri]
+		- ["transition", id of ori, id of ext,
+		  [[id of event, id of condition, id of reaction uri], ...]]
+
+	Missing strings are encoded by -1.
+	Strings of a record are always defined in a previous line; a reader
+	can process the file line by line:
+
+		>>> strings = list()
+		>>> for line in fd:
+		...     record = json.loads(line)
+		...     if record[0] == "strings":
+		...         strings.extend(record[1])
 
-	tree = ET.ElementTree(model)
-	tree.write(filePath, pretty_print=True)
+	.. note:: Nodes, transitions and their events are sorted like in
+		createCadbiomFile().
+		Unlike the XML model, the events of a transition are not
+		merged: there is one event per reaction.
+		The start nodes of the model without strongly connected
+		components are not exported.
 
-	# Remove SCC (Strongly Connected Components) if needed
-	if not no_scc_fix:
-		# Make a new model file (with "_without_scc" suffix in filename)
-		mc.add_start_nodes(filePath)
+	.. note:: Files are compressed according to the extension of filePath
+		('.gz' or '.zst', see openModelFile()).
+
+	:param arg1: Dictionnary of transitions (see createCadbiomFile()).
+	:param arg2: Dictionnary of biopax physicalEntities.
+	:param arg3: Name of the model.
+	:param arg4: File path.
+	:param arg5: (optional) Nodes of the model collected during the
+		conversion (see biopax_converter.ModelNodes).
+	:type arg1: <dict <tuple <str>, <str>>: <list <Transition>>>
+	:type arg2: <dict <str>: <PhysicalEntity>>
+	:type arg3: <str>
+	:type arg4: <str>
+	:type arg5: <ModelNodes>
+	"""
+
+	cadbiomNodes, cadbiomNames = \
+		getModelNodes(dictTransition, dictPhysicalEntity, nodes)
+
+	# Formatted conditions (subexpressions are shared between transitions)
+	memo = dict()
+	strings = StringTable()
+
+	def get_records():
+		"""Yield records of nodes and transitions; their strings are added
+		to the string table"""
+		for cadbiomName in sorted(cadbiomNodes):
+			yield [
+				"node", strings.add(cadbiomName),
+				strings.add(cadbiomNames[cadbiomName])
+			]
+
+		for (left_entity, right_entity), transitions \
+			in iterSortedTransitions(dictTransition):
+			transitions = sorted(
+				transitions,
+				key=lambda transition: (
+					transition.event, transition.reaction
+				)
+			)
+			events = [
+				[strings.add(transition.event),
+				 strings.add(formatCadbiomSympyCond(
+					transition.sympyCond, memo
+				 )),
+				 strings.add(transition.reaction)]
+				for transition in transitions
+			]
+			yield [
+				"transition", strings.add(left_entity),
+				strings.add(right_entity), events
+			]
+
+	# PS: json.dumps() builds a new encoder at each call with these settings
+	encoder = json.JSONEncoder(separators=(',', ':'))
+
+	def dumps(record):
+		"""Serialize a record on a line"""
+		return encoder.encode(record) + b"\n"
+
+	with openModelFile(filePath) as fd:
+		fd.write(dumps(["model", nameModel]))
+
+		nb_strings = 0
+		for record in get_records():
+			# New strings are written before the record that uses them
+			if len(strings) > nb_strings:
+				fd.write(dumps(["strings", strings.strings[nb_strings:]]))
+				nb_strings = len(strings)
+			fd.write(dumps(record))
@@ -77,6 +77,67 @@ class PhysicalEntity(object):
 		)
 
 
+class GeneEntity(object):
+	"""
+	Class for Gene (node of the left side of a TemplateReaction):
+	Genes are not in BioPAX formalism; they are created by getTransitions()
+	with only what the cadbiom writer needs.
+		Attributes:
+			uri			=> uri of the first TemplateReaction of the gene
+			product		=> uri of the entity produced
+			cadbiomName
+			listOfCadbiomNames (empty tuple)
+	"""
+
+	__slots__ = ('uri', 'product', 'cadbiomName')
+
+	listOfCadbiomNames = ()
+
+	def __init__(self, uri, product, cadbiomName):
+		self.uri = uri
+		self.product = product
+		self.cadbiomName = cadbiomName
+
+	def __hash__(self):
+		"""Define object's unicity"""
+		return hash(self.uri)
+
+	def __repr__(self):
+		return "GeneEntity({}, {}, {})".format(
+			self.uri, self.product, self.cadbiomName
+		)
+
+
+class Transition(object):
+	"""
+	Class for the events of transitions (values of dictTransition):
+	transitions are created by updateTransitions() and getTransitions()
+	for each reaction, and shared by the stores and the writers.
+		Attributes:
+			event		=> event of the transition (ex: _h_1, _h_1_2)
+			reaction	=> uri of the reaction
+			sympyCond	=> condition (see biopax2cadbiom.conditions)
+	"""
+
+	__slots__ = ('event', 'reaction', 'sympyCond')
+
+	def __init__(self, event, reaction, sympyCond):
+		self.event = event
+		self.reaction = reaction
+		self.sympyCond = sympyCond
+
+	def __getstate__(self):
+		return self.event, self.reaction, self.sympyCond
+
+	def __setstate__(self, state):
+		self.event, self.reaction, self.sympyCond = state
+
+	def __repr__(self):
+		return "Transition({}, {}, {})".format(
+			self.event, self.reaction, self.sympyCond
+		)
+
+
 class Reaction(object):
 	"""
 	Class for reaction:
@@ -175,3 +236,39 @@ class Control(object):
 	def __hash__(self):
 		"""Define object's unicity"""
 		return hash(self.uri)
+
+
+class StringTable(object):
+	"""
+	Class for tables of strings: each string is identified by its position
+	(used by the JSON-lines model and the snapshots of queries).
+		Attributes:
+			strings	=> list of strings
+			index	=> dict of strings and their ids
+
+	.. note:: None is encoded by -1.
+	"""
+
+	def __init__(self, strings=()):
+		self.strings = list()
+		self.index = dict()
+		[self.add(string) for string in strings]
+
+	def add(self, string):
+		"""Return the id of the given string; add it if it is not present."""
+		if string is None:
+			return -1
+		try:
+			return self.index[string]
+		except KeyError:
+			string_id = len(self.strings)
+			self.index[string] = string_id
+			self.strings.append(string)
+			return string_id
+
+	def get(self, string_id):
+		"""Return the string of the given id (None for -1)."""
+		return None if string_id == -1 else self.strings[string_id]
+
+	def __len__(self):
+		return len(self.strings)
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+"""
+This module is used to build the boolean conditions of transitions.
+
+It replaces sympy in the conversion: expressions are nodes of a
+hash-consed DAG (each expression is built only once, and equal
+expressions are the same object), with:
+
+	- interned symbols,
+	- n-ary And/Or that are flattened and deduplicated,
+	- Not,
+	- the constants TRUE and FALSE.
+
+Expressions are simplified like their sympy counterparts
+(ex: And(a, And(b, a), TRUE) is And(a, b); Not(Not(a)) is a), and their
+arguments are ordered like sympy does; so conditions are formatted
+exactly as before.
+
+:func:`to_sympy` and :func:`from_sympy` convert expressions to/from sympy
+for the users who need it (sympy is imported only by these functions).
+"""
+
+from __future__ import print_function
+
+# Standard imports
+from weakref import WeakValueDictionary
+
+# Interned expressions
+# keys: (class, content); values: expressions
+# PS: Expressions are removed from the table when they are no longer used
+# (the table doesn't grow with the conversions made by a process).
+INTERNED = WeakValueDictionary()
+
+
+class Expr(object):
+	"""Base class of boolean expressions.
+
+	.. warning:: Expressions are interned: they must be created with their
+		constructors (Symbol, And, Or, Not) and never modified.
+	"""
+
+	__slots__ = ('_hash', '_order_key', '_atoms', '__weakref__')
+
+	args = ()
+
+	def __hash__(self):
+		return self._hash
+
+	def __and__(self, other):
+		return And(self, other)
+
+	def __or__(self, other):
+		return Or(self, other)
+
+	def __invert__(self):
+		return Not(self)
+
+	def sort_key(self):
+		"""Key used by sympy to sort expressions with the same number
+		of nodes (see order_key()).
+
+		Same as sympy: the key of the class (its name), then the keys of
+		the arguments. Symbols and constants have their own keys.
+
+		:rtype: <tuple>
+		"""
+		args = self.args
+		return (
+			(5, 0, type(self).__name__),
+			(len(args), tuple(arg.sort_key() for arg in args))
+		)
+
+	def order_key(self):
+		"""Key used to order the arguments of And/Or.
+
+		Same as sympy: expressions are sorted by number of nodes,
+		then by their sort_key().
+
+		:rtype: <tuple>
+		"""
+		if self._order_key is None:
+			nb_nodes = 1 + sum(arg.order_key()[0] for arg in self.args)
+			self._order_key = (nb_nodes, self.sort_key())
+		return self._order_key
+
+	def atoms(self):
+		"""Get the symbols used in the expression.
+
+		:rtype: <frozenset <Symbol>>
+		"""
+		if self._atoms is not None:
+			return self._atoms
+
+		symbols = set()
+		seen = set()
+		stack = [self]
+		while stack:
+			expr = stack.pop()
+			if expr._atoms is not None:
+				symbols |= expr._atoms
+				continue
+			if isinstance(expr, Symbol):
+				symbols.add(expr)
+				continue
+			for arg in expr.args:
+				if arg not in seen:
+					seen.add(arg)
+					stack.append(arg)
+
+		self._atoms = frozenset(symbols)
+		return self._atoms
+
+
+def intern_expr(cls, content, hash_value):
+	"""Get the interned expression with the given content, or create it.
+
+	:return: Tuple (expression, True if the expression has been created).
+	:rtype: <tuple <Expr>, <bool>>
+	"""
+	key = (cls, content)
+	expr = INTERNED.get(key)
+	if expr is not None:
+		return expr, False
+
+	expr = object.__new__(cls)
+	expr._hash = hash_value
+	expr._order_key = None
+	expr._atoms = None
+	INTERNED[key] = expr
+	return expr, True
+
+
+class Symbol(Expr):
+	"""Boolean variable (a cadbiom node)."""
+
+	__slots__ = ('name',)
+
+	def __new__(cls, name):
+		expr, created = intern_expr(
+			cls, name, hash(('Symbol', name, ('commutative', True)))
+		)
+		if created:
+			expr.name = name
+			expr._atoms = frozenset((expr,))
+		return expr
+
+	def __reduce__(self):
+		return (Symbol, (self.name,))
+
+	def sort_key(self):
+		return ((2, 0, 'Symbol'), (1, (self.name,)))
+
+	def __str__(self):
+		return str(self.name)
+
+	def __repr__(self):
+		return str(self.name)
+
+
+class BooleanConstant(Expr):
+	"""TRUE or FALSE; use the module constants."""
+
+	__slots__ = ('value',)
+
+	def __new__(cls, value):
+		expr, created = intern_expr(cls, value, hash(value))
+		if created:
+			expr.value = value
+			expr._atoms = frozenset()
+		return expr
+
+	def __reduce__(self):
+		return (BooleanConstant, (self.value,))
+
+	def __nonzero__(self):
+		return self.value
+
+	def sort_key(self):
+		name = 'BooleanTrue' if self.value else 'BooleanFalse'
+		return ((5, 0, name), (0, ()))
+
+	def __str__(self):
+		return str(self.value)
+
+	__repr__ = __str__
+
+TRUE = BooleanConstant(True)
+FALSE = BooleanConstant(False)
+
+
+def as_expr(arg):
+	"""Convert python booleans to TRUE/FALSE."""
+	if arg is True:
+		return TRUE
+	if arg is False:
+		return FALSE
+	return arg
+
+
+class LatticeOp(Expr):
+	"""N-ary associative, commutative and idempotent operator
+	(base class of And and Or).
+
+	Like sympy: nested operators of the same class are flattened,
+	duplicated arguments are removed, the identity element is ignored,
+	the zero element absorbs the whole expression;
+	with no argument the identity is returned,
+	with 1 argument the argument itself is returned.
+	"""
+
+	__slots__ = ('argset', '_args')
+
+	zero = None
+	identity = None
+
+	def __new__(cls, *args):
+		argset = set()
+		for arg in args:
+			arg = as_expr(arg)
+			if arg is cls.zero:
+				return cls.zero
+			elif arg is cls.identity:
+				continue
+			elif type(arg) is cls:
+				argset.update(arg.argset)
+			else:
+				argset.add(arg)
+
+		if not argset:
+			return cls.identity
+		elif len(argset) == 1:
+			return argset.pop()
+
+		argset = frozenset(argset)
+		expr, created = intern_expr(cls, argset, hash((cls.__name__, argset)))
+		if created:
+			expr.argset = argset
+			expr._args = None
+		return expr
+
+	def __reduce__(self):
+		return (type(self), tuple(self.argset))
+
+	@property
+	def args(self):
+		"""Arguments, in the order of sympy.
+
+		:rtype: <tuple <Expr>>
+		"""
+		if self._args is None:
+			self._args = tuple(sorted(self.argset, key=Expr.order_key))
+		return self._args
+
+	def __repr__(self):
+		return "{}({})".format(
+			type(self).__name__, ", ".join(repr(arg) for arg in self.args)
+		)
+
+	__str__ = __repr__
+
+
+class And(LatticeOp):
+	"""Logical AND."""
+
+	__slots__ = ()
+
+	zero = FALSE
+	identity = TRUE
+
+
+class Or(LatticeOp):
+	"""Logical OR."""
+
+	__slots__ = ()
+
+	zero = TRUE
+	identity = FALSE
+
+
+class Not(Expr):
+	"""Logical NOT."""
+
+	__slots__ = ('arg',)
+
+	def __new__(cls, arg):
+		arg = as_expr(arg)
+		if isinstance(arg, BooleanConstant):
+			return FALSE if arg.value else TRUE
+		if type(arg) is Not:
+			return arg.arg
+
+		expr, created = intern_expr(cls, arg, hash(('Not', arg)))
+		if created:
+			expr.arg = arg
+		return expr
+
+	def __reduce__(self):
+		return (Not, (self.arg,))
+
+	@property
+	def args(self):
+		return (self.arg,)
+
+	def __repr__(self):
+		return "Not({!r})".format(self.arg)
+
+	__str__ = __repr__
+
+
+def to_sympy(expr):
+	"""Convert an expression to sympy.
+
+	:param expr: Expression built with this module.
+	:type expr: <Expr>
+	:rtype: <sympy.logic.boolalg.Boolean>
+	"""
+	import sympy
+
+	converted = dict()
+	stack = [expr]
+	while stack:
+		node = stack[-1]
+		if node in converted:
+			stack.pop()
+			continue
+		pending = [arg for arg in node.args if arg not in converted]
+		if pending:
+			stack.extend(pending)
+			continue
+
+		stack.pop()
+		if isinstance(node, Symbol):
+			converted[node] = sympy.Symbol(node.name)
+		elif isinstance(node, BooleanConstant):
+			converted[node] = sympy.true if node.value else sympy.false
+		elif isinstance(node, Not):
+			converted[node] = sympy.Not(converted[node.arg])
+		else:
+			operator = sympy.And if isinstance(node, And) else sympy.Or
+			converted[node] = operator(*[converted[arg] for arg in node.args])
+	return converted[expr]
+
+
+def from_sympy(sympy_expr):
+	"""Convert a sympy boolean expression.
+
+	:param sympy_expr: Expression made of sympy Symbols, And, Or, Not
+		and boolean constants.
+	:type sympy_expr: <sympy.logic.boolalg.Boolean>
+	:rtype: <Expr>
+	"""
+	import sympy
+
+	if sympy_expr == True:
+		return TRUE
+	if sympy_expr == False:
+		return FALSE
+	if isinstance(sympy_expr, sympy.Symbol):
+		return Symbol(sympy_expr.name)
+	if isinstance(sympy_expr, sympy.Not):
+		return Not(from_sympy(sympy_expr.args[0]))
+	if isinstance(sympy_expr, sympy.And):
+		return And(*[from_sympy(arg) for arg in sympy_expr.args])
+	if isinstance(sympy_expr, sympy.Or):
+		return Or(*[from_sympy(arg) for arg in sympy_expr.args])
+	raise TypeError("Unsupported sympy expression: {}".format(sympy_expr))
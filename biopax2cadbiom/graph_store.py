@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+This module provides a columnar copy of the graph of entities, reactions
+and controls (see :class:`GraphStore`), used by vectorized versions of the
+first passes of the conversion:
+
+	- addReactionToEntities() and getEntitiesUsedInReactions(): entities
+	  involved in reactions are flags of a boolean array,
+	- detectMembersUsedInEntities(): members of entities are an adjacency
+	  array,
+	- getPathwayToPhysicalEntities(): pairs of pathways and entities are
+	  deduplicated as integers.
+
+Entities and reactions are numbered by rows (their order in the dicts).
+Relations are stored as compressed sparse rows (CSR): the items of the
+row `i` are `indices[indptr[i]:indptr[i+1]]`; -1 is an unknown entity.
+
+.. note:: NumPy is required to create a store; it is an optional
+	dependency of the package.
+
+.. note:: The objects of :mod:`biopax2cadbiom.classes` remain the API of the
+	conversion: the 'membersUsed' attributes of entities are set like
+	detectMembersUsedInEntities() does. But their 'reactions' attributes
+	are NOT filled: the next passes only need to know if an entity is
+	involved in a reaction (see :meth:`GraphStore.get_used_entities`).
+"""
+
+from __future__ import print_function
+
+# Standard imports
+from itertools import izip, chain, count
+from operator import attrgetter, itemgetter
+from collections import defaultdict
+
+# Custom imports
+from biopax2cadbiom.classes import StringTable
+import biopax2cadbiom.commons as cm
+
+# NumPy is only required by the columnar store
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+LOGGER = cm.logger()
+
+
+def get_rows(rows, keys):
+	"""Get the rows of the given keys.
+
+	.. note:: All the lookups are made by itemgetter() (in C code);
+		a KeyError is raised if a key is unknown.
+
+	:param rows: Rows of keys.
+	:param keys: Keys.
+	:type rows: <dict <str>: <int>>
+	:type keys: <list <str>>
+	:return: Rows of keys.
+	:rtype: <tuple <int>>
+	"""
+	if len(keys) == 1:
+		# PS: itemgetter() returns a single value for 1 key
+		return (rows[keys[0]],)
+	return itemgetter(*keys)(rows) if keys else ()
+
+
+def get_indptr(values):
+	"""Get the index pointers of the compressed sparse rows of the given
+	values (the row `i` is made of the items of `values[i]`).
+
+	:param values: Iterables (sets of uris for example).
+	:type values: <list>
+	:return: Array of len(values) + 1 positions.
+	:rtype: <numpy.ndarray>
+	"""
+	indptr = np.zeros(len(values) + 1, dtype=np.int64)
+	np.cumsum(map(len, values), out=indptr[1:])
+	return indptr
+
+
+class GraphStore(object):
+	"""Columnar copy of entities, reactions and controls.
+
+		Attributes:
+			entities	=> entity objects (by row)
+			entity_uris	=> uris of entities (by row)
+			involved	=> boolean array; True for entities involved in
+							reactions (participants or controllers)
+			participations	=> arrays of entity rows and reaction rows
+							of the participants of reactions and of the
+							controllers of reactions (-1 for unknown
+							reactions)
+			members_indptr, members_indices	=> CSR of the members of
+							entities (in the iteration order of 'members')
+			members_used	=> boolean array; True for the items of
+							members_indices in 'membersUsed'
+							(see detect_members_used())
+			pathways	=> StringTable of the uris of pathways
+			pathways_indptr, pathways_indices	=> CSR of the pathways of
+							reactions
+
+	.. note:: Like addReactionToEntities(), a KeyError is raised if
+		a participant or a controller of a reaction is not an entity.
+
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param dictReaction: Dictionnary of biopax reactions,
+		created by the function query.getReactions()
+	:param dictControl: Dictionnary of biopax controls,
+		created by the function query.getControls()
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+	:type dictReaction: <dict <str>: <Reaction>>
+	:type dictControl: <dict <str>: <Control>>
+	"""
+
+	def __init__(self, dictPhysicalEntity, dictReaction, dictControl):
+		if np is None:
+			LOGGER.error("The package numpy is required by the columnar store")
+			raise ImportError("No module named numpy")
+
+		self.entity_uris = dictPhysicalEntity.keys()
+		self.entities = dictPhysicalEntity.values()
+		entity_rows = dict(izip(self.entity_uris, count()))
+		# PS: None is not an entity
+		entity_rows[None] = -1
+		reaction_rows = dict(izip(dictReaction.iterkeys(), count()))
+		reaction_ids = np.arange(len(reaction_rows), dtype=np.int64)
+
+		# PS: Attributes are read by map() and attrgetter() (in C code);
+		# they are not zipped: new tuples would trigger the garbage collector
+		reactions = dictReaction.values()
+		lefts, rights, products, participants, pathways = (
+			map(attrgetter(attribute), reactions)
+			for attribute in ('leftComponents', 'rightComponents',
+							  'productComponent', 'participantComponent',
+							  'pathways')
+		)
+
+		# Participants of reactions, then controllers of reactions
+		controls = [control for control in dictControl.itervalues()
+						if control.controller is not None and \
+							control.reaction is not None]
+		controllers = map(attrgetter('controller'), controls)
+		controlled = map(attrgetter('reaction'), controls)
+
+		entities = get_rows(entity_rows, list(chain(
+			chain.from_iterable(lefts), chain.from_iterable(rights),
+			products, participants, controllers
+		)))
+		entities = np.fromiter(entities, np.int64, len(entities))
+		entity_reactions = np.concatenate((
+			np.repeat(reaction_ids, map(len, lefts)),
+			np.repeat(reaction_ids, map(len, rights)),
+			reaction_ids,
+			reaction_ids,
+			np.array([reaction_rows.get(uri, -1) for uri in controlled],
+					 dtype=np.int64),
+		))
+		known = entities >= 0
+		self.participations = (entities[known], entity_reactions[known])
+		self.involved = np.zeros(len(self.entities), dtype=bool)
+		self.involved[self.participations[0]] = True
+
+		# Members of entities
+		members = map(attrgetter('members'), self.entities)
+		self.members_indptr = get_indptr(members)
+		self.members_indices = np.array(
+			[entity_rows.get(uri, -1) for uri in chain.from_iterable(members)],
+			dtype=np.int64
+		)
+		self.members_used = None
+
+		# Pathways of reactions
+		self.pathways = StringTable()
+		self.pathways_indptr = get_indptr(pathways)
+		self.pathways_indices = np.array(
+			map(self.pathways.add, chain.from_iterable(pathways)),
+			dtype=np.int64
+		)
+
+	def detect_members_used(self, convertFullGraph=False):
+		"""Set the attribute 'membersUsed' of entities
+		(see detectMembersUsedInEntities()).
+
+		.. note:: As in detectMembersUsedInEntities(), only the first member
+			involved in a reaction (in the iteration order of 'members')
+			is used; the entity itself represents the other members.
+
+		:param convertFullGraph: (optional) All members are used.
+		:type convertFullGraph: <bool>
+		"""
+
+		indices = self.members_indices
+
+		if convertFullGraph:
+			for entity in self.entities:
+				entity.membersUsed = entity.members
+			self.members_used = np.ones(len(indices), dtype=bool)
+			return
+
+		# First member involved in a reaction, in each row
+		involved_members = indices >= 0
+		involved_members[involved_members] = \
+			self.involved[indices[involved_members]]
+		positions = np.flatnonzero(involved_members)
+		rows, first = np.unique(
+			np.searchsorted(self.members_indptr, positions, side='right') - 1,
+			return_index=True
+		)
+		positions = positions[first]
+		self.members_used = np.zeros(len(indices), dtype=bool)
+		self.members_used[positions] = True
+
+		first_members = dict(izip(rows.tolist(), indices[positions].tolist()))
+		for row in np.flatnonzero(np.diff(self.members_indptr)).tolist():
+			entity = self.entities[row]
+			member_row = first_members.get(row)
+			if member_row is not None:
+				entity.membersUsed.add(self.entity_uris[member_row])
+			# The entity represents all the members not used
+			if len(entity.members) != len(entity.membersUsed):
+				entity.membersUsed.add(entity.uri)
+
+	def get_used_entities(self):
+		"""Get uris of entities that can reach transitions or their conditions
+		(see getEntitiesUsedInReactions()).
+
+		.. note:: detect_members_used() must be called before.
+
+		:return: Set of uris.
+		:rtype: <set <str>>
+		"""
+
+		indices = self.members_indices
+		sizes = np.diff(self.members_indptr)
+
+		used = self.involved.copy()
+		frontier = np.flatnonzero(used)
+		while len(frontier):
+			# Used members of the entities of the frontier
+			rows = np.zeros(len(used), dtype=bool)
+			rows[frontier] = True
+			members = indices[np.repeat(rows, sizes) & self.members_used]
+			members = members[members >= 0]
+			frontier = np.unique(members[~used[members]])
+			used[frontier] = True
+
+		uris = self.entity_uris
+		return {uris[row] for row in np.flatnonzero(used).tolist()}
+
+	def get_pathway_to_physical_entities(self):
+		"""Get the entities involved in each pathway
+		(see getPathwayToPhysicalEntities()).
+
+		:returns: pathwayToPhysicalEntities
+			keys: pathway uris; values set of entities involved in the pathway.
+		:rtype: <dict <str>: <set>>
+		"""
+
+		# PS: Like getPathwayToPhysicalEntities(), pathways whose reactions
+		# have no participant have no entity
+		pathwayToPhysicalEntities = defaultdict(
+			set, ((pathway, set()) for pathway in self.pathways.strings)
+		)
+
+		entities, reactions = self.participations
+		known = reactions >= 0
+		entities, reactions = entities[known], reactions[known]
+
+		# Pairs (pathway, entity) for each pathway of each reaction
+		counts = np.diff(self.pathways_indptr)[reactions]
+		starts = self.pathways_indptr[reactions] - (np.cumsum(counts) - counts)
+		pathways = self.pathways_indices[
+			np.repeat(starts, counts) + np.arange(counts.sum())
+		]
+		entities = np.repeat(entities, counts)
+
+		# Distinct pairs, sorted by pathway
+		nb_entities = len(self.entities)
+		pathways, entities = np.divmod(
+			np.unique(pathways * nb_entities + entities), nb_entities
+		)
+		if not len(pathways):
+			return pathwayToPhysicalEntities
+
+		bounds = np.flatnonzero(np.diff(pathways)) + 1
+		uris = np.array(self.entity_uris, dtype=object)[entities]
+		for pathway, group in izip(
+				pathways[np.concatenate(([0], bounds))].tolist(),
+				np.split(uris, bounds)):
+			pathwayToPhysicalEntities[self.pathways.get(pathway)] = \
+				set(group.tolist())
+
+		return pathwayToPhysicalEntities
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+"""
+This module is used to encode names of entities according to cadbiom rules,
+and to reuse the names assigned during a previous conversion.
+
+Names are cleaned with translation tables built once at import time,
+instead of a regular expression applied on each name.
+
+The names cache is a file that stores the names assigned to the entities
+and a digest of the data used to build them (names, synonyms, locations
+and types of the entities). If the digest is unchanged, the names are
+reused as is, and the resolution of collisions between names is skipped.
+"""
+
+from __future__ import print_function
+
+# Standard imports
+import hashlib
+import string
+import dill
+
+# Custom imports
+import biopax2cadbiom.commons as cm
+
+LOGGER = cm.logger()
+
+# Characters allowed in cadbiom names; others are replaced by '_'
+ALLOWED_CHARACTERS = string.ascii_letters + string.digits + '_'
+
+# Translation table for <str> names (1 character per byte)
+STR_TABLE = ''.join(
+	char if char in ALLOWED_CHARACTERS else '_'
+	for char in map(chr, range(256))
+)
+
+
+class UnicodeTable(dict):
+	"""Translation table for <unicode> names.
+
+	Allowed characters are mapped to themselves; any other code point is
+	mapped to '_' (and is added to the table on its first lookup).
+	"""
+
+	def __init__(self):
+		super(UnicodeTable, self).__init__(
+			(ord(char), unicode(char)) for char in ALLOWED_CHARACTERS
+		)
+
+	def __missing__(self, code_point):
+		self[code_point] = u'_'
+		return u'_'
+
+UNICODE_TABLE = UnicodeTable()
+
+
+def clean_name(name):
+	"""Clean name for correct cadbiom parsing.
+
+	Characters other than letters, digits and '_' are replaced by '_'.
+
+	:param name: Name to be cleaned.
+	:type name: <str> or <unicode>
+	:return: Cleaned name (same type as the given name).
+	:rtype: <str> or <unicode>
+	"""
+
+	if isinstance(name, unicode):
+		return name.translate(UNICODE_TABLE)
+	return name.translate(STR_TABLE)
+
+
+def naming_digest(dictPhysicalEntity, dictLocation):
+	"""Get a digest of all the data used to name the given entities.
+
+	.. note:: Locations are taken into account through their cadbiom ids;
+		so this function must be called after numerotateLocations().
+
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param dictLocation: Dictionnary of biopax locations created by
+		query.getLocations().
+		keys: CellularLocationVocabulary uri; values: Location object
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:type dictLocation: <dict>
+	:return: Hexadecimal digest.
+	:rtype: <str>
+	"""
+
+	digest = hashlib.sha1()
+	for uri in sorted(dictPhysicalEntity):
+		entity = dictPhysicalEntity[uri]
+		location_id = dictLocation[entity.location].cadbiomId \
+			if entity.location else None
+		digest.update(repr((
+			uri,
+			entity.name,
+			sorted(entity.synonyms),
+			location_id,
+			entity.entityType,
+		)))
+		digest.update('\0')
+	return digest.hexdigest()
+
+
+def load_names_cache(filename, digest):
+	"""Load the names assigned during a previous conversion.
+
+	:param filename: Path of the names cache.
+	:param digest: Digest of the current data (see naming_digest()).
+	:type filename: <str>
+	:type digest: <str>
+	:return: Names of entities if the cache exists and was built from
+		the same data; None otherwise (a cache that can't be read is
+		ignored).
+		keys: uris; values: cadbiom names
+	:rtype: <dict <str>: <str>> or None
+	"""
+
+	try:
+		with open(filename, 'rb') as f_d:
+			cache = dill.load(f_d)
+	except IOError:
+		# No cache
+		return None
+	except Exception as e:
+		# Corrupted file or unknown format: unpickling errors are various
+		# (UnpicklingError, EOFError, ValueError, ImportError...)
+		LOGGER.warning("Names cache can't be read ({}: {}); names will be "
+					   "recomputed".format(e.__class__.__name__, e))
+		return None
+
+	if not isinstance(cache, dict) or 'names' not in cache:
+		LOGGER.warning("Names cache has an unknown format; names will be "
+					   "recomputed")
+		return None
+
+	if cache.get('digest') != digest:
+		LOGGER.info("Names cache is outdated; names will be recomputed")
+		return None
+	return cache['names']
+
+
+def save_names_cache(filename, digest, names):
+	"""Save the names assigned to entities.
+
+	:param filename: Path of the names cache.
+	:param digest: Digest of the current data (see naming_digest()).
+	:param names: Names of entities.
+		keys: uris; values: cadbiom names
+	:type filename: <str>
+	:type digest: <str>
+	:type names: <dict <str>: <str>>
+	"""
+
+	with open(filename, 'wb') as f_d:
+		dill.dump({'digest': digest, 'names': names}, f_d)
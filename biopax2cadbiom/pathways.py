@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+This module is used to split the cadbiom model into one model per top-level
+pathway.
+
+Top-level pathways are the pathways that are not components of another
+pathway. A reaction belongs to the top-level pathways of all its pathways
+(found with the hierarchy of pathways); the transitions of a reaction are
+put in the models of these top-level pathways.
+"""
+
+from __future__ import print_function
+
+# Standard imports
+from collections import defaultdict
+
+# Custom imports
+from biopax2cadbiom.naming import clean_name
+import biopax2cadbiom.commons as cm
+
+LOGGER = cm.logger()
+
+
+def getTopLevelPathways(pathways, pathwayToSuperPathways):
+	"""Get the pathways of each top-level pathway (its sub-pathways at any
+	depth, and itself).
+
+	.. note:: Cycles in the hierarchy are not followed; pathways of a cycle
+		without other super pathway are not top-level pathways.
+
+	:param pathways: Uris of all pathways.
+	:param pathwayToSuperPathways: Direct super pathways of pathways,
+		created by query.getPathwayAncestorsHierarchy().
+	:type pathways: <set <str>>
+	:type pathwayToSuperPathways: <dict <str>: <set <str>>>
+	:return: Pathways of each top-level pathway.
+		keys: top-level pathway uris; values: pathway uris
+	:rtype: <dict <str>: <set <str>>>
+	"""
+
+	pathways = set(pathways) | set(pathwayToSuperPathways)
+	pathwayToSubPathways = defaultdict(set)
+	for pathway, super_pathways in pathwayToSuperPathways.iteritems():
+		for super_pathway in super_pathways:
+			pathwayToSubPathways[super_pathway].add(pathway)
+			pathways.add(super_pathway)
+
+	topLevelPathways = dict()
+	for top_pathway in pathways:
+		if pathwayToSuperPathways.get(top_pathway):
+			continue
+
+		sub_pathways = {top_pathway}
+		stack = [top_pathway]
+		while stack:
+			for sub_pathway in pathwayToSubPathways[stack.pop()]:
+				if sub_pathway not in sub_pathways:
+					sub_pathways.add(sub_pathway)
+					stack.append(sub_pathway)
+
+		topLevelPathways[top_pathway] = sub_pathways
+
+	LOGGER.info("Top-level pathways: {}".format(len(topLevelPathways)))
+	return topLevelPathways
+
+
+def splitTransitionsByPathway(dictTransition, dictReaction, topLevelPathways):
+	"""Split the transitions of the model according to the top-level
+	pathways of their reactions.
+
+	.. note:: The transitions of a reaction that belongs to several
+		top-level pathways are in all their models; events of a transition
+		merged in the full model may be in different models.
+
+	:param dictTransition: Dictionnary of transitions
+		(see biopax_converter.getTransitions()).
+	:param dictReaction: Dictionnary of biopax reactions.
+	:param topLevelPathways: Pathways of each top-level pathway
+		(see getTopLevelPathways()).
+	:type dictTransition: <dict <tuple <str>, <str>>: <list <Transition>>>
+	:type dictReaction: <dict <str>: <Reaction>>
+	:type topLevelPathways: <dict <str>: <set <str>>>
+	:return: Transitions of each top-level pathway, and the number of
+		transitions of reactions outside of all pathways.
+		keys: top-level pathway uris; values: dictionnaries of transitions
+	:rtype: <tuple <dict <str>: <dict>>, <int>>
+	"""
+
+	pathwayToTopLevelPathways = defaultdict(set)
+	for top_pathway, pathways in topLevelPathways.iteritems():
+		for pathway in pathways:
+			pathwayToTopLevelPathways[pathway].add(top_pathway)
+
+	# Top-level pathways of reactions, computed once per reaction
+	reactionToTopLevelPathways = dict()
+	def get_top_level_pathways(reaction_uri):
+		"""Get the top-level pathways of a reaction"""
+		try:
+			return reactionToTopLevelPathways[reaction_uri]
+		except KeyError:
+			pass
+
+		reaction = dictReaction.get(reaction_uri)
+		top_pathways = set()
+		if reaction is not None:
+			for pathway in reaction.pathways:
+				top_pathways |= pathwayToTopLevelPathways[pathway]
+		reactionToTopLevelPathways[reaction_uri] = top_pathways
+		return top_pathways
+
+	pathwaysTransitions = {
+		top_pathway: defaultdict(list) for top_pathway in topLevelPathways
+	}
+	nb_unassigned = 0
+	for left_right, transitions in dictTransition.iteritems():
+		for transition in transitions:
+			top_pathways = get_top_level_pathways(transition.reaction)
+			if not top_pathways:
+				nb_unassigned += 1
+			for top_pathway in top_pathways:
+				pathwaysTransitions[top_pathway][left_right].append(transition)
+
+	if nb_unassigned:
+		LOGGER.warning("{} transitions of reactions without pathway are not "
+					   "in the models of pathways".format(nb_unassigned))
+	return pathwaysTransitions, nb_unassigned
+
+
+def getPathwayModelPaths(root, extension, pathways, dictPathwayName):
+	"""Get the path of the model of each pathway.
+
+	Paths are made of the cleaned name of pathways (or of the end of their
+	uri); pathways with the same name are numbered in the order of their uris:
+
+		<root>_<name><extension>, <root>_<name>_2<extension>, ...
+
+	:param root: Root of the path of the full model.
+	:param extension: Extension of the path of the full model
+		(see cadbiom_writer.splitModelPath()).
+	:param pathways: Uris of pathways.
+	:param dictPathwayName: Names of pathways created by query.getPathways().
+		keys: pathway uris; values: names
+	:type root: <str>
+	:type extension: <str>
+	:type pathways: <iterable <str>>
+	:type dictPathwayName: <dict <str>: <str>>
+	:return: Paths of models; keys: pathway uris; values: paths
+	:rtype: <dict <str>: <str>>
+	"""
+
+	paths = dict()
+	# Names already used (file systems may be case-insensitive)
+	used_names = set()
+	for pathway in sorted(pathways):
+		name = dictPathwayName.get(pathway) or pathway
+		if name == pathway:
+			# No name: the uri is used
+			name = pathway.rsplit("#", 1)[-1].rsplit("/", 1)[-1]
+
+		name = clean_name(name)
+		unique_name = name
+		number = 1
+		while unique_name.lower() in used_names:
+			number += 1
+			unique_name = name + "_" + str(number)
+		used_names.add(unique_name.lower())
+		paths[pathway] = root + "_" + unique_name + extension
+
+	return paths
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+This module is used to find the Strongly Connected Components (SCC) of the
+graph of transitions that block the cadbiom solver.
+
+A frontier SCC is a cycle of places that can never be activated: every
+transition that enters it from outside is disabled while the places of the
+SCC are inactive. Only 1 start node in each frontier SCC is sufficient to
+suppress it from the model.
+
+.. note:: This is the analysis made by cadbiom
+	(StaticAnalyzer.get_frontier_scc()), computed on the transitions in
+	memory instead of a model file.
+"""
+
+from __future__ import print_function
+
+# Standard imports
+from collections import defaultdict
+
+# Custom imports
+from biopax2cadbiom import conditions
+import biopax2cadbiom.commons as cm
+
+LOGGER = cm.logger()
+
+
+def getStronglyConnectedComponents(graph):
+	"""Get the strongly connected components of a directed graph.
+
+	.. note:: Iterative version of the Tarjan's algorithm: the depth of the
+		graph is not limited by the recursion limit of Python.
+
+	:param graph: Successors of each node.
+		All nodes must be keys of the dict.
+	:type graph: <dict <str>: <set <str>>>
+	:return: Generator of strongly connected components.
+	:rtype: <generator <set <str>>>
+	"""
+
+	index = dict()
+	lowlink = dict()
+	stack = list()
+	on_stack = set()
+	counter = 0
+
+	for root in graph:
+		if root in index:
+			continue
+
+		index[root] = lowlink[root] = counter
+		counter += 1
+		stack.append(root)
+		on_stack.add(root)
+		# Nodes being explored, with the iterator on their successors
+		path = [(root, iter(graph[root]))]
+
+		while path:
+			node, successors = path[-1]
+
+			for successor in successors:
+				if successor not in index:
+					index[successor] = lowlink[successor] = counter
+					counter += 1
+					stack.append(successor)
+					on_stack.add(successor)
+					path.append((successor, iter(graph[successor])))
+					break
+				elif successor in on_stack:
+					lowlink[node] = min(lowlink[node], index[successor])
+			else:
+				# All successors are explored
+				path.pop()
+				if path:
+					parent = path[-1][0]
+					lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+				if lowlink[node] == index[node]:
+					# node is the root of a SCC
+					scc = set()
+					while True:
+						member = stack.pop()
+						on_stack.remove(member)
+						scc.add(member)
+						if member == node:
+							break
+					yield scc
+
+
+def estimateCondition(condition, inactive_places):
+	"""Estimate if a condition is True (1), False (-1) or indeterminate (0)
+	when the given places are inactive and the other places are unknown.
+
+	:param condition: Condition of a transition.
+	:param inactive_places: Names of inactive places.
+	:type condition: <biopax2cadbiom.conditions.Expr>
+	:type inactive_places: <set <str>>
+	:rtype: <int>
+	"""
+
+	if isinstance(condition, conditions.Symbol):
+		return -1 if condition.name in inactive_places else 0
+	elif isinstance(condition, conditions.BooleanConstant):
+		return 1 if condition.value else -1
+	elif isinstance(condition, conditions.Not):
+		return -estimateCondition(condition.arg, inactive_places)
+	elif isinstance(condition, conditions.And):
+		return min(estimateCondition(arg, inactive_places)
+				   for arg in condition.args)
+	elif isinstance(condition, conditions.Or):
+		return max(estimateCondition(arg, inactive_places)
+				   for arg in condition.args)
+
+	raise TypeError("Unknown condition: " + repr(condition))
+
+
+def getFrontierSCCs(dictTransition):
+	"""Get the frontier strongly connected components of the model.
+
+	A SCC (of more than 1 place) is a frontier if no transition coming from
+	outside may be fired while the places of the SCC are inactive:
+	its condition is estimated to False (see estimateCondition());
+	the events of transitions are never True.
+
+	:param dictTransition: Dictionnary of transitions and their respective
+		set of events (see createCadbiomFile()).
+	:type dictTransition: <dict <tuple <str>, <str>>: <list <Transition>>>
+		or a store of transitions (see :mod:`biopax2cadbiom.transition_store`)
+	:return: Frontier SCCs; places of each SCC are sorted in lexicographic
+		order (case insensitive), SCCs are sorted on their first place.
+	:rtype: <list <list <str>>>
+	"""
+
+	def get_condition(condition):
+		"""Get the condition of a transition (built with the module
+		conditions or with sympy)"""
+		condition = conditions.as_expr(condition)
+		if isinstance(condition, conditions.Expr):
+			return condition
+		return conditions.from_sympy(condition)
+
+	# Graph of transitions (reflexive transitions are not taken into account)
+	# PS: Only ori/ext nodes are read here: the conditions are read later,
+	# and only for the transitions that enter a SCC.
+	graph = defaultdict(set)
+	predecessors = defaultdict(set)
+	for left_entity, right_entity in dictTransition.iterkeys():
+		if left_entity == right_entity:
+			continue
+		graph[left_entity].add(right_entity)
+		predecessors[right_entity].add(left_entity)
+
+	# All nodes must be keys of the graph
+	graph = dict(graph)
+	for node in predecessors:
+		graph.setdefault(node, set())
+
+	frontier_sccs = list()
+	for scc in getStronglyConnectedComponents(graph):
+		# Eliminate isolated nodes
+		if len(scc) <= 1:
+			continue
+
+		# The SCC is not a frontier if a transition coming from outside
+		# may be fired (at least 1 of its events with a condition that is
+		# not False)
+		if not any(
+				estimateCondition(get_condition(transition.sympyCond), scc) >= 0
+				for node in scc
+				for left_entity in predecessors[node] - scc
+				for transition in dictTransition[left_entity, node]):
+			frontier_sccs.append(
+				sorted(scc, key=lambda name: (name.lower(), name))
+			)
+
+	frontier_sccs.sort(key=lambda scc: (scc[0].lower(), scc[0]))
+
+	LOGGER.info("{} SCC found: {}".format(len(frontier_sccs), frontier_sccs))
+	return frontier_sccs
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+"""
+This module is used to split the graph of reactions into independent shards.
+
+Reactions and entities are linked by:
+
+	- the participants of reactions (left, right, product, participant),
+	- the controllers of reactions,
+	- the components of complexes and the members of classes.
+
+Connected components of this graph can be converted independently
+(conditions and transitions of a reaction only use the entities of its
+component); they are packed into shards of similar sizes that are
+handled by different processes.
+"""
+
+from __future__ import print_function
+
+# Custom imports
+import biopax2cadbiom.commons as cm
+
+LOGGER = cm.logger()
+
+
+class UnionFind(object):
+	"""Disjoint sets of hashable items (with path halving and union by size).
+	"""
+
+	def __init__(self):
+		self.parents = dict()
+		self.sizes = dict()
+
+	def find(self, item):
+		"""Get the representative of the set of the given item
+		(the item is added if it is unknown)."""
+		parents = self.parents
+		if item not in parents:
+			parents[item] = item
+			self.sizes[item] = 1
+			return item
+
+		while parents[item] != item:
+			parents[item] = parents[parents[item]]
+			item = parents[item]
+		return item
+
+	def union(self, item1, item2):
+		"""Merge the sets of the given items."""
+		root1 = self.find(item1)
+		root2 = self.find(item2)
+		if root1 == root2:
+			return
+		if self.sizes[root1] < self.sizes[root2]:
+			root1, root2 = root2, root1
+		self.parents[root2] = root1
+		self.sizes[root1] += self.sizes.pop(root2)
+
+	def groups(self):
+		"""Get the sets of items.
+
+		:return: keys: representatives; values: lists of items
+		:rtype: <dict <list>>
+		"""
+		groups = dict()
+		for item in self.parents:
+			groups.setdefault(self.find(item), list()).append(item)
+		return groups
+
+
+def getConnectedComponents(dictReaction, dictPhysicalEntity):
+	"""Get the connected components of the graph of reactions and entities.
+
+	:param dictReaction: Dictionnary of biopax reactions,
+		created by the function query.getReactions()
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:type dictReaction: <dict <str>: <Reaction>>
+		keys: uris; values reaction objects
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+		keys: uris; values entity objects
+	:return: List of tuples (reaction uris, entity uris); reactions are in
+		the order of dictReaction; components with no reaction are ignored.
+	:rtype: <list <tuple <list <str>>, <list <str>>>>
+	"""
+
+	# Reactions and entities have different uris; they share the same sets
+	union_find = UnionFind()
+
+	for reaction_uri, reaction in dictReaction.iteritems():
+		union_find.find(reaction_uri)
+		participants = reaction.leftComponents | reaction.rightComponents
+		participants |= {
+			entity_uri
+			for entity_uri in (reaction.productComponent,
+							   reaction.participantComponent)
+			if entity_uri is not None
+		}
+		participants |= {control.controller for control in reaction.controllers}
+
+		for entity_uri in participants:
+			union_find.union(reaction_uri, entity_uri)
+
+	for entity_uri, entity in dictPhysicalEntity.iteritems():
+		for sub_entity_uri in entity.components | entity.members:
+			union_find.union(entity_uri, sub_entity_uri)
+
+	components = dict()
+	for root, items in union_find.groups().iteritems():
+		components[root] = (
+			[item for item in items if item in dictReaction],
+			[item for item in items if item in dictPhysicalEntity],
+		)
+
+	# Keep the order of reactions in each component
+	reaction_rank = {uri: rank for rank, uri in enumerate(dictReaction)}
+	components = [
+		(sorted(reactions, key=reaction_rank.get), entities)
+		for reactions, entities in components.itervalues() if reactions
+	]
+	LOGGER.info("Connected components: {}".format(len(components)))
+	return components
+
+
+def packComponents(components, nb_shards):
+	"""Pack connected components into shards of similar sizes.
+
+	Components are placed from the biggest to the smallest into the
+	smallest shard (size: number of reactions and entities).
+
+	:param components: Connected components (see getConnectedComponents()).
+	:param nb_shards: Maximal number of shards.
+	:type components: <list <tuple <list <str>>, <list <str>>>>
+	:type nb_shards: <int>
+	:return: List of shards; each shard is a tuple (reaction uris, entity
+		uris); empty shards are removed.
+	:rtype: <list <tuple <list <str>>, <list <str>>>>
+	"""
+
+	shards = [(list(), list()) for _ in range(max(1, nb_shards))]
+	sizes = [0] * len(shards)
+
+	for reactions, entities in sorted(
+		components, key=lambda component: -len(component[0]) - len(component[1])):
+
+		index = sizes.index(min(sizes))
+		shards[index][0].extend(reactions)
+		shards[index][1].extend(entities)
+		sizes[index] += len(reactions) + len(entities)
+
+	shards = [shard for shard in shards if shard[0]]
+	LOGGER.info("Shards: {}; biggest shard: {} reactions and entities".format(
+		len(shards), max(sizes) if sizes else 0
+	))
+	return shards
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+This module is used to save/load the results of SPARQL queries in a
+flat snapshot file.
+
+Unlike the dill backup, objects are not pickled one by one: the file is
+memory-mapped, each section is a flat array of integers decoded in one call
+when it is used, and each distinct string is decoded only once, when it is
+used (strings are shared by the objects rebuilt from the snapshot).
+Pages of the file are read on demand, and they are shared in the page cache
+by the conversions that load the same snapshot.
+
+Format (little-endian):
+
+	- header: magic (8 bytes), version (uint32), number of sections (uint32)
+	- directory: for each section: name (32 bytes), typecode (1 byte),
+	  number of items (uint64), offset in the file (uint64)
+	- sections: flat arrays of integers; all strings are stored in
+	  a string table ('strings.blob' + 'strings.offsets'), other sections
+	  refer to them by their ids (-1 for None).
+
+Relations (synonyms, members, left, right...) are stored as adjacency lists
+with 2 sections: '<name>.indptr' and '<name>.indices'
+(compressed sparse rows: the items of the row `i` are
+`indices[indptr[i]:indptr[i+1]]`).
+
+.. note:: The objects of :mod:`biopax2cadbiom.classes` are still rebuilt by
+	load_snapshot(): the passes of the conversion work on them and modify
+	them. Only the raw data of the file is shared between processes; the
+	memory of the objects is not.
+"""
+
+from __future__ import print_function
+
+# Standard imports
+import json
+import mmap
+import struct
+from array import array
+from itertools import chain, izip
+
+# Custom imports
+from biopax2cadbiom.classes import PhysicalEntity, Reaction, Location, \
+	Control, StringTable
+import biopax2cadbiom.commons as cm
+
+LOGGER = cm.logger()
+
+MAGIC = b'B2CSNAP\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+SECTION = struct.Struct('<32scQQ')
+# Items are written by blocks of this size
+CHUNK_SIZE = 65536
+
+
+class SnapshotError(Exception):
+	"""Raised when a snapshot file can't be loaded."""
+	pass
+
+
+class Snapshot(object):
+	"""Snapshot of the results of SPARQL queries.
+
+	The file is memory-mapped when the object is created; only its header
+	and its directory are read. Sections are decoded by :meth:`section`,
+	strings by :meth:`string`.
+
+	:Use:
+
+		>>> with Snapshot('backup.snap') as snapshot:
+		...     dictPhysicalEntity, dictReaction, dictLocation, dictControl, \\
+		...     blacklisted_entities, params = snapshot.to_dicts()
+	"""
+
+	def __init__(self, filename):
+		with open(filename, 'rb') as fd:
+			try:
+				self.data = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+			except ValueError:
+				# Empty file
+				raise SnapshotError("Not a snapshot file: " + filename)
+
+		try:
+			self.read_directory(filename)
+		except SnapshotError:
+			self.close()
+			raise
+
+		# Strings already decoded (id => string);
+		# PS: the id -1 gives None
+		self.strings = {-1: None}
+		# Offsets of strings in the blob (decoded with the first string)
+		self.offsets = None
+		_, _, self.blob_offset = self.directory['strings.blob']
+
+	def read_directory(self, filename):
+		"""Check the header and read the directory of sections."""
+		if len(self.data) < HEADER.size:
+			raise SnapshotError("Not a snapshot file: " + filename)
+		magic, version, nb_sections = HEADER.unpack_from(self.data, 0)
+		if magic != MAGIC:
+			raise SnapshotError("Not a snapshot file: " + filename)
+		if version != VERSION:
+			raise SnapshotError(
+				"Unsupported snapshot version {} (expected {}): {}".format(
+					version, VERSION, filename
+				)
+			)
+
+		# Name of the section => (typecode, number of items, offset)
+		self.directory = dict()
+		for i in xrange(nb_sections):
+			name, typecode, length, offset = SECTION.unpack_from(
+				self.data, HEADER.size + i * SECTION.size
+			)
+			name = name.rstrip(b'\x00').decode('ascii')
+			self.directory[name] = (typecode.decode('ascii'), length, offset)
+
+	def close(self):
+		"""Unmap the file; objects already rebuilt are not affected."""
+		self.data.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def section(self, name):
+		"""Return the integers of the given section (decoded in one call).
+
+		:rtype: <tuple <int>>
+		"""
+		typecode, length, offset = self.directory[name]
+		return struct.unpack_from(
+			'<{}{}'.format(length, typecode), self.data, offset
+		)
+
+	def decode_strings(self, string_ids):
+		"""Decode the strings of the given ids (if not already decoded)."""
+		strings = self.strings
+		string_ids = set(string_ids).difference(strings)
+		if not string_ids:
+			return
+		if self.offsets is None:
+			self.offsets = self.section('strings.offsets')
+
+		offsets, data, blob_offset = self.offsets, self.data, self.blob_offset
+		for string_id in string_ids:
+			strings[string_id] = data[
+				blob_offset + offsets[string_id]:
+				blob_offset + offsets[string_id + 1]
+			].decode('utf-8')
+
+	def string(self, string_id):
+		"""Return the string of the given id (decoded once).
+
+		:rtype: <unicode> or None
+		"""
+		self.decode_strings((string_id,))
+		return self.strings[string_id]
+
+	def column(self, name):
+		"""Return the list of strings of the given section of string ids."""
+		string_ids = self.section(name)
+		self.decode_strings(string_ids)
+		return map(self.strings.__getitem__, string_ids)
+
+	def adjacency(self, name):
+		"""Return the list of tuples of strings of the given relation."""
+		indptr = self.section(name + '.indptr')
+		indices = self.column(name + '.indices')
+		return [
+			tuple(indices[start:stop])
+			for start, stop in izip(indptr, indptr[1:])
+		]
+
+	def to_dicts(self):
+		"""Rebuild the objects saved in the snapshot.
+
+		:return: dictPhysicalEntity, dictReaction, dictLocation, dictControl,
+			blacklisted_entities, params
+		:rtype: <tuple>
+		"""
+		dictPhysicalEntity = dict()
+		for uri, name, location, entityType, entityRef, \
+			synonyms, components, members in izip(
+				self.column('entity.uri'),
+				self.column('entity.name'),
+				self.column('entity.location'),
+				self.column('entity.type'),
+				self.column('entity.ref'),
+				self.adjacency('entity.synonyms'),
+				self.adjacency('entity.components'),
+				self.adjacency('entity.members')):
+
+			# The setter of entityType expects a full uri
+			entity = PhysicalEntity(
+				uri, name, location, '#' + entityType, entityRef
+			)
+			entity.synonyms.update(synonyms)
+			entity.components.update(components)
+			entity.members.update(members)
+			dictPhysicalEntity[uri] = entity
+
+		dictReaction = dict()
+		for uri, name, reactiontype, productComponent, participantComponent, \
+			left, right, pathways in izip(
+				self.column('reaction.uri'),
+				self.column('reaction.name'),
+				self.column('reaction.type'),
+				self.column('reaction.product'),
+				self.column('reaction.participant'),
+				self.adjacency('reaction.left'),
+				self.adjacency('reaction.right'),
+				self.adjacency('reaction.pathways')):
+
+			reaction = Reaction(
+				uri, name, '#' + reactiontype,
+				productComponent, participantComponent
+			)
+			reaction.leftComponents.update(left)
+			reaction.rightComponents.update(right)
+			reaction.pathways.update(pathways)
+			dictReaction[uri] = reaction
+
+		dictLocation = dict()
+		for uri, name, idRefs in izip(
+				self.column('location.uri'),
+				self.column('location.name'),
+				self.adjacency('location.idRefs')):
+
+			location = Location(uri, name)
+			# Pairs (idRef, dbRef) are flattened
+			location.idRefs.update(zip(idRefs[::2], idRefs[1::2]))
+			dictLocation[uri] = location
+
+		dictControl = dict()
+		for uri, classType, controlType, reaction, controller, \
+			evidences in izip(
+				self.column('control.uri'),
+				self.column('control.classType'),
+				self.column('control.controlType'),
+				self.column('control.reaction'),
+				self.column('control.controller'),
+				self.adjacency('control.evidences')):
+
+			control = Control(uri, classType, controlType, reaction, controller)
+			control.evidences.update(evidences)
+			dictControl[uri] = control
+
+		blacklisted_entities = set(self.column('blacklist'))
+		params = json.loads(self.column('params')[0])
+
+		return dictPhysicalEntity, dictReaction, dictLocation, dictControl, \
+			blacklisted_entities, params
+
+
+def write_snapshot(filename, dictPhysicalEntity, dictReaction, dictLocation,
+				   dictControl, blacklisted_entities, params):
+	"""Save the results of SPARQL queries in a snapshot file.
+
+	:param filename: Path of the snapshot.
+	:param dictPhysicalEntity: Dictionnary of biopax physicalEntities,
+		created by the function query.getPhysicalEntities()
+	:param dictReaction: Dictionnary of biopax reactions,
+		created by the function query.getReactions()
+	:param dictLocation: Dictionnary of biopax locations created by
+		query.getLocations().
+	:param dictControl: Dictionnary of biopax controls,
+		created by the function query.getControls()
+	:param blacklisted_entities: Set of uris of blacklisted entities.
+	:param params: Parameters of the conversion (must be JSON serializable).
+	:type filename: <str>
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+	:type dictReaction: <dict <str>: <Reaction>>
+	:type dictLocation: <dict <str>: <Location>>
+	:type dictControl: <dict <str>: <Control>>
+	:type blacklisted_entities: <set <str>>
+	:type params: <dict>
+	"""
+
+	strings = StringTable()
+	sections = list()
+
+	def add_column(name, values):
+		"""Add a section of string ids"""
+		sections.append((name, 'i', [strings.add(value) for value in values]))
+
+	def add_adjacency(name, rows):
+		"""Add the 2 sections of a relation"""
+		indptr = array('i', [0])
+		indices = array('i')
+		for row in rows:
+			indices.extend(strings.add(value) for value in row)
+			indptr.append(len(indices))
+		sections.append((name + '.indptr', 'i', indptr))
+		sections.append((name + '.indices', 'i', indices))
+
+	entities = dictPhysicalEntity.values()
+	add_column('entity.uri', (entity.uri for entity in entities))
+	add_column('entity.name', (entity.name for entity in entities))
+	add_column('entity.location', (entity.location for entity in entities))
+	add_column('entity.type', (entity.entityType for entity in entities))
+	add_column('entity.ref', (entity.entityRef for entity in entities))
+	add_adjacency('entity.synonyms', (entity.synonyms for entity in entities))
+	add_adjacency('entity.components', (entity.components for entity in entities))
+	add_adjacency('entity.members', (entity.members for entity in entities))
+
+	reactions = dictReaction.values()
+	add_column('reaction.uri', (reaction.uri for reaction in reactions))
+	add_column('reaction.name', (reaction.name for reaction in reactions))
+	add_column('reaction.type', (reaction.reactiontype for reaction in reactions))
+	add_column('reaction.product',
+			   (reaction.productComponent for reaction in reactions))
+	add_column('reaction.participant',
+			   (reaction.participantComponent for reaction in reactions))
+	add_adjacency('reaction.left',
+				  (reaction.leftComponents for reaction in reactions))
+	add_adjacency('reaction.right',
+				  (reaction.rightComponents for reaction in reactions))
+	add_adjacency('reaction.pathways',
+				  (reaction.pathways for reaction in reactions))
+
+	locations = dictLocation.values()
+	add_column('location.uri', (location.uri for location in locations))
+	add_column('location.name', (location.name for location in locations))
+	add_adjacency('location.idRefs',
+				  (chain.from_iterable(location.idRefs)
+				   for location in locations))
+
+	controls = dictControl.values()
+	add_column('control.uri', (control.uri for control in controls))
+	add_column('control.classType', (control.classType for control in controls))
+	add_column('control.controlType',
+			   (control.controlType for control in controls))
+	add_column('control.reaction', (control.reaction for control in controls))
+	add_column('control.controller',
+			   (control.controller for control in controls))
+	add_adjacency('control.evidences',
+				  (control.evidences for control in controls))
+
+	add_column('blacklist', blacklisted_entities)
+	add_column('params', [json.dumps(params, sort_keys=True)])
+
+	# String table: utf-8 blob and offsets of each string in the blob
+	encoded = [string.encode('utf-8') for string in strings.strings]
+	offsets = [0]
+	for string in encoded:
+		offsets.append(offsets[-1] + len(string))
+	sections.append(('strings.offsets', 'q', offsets))
+	blob = b''.join(encoded)
+
+	# Compute offsets of sections
+	offset = HEADER.size + SECTION.size * (len(sections) + 1)
+	directory = list()
+	for name, typecode, values in sections:
+		directory.append((name, typecode, len(values), offset))
+		offset += len(values) * struct.calcsize('<' + typecode)
+	directory.append(('strings.blob', 'B', len(blob), offset))
+
+	with open(filename, 'wb') as fd:
+		fd.write(HEADER.pack(MAGIC, VERSION, len(directory)))
+		for name, typecode, length, offset in directory:
+			fd.write(SECTION.pack(
+				name.encode('ascii'), typecode.encode('ascii'), length, offset
+			))
+		for _, typecode, values in sections:
+			for start in xrange(0, len(values), CHUNK_SIZE):
+				chunk = values[start:start + CHUNK_SIZE]
+				fd.write(struct.pack(
+					'<{}{}'.format(len(chunk), typecode), *chunk
+				))
+		fd.write(blob)
+
+	LOGGER.debug("Snapshot saved: {} strings, {} sections".format(
+		len(strings), len(directory)
+	))
+
+
+def load_snapshot(filename):
+	"""Load the results of SPARQL queries from a snapshot file.
+
+	:param filename: Path of the snapshot.
+	:type filename: <str>
+	:return: dictPhysicalEntity, dictReaction, dictLocation, dictControl,
+		blacklisted_entities, params
+	:rtype: <tuple>
+	"""
+
+	with Snapshot(filename) as snapshot:
+		return snapshot.to_dicts()
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+This module provides the stores of the transitions of the model
+(dictTransition of getTransitions()).
+
+Transitions are added one by one with add(); they are read by the writers
+grouped by ori/ext nodes, in the order of ori/ext nodes
+(see iterSortedTransitions()):
+
+	- :class:`MemoryTransitionStore`: dictionnary of lists of transitions
+	  (default),
+	- :class:`SQLiteTransitionStore`: transitions are stored in a temporary
+	  SQLite database; only a buffer of transitions (bounded by a memory
+	  budget) and the distinct conditions are kept in memory.
+
+Transitions are :class:`biopax2cadbiom.classes.Transition` objects with the
+attributes event, reaction and sympyCond.
+"""
+
+from __future__ import print_function
+
+# Standard imports
+import os
+import sqlite3
+import tempfile
+import itertools as it
+from collections import defaultdict
+
+# Custom imports
+from biopax2cadbiom.classes import Transition
+import biopax2cadbiom.commons as cm
+
+LOGGER = cm.logger()
+
+
+def iterSortedTransitions(dictTransition):
+	"""Get ori/ext nodes and their transitions, in the order of ori/ext nodes.
+
+	:param dictTransition: Store or dictionnary of transitions.
+	:type dictTransition: <MemoryTransitionStore>, <SQLiteTransitionStore>
+		or <dict <tuple <str>, <str>>: <list <Transition>>>
+	:return: Iterator of tuples (ori/ext nodes, transitions).
+	:rtype: <iterator <tuple <tuple <str>, <str>>, <list <Transition>>>>
+	"""
+
+	if hasattr(dictTransition, 'itersorted'):
+		return dictTransition.itersorted()
+	return ((left_right, dictTransition[left_right])
+				for left_right in sorted(dictTransition))
+
+
+class MemoryTransitionStore(defaultdict):
+	"""Transitions in memory.
+
+	keys: ori/ext nodes; values: lists of transitions
+	"""
+
+	def __init__(self, default_factory=list):
+		super(MemoryTransitionStore, self).__init__(default_factory)
+
+	def add(self, left_right, transition):
+		"""Add a transition."""
+		self[left_right].append(transition)
+
+	def itersorted(self):
+		"""Get ori/ext nodes and their transitions, in the order of
+		ori/ext nodes."""
+		for left_right in sorted(self):
+			yield left_right, self[left_right]
+
+	def close(self):
+		"""Nothing to release."""
+		pass
+
+
+class SQLiteTransitionStore(object):
+	"""Transitions stored in a temporary SQLite database.
+
+	Transitions are buffered in memory and inserted by batches.
+	Conditions are shared by many transitions (and interned, see
+	:mod:`biopax2cadbiom.conditions`): they stay in memory and
+	transitions only store their ids.
+
+	The API to read transitions is the one of a dictionnary of lists of
+	transitions (iteritems(), [], in, len()...); transitions are rebuilt for
+	each group of ori/ext nodes, so only one group is in memory at a time.
+
+	.. note:: Groups of transitions are read in the order of ori/ext nodes
+		(binary order of strings encoded in UTF-8, i.e. the order of their
+		code points); transitions of a group are in the order they were
+		added.
+
+	.. warning:: The database is deleted by close().
+
+	:param directory: (optional) Directory of the database; the temporary
+		directory of the system by default.
+	:param memory_budget: (optional) Memory (MB) used by the buffer of
+		transitions and by the cache of SQLite; 256 by default.
+	:type directory: <str>
+	:type memory_budget: <int>
+	"""
+
+	# Estimated memory of a buffered transition (tuple and its strings)
+	ROW_SIZE = 400
+
+	def __init__(self, directory=None, memory_budget=256):
+		fd, self.path = tempfile.mkstemp(
+			suffix='.transitions.sqlite', dir=directory
+		)
+		os.close(fd)
+
+		# Half of the budget for the buffer, half for the cache of SQLite
+		budget = max(1, memory_budget) * 1024 * 1024 // 2
+		self.buffer_size = max(1, budget // self.ROW_SIZE)
+		self.buffer = list()
+
+		self.connection = sqlite3.connect(self.path)
+		self.connection.executescript("""
+			PRAGMA journal_mode = OFF;
+			PRAGMA synchronous = OFF;
+			PRAGMA temp_store = FILE;
+			PRAGMA cache_size = -{};
+			CREATE TABLE transitions (
+				ori TEXT, ext TEXT, event TEXT, reaction TEXT, condition INTEGER
+			);
+		""".format(budget // 1024))
+		self.indexed = False
+
+		# Distinct conditions and their ids
+		self.conditions = list()
+		self.condition_ids = dict()
+
+		LOGGER.info("Transitions stored in " + self.path)
+
+	def add(self, left_right, transition):
+		"""Add a transition."""
+		condition = transition.sympyCond
+		condition_id = self.condition_ids.get(condition)
+		if condition_id is None:
+			condition_id = len(self.conditions)
+			self.condition_ids[condition] = condition_id
+			self.conditions.append(condition)
+
+		left_entity, right_entity = left_right
+		self.buffer.append((
+			left_entity, right_entity, transition.event,
+			transition.reaction, condition_id
+		))
+		if len(self.buffer) >= self.buffer_size:
+			self.flush()
+
+	def flush(self):
+		"""Insert the buffered transitions in the database."""
+		if not self.buffer:
+			return
+		with self.connection:
+			self.connection.executemany(
+				"INSERT INTO transitions VALUES (?, ?, ?, ?, ?)", self.buffer
+			)
+		self.buffer = list()
+
+	def select(self, query, parameters=()):
+		"""Flush the buffer and execute the given query.
+
+		.. note:: Ori/ext nodes are indexed before the first query
+			(faster than inserting transitions in an index).
+		"""
+		self.flush()
+		if not self.indexed:
+			self.connection.execute(
+				"CREATE INDEX ori_ext ON transitions (ori, ext)"
+			)
+			self.indexed = True
+		return self.connection.execute(query, parameters)
+
+	def make_transitions(self, rows):
+		"""Rebuild the transitions of the given rows."""
+		conditions = self.conditions
+		# Events and reactions are shared between the rebuilt transitions
+		strings = dict()
+		return [
+			Transition(
+				strings.setdefault(event, event),
+				strings.setdefault(reaction, reaction),
+				conditions[condition_id],
+			)
+			for _, _, event, reaction, condition_id in rows
+		]
+
+	def iteritems(self):
+		"""Get ori/ext nodes and their transitions, in the order of
+		ori/ext nodes."""
+		cursor = self.select(
+			"SELECT ori, ext, event, reaction, condition FROM transitions "
+			"ORDER BY ori, ext, rowid"
+		)
+		for left_right, rows in it.groupby(cursor, lambda row: row[:2]):
+			yield left_right, self.make_transitions(rows)
+
+	itersorted = iteritems
+
+	def iterkeys(self):
+		"""Get ori/ext nodes, in their order."""
+		return (tuple(row) for row in self.select(
+			"SELECT DISTINCT ori, ext FROM transitions ORDER BY ori, ext"
+		))
+
+	__iter__ = iterkeys
+
+	def itervalues(self):
+		"""Get the transitions of each ori/ext nodes."""
+		return (transitions for _, transitions in self.iteritems())
+
+	def __getitem__(self, left_right):
+		transitions = self.make_transitions(self.select(
+			"SELECT ori, ext, event, reaction, condition FROM transitions "
+			"WHERE ori = ? AND ext = ? ORDER BY rowid", left_right
+		))
+		if not transitions:
+			raise KeyError(left_right)
+		return transitions
+
+	def __contains__(self, left_right):
+		return self.select(
+			"SELECT 1 FROM transitions WHERE ori = ? AND ext = ? LIMIT 1",
+			left_right
+		).fetchone() is not None
+
+	def __len__(self):
+		return self.select(
+			"SELECT COUNT(*) FROM (SELECT DISTINCT ori, ext FROM transitions)"
+		).fetchone()[0]
+
+	def close(self):
+		"""Close and delete the database.
+
+		.. note:: close() is called in finally clauses: errors are logged
+			and not raised, so they do not mask the original error.
+		"""
+		try:
+			self.connection.close()
+		except sqlite3.Error as exc:
+			LOGGER.warning("Database {} can't be closed ({})".format(self.path, exc))
+		try:
+			os.remove(self.path)
+		except OSError as exc:
+			LOGGER.warning("Database {} can't be deleted ({})".format(self.path, exc))
@@ -0,0 +1,854 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+This module contains microbenchmarks of some steps of the conversion.
+
+Unless stated otherwise, data are synthetic (no SPARQL endpoint is needed).
+This file is not collected by pytest; run it with:
+
+	$ python -m test.benchmarks [backup_file [workers]]
+
+Benchmarks of the whole conversion need the backup of the queries of a test
+case (made with the options --pickleBackup --pickleDir of the command
+'model'). The largest test case is mycobacterium:
+
+	$ biopax2cadbiom model \\
+		--listOfGraphUri http://biopax.org/lvl3 http://reactome.org/mycobacterium \\
+		--fullCompartmentsNames --convertFullGraph \\
+		--pickleBackup --pickleDir mycobacterium.p
+
+"""
+
+from __future__ import print_function
+
+# Standard imports
+import copy
+import gc
+import os
+import multiprocessing as mp
+import random
+import resource
+import sys
+import tempfile
+import time
+import timeit
+import itertools as it
+import dill
+
+# Custom imports
+from biopax2cadbiom import biopax_converter as b2c
+from biopax2cadbiom import conditions
+from biopax2cadbiom.cadbiom_writer import createCadbiomFile, \
+	createJsonLinesFile, formatEventAndCond
+from biopax2cadbiom.classes import PhysicalEntity, Location, Reaction, \
+	Control, GeneEntity, Transition
+from biopax2cadbiom.snapshot import write_snapshot, load_snapshot
+from biopax2cadbiom.transition_store import MemoryTransitionStore, \
+	SQLiteTransitionStore
+
+
+def collision_set(nb_entities, nb_synonyms=200, max_synonyms=8, seed=0):
+	"""Build entities with the same name and overlapping synonyms.
+
+	This mimics generic names like "ATP" or "Ubiquitin", shared by thousands
+	of entities.
+
+	:param nb_entities: Number of entities sharing the same name.
+	:param nb_synonyms: Size of the pool of synonyms.
+	:param max_synonyms: Maximum number of synonyms per entity.
+	:param seed: Seed of the random generator.
+	:type nb_entities: <int>
+	:type nb_synonyms: <int>
+	:type max_synonyms: <int>
+	:type seed: <int>
+	:return: Tuple of dictPhysicalEntity and dictLocation.
+	:rtype: <tuple <dict>, <dict>>
+	"""
+	rand = random.Random(seed)
+	location = Location('http://bench#location', 'cytosol')
+	location.cadbiomId = 'c'
+	dictLocation = {location.uri: location}
+
+	dictPhysicalEntity = dict()
+	for i in range(nb_entities):
+		entity = PhysicalEntity(
+			'http://bench#Protein{}'.format(i),
+			'ATP',
+			rand.choice([location.uri, None]),
+			'http://www.biopax.org/release/biopax-level3.owl#SmallMolecule',
+			None
+		)
+		entity.synonyms.update(
+			'ATP-{}'.format(rand.randint(0, nb_synonyms))
+			for _ in range(rand.randint(0, max_synonyms))
+		)
+		dictPhysicalEntity[entity.uri] = entity
+	return dictPhysicalEntity, dictLocation
+
+
+def pairwiseFindUniqueCadbiomSynonym(cadbiom_name, entity_uris, unique_cadbiom_names, dictPhysicalEntity, dictLocation):
+	"""Reference implementation: pairwise subtraction of synonyms."""
+	entityToUniqueSynonym = {}
+	while len(entity_uris) != len(entityToUniqueSynonym):
+		entityToUniqueSynonyms = {}
+		for uri in entity_uris:
+			if uri not in entityToUniqueSynonym:
+				entityToUniqueSynonyms[uri] = {
+					b2c.getCadbiomName(dictPhysicalEntity[uri], dictLocation, synonym=synonymEntity)
+					for synonymEntity in dictPhysicalEntity[uri].synonyms
+				}
+
+		for uri1, uri2 in it.combinations(entityToUniqueSynonyms.keys(), 2):
+			synonyms1 = copy.copy(entityToUniqueSynonyms[uri1])
+			synonyms2 = copy.copy(entityToUniqueSynonyms[uri2])
+			entityToUniqueSynonyms[uri1] -= synonyms2
+			entityToUniqueSynonyms[uri2] -= synonyms1
+
+		for uri in entityToUniqueSynonyms:
+			entityToUniqueSynonyms[uri] -= unique_cadbiom_names
+
+		nbEntitiesSelected = 0
+		for entity_uri, cadbiom_synonyms in entityToUniqueSynonyms.iteritems():
+			if len(cadbiom_synonyms) > 0:
+				cadbiomName = next(iter(cadbiom_synonyms))
+				entityToUniqueSynonym[entity_uri] = cadbiomName
+				unique_cadbiom_names.add(cadbiomName)
+				nbEntitiesSelected += 1
+
+		if nbEntitiesSelected == 0:
+			for entity_version, entity_uri in enumerate(entityToUniqueSynonyms.keys(), 1):
+				entityToUniqueSynonym[entity_uri] = "{}_v{}".format(cadbiom_name, entity_version)
+	return entityToUniqueSynonym
+
+
+def bench_findUniqueCadbiomSynonym(sizes=(100, 500, 2000), repeat=3):
+	"""Compare the index-based and the pairwise synonyms resolution."""
+	print("findUniqueCadbiomSynonym")
+	for size in sizes:
+		dictPhysicalEntity, dictLocation = collision_set(size)
+		uris = set(dictPhysicalEntity)
+
+		for label, func in (('pairwise', pairwiseFindUniqueCadbiomSynonym),
+							('index', b2c.findUniqueCadbiomSynonym)):
+			elapsed = min(timeit.repeat(
+				lambda: func('ATP', uris, set(), dictPhysicalEntity, dictLocation),
+				repeat=repeat, number=1
+			))
+			print("\t{:>6} entities, {:<8}: {:.3f}s".format(size, label, elapsed))
+
+
+def bench_conditions(nb_symbols=2000, nb_transitions=20000, seed=0):
+	"""Compare sympy and the module conditions on the construction of
+	conditions of transitions (Or of controllers, And with the other
+	reactants, like in updateTransitions()), and on their atoms."""
+	import sympy
+
+	print("Conditions")
+	for label, module in (('sympy', sympy), ('conditions', conditions)):
+		rand = random.Random(seed)
+		names = ['entity_{}'.format(i) for i in range(nb_symbols)]
+
+		start = time.time()
+		for _ in range(nb_transitions):
+			cond = module.Or(*[module.Symbol(name)
+								for name in rand.sample(names, 5)])
+			cond = module.And(cond, module.Not(module.Symbol(rand.choice(names))))
+			for name in rand.sample(names, 3):
+				cond = module.And(cond, module.Symbol(name))
+			cond.atoms()
+		print("\t{:<10}: {:.3f}s".format(label, time.time() - start))
+
+
+def recursiveFormatCondition(condition):
+	"""Reference implementation: recursive formatting of a condition."""
+	if condition is conditions.TRUE:
+		return ''
+	elif type(condition) is conditions.Or:
+		return "("+" or ".join([recursiveFormatCondition(arg) for arg in condition.args])+")"
+	elif type(condition) is conditions.And:
+		return "("+" and ".join([recursiveFormatCondition(arg) for arg in condition.args])+")"
+	elif type(condition) is conditions.Not:
+		subCadbiomStrCond = recursiveFormatCondition(condition.arg)
+		if subCadbiomStrCond[0] == "(":
+			return "not"+subCadbiomStrCond
+		else:
+			return "not("+subCadbiomStrCond+")"
+	return str(condition)
+
+
+def recursiveFormatEventAndCond(eventsAndConds):
+	"""Reference implementation: one recursive call per event.
+
+	:param eventsAndConds: Tuples (event, condition) sorted like
+		formatEventAndCond() does.
+	:type eventsAndConds: <list <tuple <str>, <conditions.Expr>>>
+	"""
+	event, cond = eventsAndConds[0]
+	condition_str = '({}) when ({})'.format(event, recursiveFormatCondition(cond))
+	if len(eventsAndConds) == 1:
+		return condition_str
+	else:
+		return '({}) default ({})'.format(condition_str,
+										  recursiveFormatEventAndCond(eventsAndConds[1:]))
+
+
+def bench_format_events(nb_events=1000, nb_groups=20, seed=0):
+	"""Compare the recursive and the iterative formatting of a transition
+	with many merged events; conditions share groups of controllers."""
+
+	rand = random.Random(seed)
+	names = ['entity_{}'.format(i) for i in range(200)]
+	groups = [conditions.Or(*[conditions.And(*[conditions.Symbol(name)
+								for name in rand.sample(names, 3)])
+								for _ in range(5)])
+				for _ in range(nb_groups)]
+	events_conds = {
+		('_h_{}'.format(i),
+		 conditions.And(rand.choice(groups),
+						conditions.Not(conditions.Symbol(rand.choice(names))),
+						conditions.Symbol(rand.choice(names))))
+		for i in range(nb_events)
+	}
+
+	def sort_key(event_cond):
+		"""Order of the events in formatEventAndCond()"""
+		return event_cond[0], recursiveFormatCondition(event_cond[1])
+
+	print("Events of a transition")
+	text = None
+	for label, func in (('recursive', lambda s: recursiveFormatEventAndCond(
+							sorted(s, key=sort_key))),
+						('iterative', lambda s: formatEventAndCond(s, dict()))):
+		start = time.time()
+		try:
+			formatted = func(set(events_conds))
+		except RuntimeError as e:
+			print("	{:>5} events, {:<9}: {}".format(nb_events, label, e))
+			continue
+		print("	{:>5} events, {:<9}: {:.3f}s".format(
+			nb_events, label, time.time() - start
+		))
+		assert text is None or text == formatted
+		text = formatted
+
+
+def refInCommon(entities1, entities2, dictPhysicalEntity):
+	"""Reference implementation of bitsetsInCommon() on sets of uris:
+	check common references between 2 sets of entities."""
+
+	# Check if entities in 1 are in 2, or entities in 2 are in 1
+	if set(entities1) <= set(entities2) or set(entities1) >= set(entities2):
+		return True
+
+	# Get all entityRefs from entities1 (if they are present in these entities)
+	g = (dictPhysicalEntity[entity_uri].entityRef for entity_uri in entities1)
+	entityRefs1 = {entity_ref for entity_ref in g if entity_ref != None}
+
+	# Get all entityRefs from entities2 (if they are present in these entities)
+	g = (dictPhysicalEntity[entity_uri].entityRef for entity_uri in entities2)
+	entityRefs2 = {entity_ref for entity_ref in g if entity_ref != None}
+
+	if len(entityRefs1) == 0 or len(entityRefs2) == 0:
+		return False
+	# Check if entities in 1 are in 2, or entities in 2 are in 1
+	return (entityRefs1 <= entityRefs2) or (entityRefs1 >= entityRefs2)
+
+
+def equivalents_set(nb_entities, nb_possibilities=8, nb_refs=10, seed=0):
+	"""Build possibilities of entities (tuples of uris) whose entities share
+	entityRefs, like the participants of a reaction.
+
+	:return: Tuple of dictPhysicalEntity and
+		entityToListOfEquivalentsAndCadbiomName.
+	:rtype: <tuple <dict>, <dict>>
+	"""
+	rand = random.Random(seed)
+	biopax = 'http://www.biopax.org/release/biopax-level3.owl#'
+
+	dictPhysicalEntity = dict()
+	for i in range(nb_entities * 3):
+		entity = PhysicalEntity(
+			'http://bench#Protein{}'.format(i), 'P{}'.format(i), None,
+			biopax + 'Protein',
+			rand.choice(
+				['http://bench#Ref{}'.format(j) for j in range(nb_refs)] +
+				[None]
+			)
+		)
+		dictPhysicalEntity[entity.uri] = entity
+	uris = sorted(dictPhysicalEntity)
+
+	entityToListOfEquivalentsAndCadbiomName = dict()
+	for i in range(nb_entities):
+		entityToListOfEquivalentsAndCadbiomName['http://bench#Entity{}'.format(i)] = [
+			(tuple(rand.sample(uris, rand.randint(1, 3))), 'name')
+			for _ in range(rand.randint(1, nb_possibilities))
+		]
+	return dictPhysicalEntity, entityToListOfEquivalentsAndCadbiomName
+
+
+def bench_equivalents(nb_entities=40, nb_possibilities=8):
+	"""Compare refInCommon() and bitsetsInCommon() on all the pairs of
+	possibilities of entities (with the same results)."""
+
+	dictPhysicalEntity, entityToListOfEquivalentsAndCadbiomName = \
+		equivalents_set(nb_entities, nb_possibilities)
+	equivalents = [
+		equis for equivalents_and_names
+		in entityToListOfEquivalentsAndCadbiomName.itervalues()
+		for equis, _ in equivalents_and_names
+	]
+
+	print("Equivalents in common: {} pairs".format(len(equivalents) ** 2))
+	start = time.time()
+	expected = [
+		refInCommon(equis1, equis2, dictPhysicalEntity)
+		for equis1, equis2 in it.product(equivalents, repeat=2)
+	]
+	print("\t{:<8}: {:.3f}s".format('sets', time.time() - start))
+
+	start = time.time()
+	entityToBitsets = b2c.getEquivalentsBitsets(
+		entityToListOfEquivalentsAndCadbiomName, dictPhysicalEntity
+	)
+	bitsets = [
+		bitset for entity in entityToListOfEquivalentsAndCadbiomName
+		for bitset in entityToBitsets[entity]
+	]
+	result = [
+		b2c.bitsetsInCommon(bitsets1, bitsets2)
+		for bitsets1, bitsets2 in it.product(bitsets, repeat=2)
+	]
+	print("\t{:<8}: {:.3f}s".format('bitsets', time.time() - start))
+	assert result == expected
+
+
+def transcription_set(nb_products, nb_reactions_per_product=20, seed=0):
+	"""Build entities produced by TemplateReactions, also involved in other
+	reactions (with controllers) like in big graphs.
+
+	:return: Tuple of dictPhysicalEntity and dictReaction.
+	:rtype: <tuple <dict>, <dict>>
+	"""
+	rand = random.Random(seed)
+	biopax = 'http://www.biopax.org/release/biopax-level3.owl#'
+	dictPhysicalEntity = dict()
+	dictReaction = dict()
+
+	for i in range(nb_products):
+		entity = PhysicalEntity(
+			'http://bench#Protein{}'.format(i), 'P{}'.format(i), None,
+			biopax + 'Protein', 'http://bench#Ref{}'.format(i)
+		)
+		entity.synonyms.update('P{}-{}'.format(i, j) for j in range(10))
+		entity.cadbiomName = entity.name
+		entity.listOfCadbiomNames = [entity.name]
+		dictPhysicalEntity[entity.uri] = entity
+
+	uris = list(dictPhysicalEntity)
+	for i in range(nb_products * nb_reactions_per_product):
+		reaction = Reaction(
+			'http://bench#BiochemicalReaction{}'.format(i), None,
+			biopax + 'BiochemicalReaction', None, None
+		)
+		reaction.leftComponents = set(rand.sample(uris, 3))
+		reaction.rightComponents = set(rand.sample(uris, 3))
+		for j, controller in enumerate(rand.sample(uris, 2)):
+			reaction.controllers.add(Control(
+				'http://bench#Control{}_{}'.format(i, j), biopax + 'Control',
+				'ACTIVATION', reaction.uri, controller
+			))
+		for uri in reaction.leftComponents | reaction.rightComponents:
+			dictPhysicalEntity[uri].reactions.add(reaction)
+		dictReaction[reaction.uri] = reaction
+
+	for i, uri in enumerate(uris):
+		reaction = Reaction(
+			'http://bench#TemplateReaction{}'.format(i), None,
+			biopax + 'TemplateReaction', uri, None
+		)
+		dictPhysicalEntity[uri].reactions.add(reaction)
+		dictReaction[reaction.uri] = reaction
+
+	return dictPhysicalEntity, dictReaction
+
+
+def bench_gene_nodes(nb_products=500):
+	"""Compare the deep copy of products and GeneEntity for genes
+	of TemplateReactions (time and number of objects created)."""
+
+	dictPhysicalEntity, dictReaction = transcription_set(nb_products)
+	templates = [reaction for reaction in dictReaction.itervalues()
+					if reaction.reactiontype == 'TemplateReaction']
+
+	def deep_copies():
+		genes = list()
+		for reaction in templates:
+			gene = copy.deepcopy(dictPhysicalEntity[reaction.productComponent])
+			gene.cadbiomName += '_gene'
+			gene.uri = reaction.uri
+			genes.append(gene)
+		return genes
+
+	def gene_entities():
+		return [
+			GeneEntity(
+				reaction.uri, reaction.productComponent,
+				dictPhysicalEntity[reaction.productComponent].cadbiomName + '_gene'
+			) for reaction in templates
+		]
+
+	print("Genes of TemplateReactions")
+	for label, func in (('deepcopy', deep_copies), ('GeneEntity', gene_entities)):
+		gc.collect()
+		nb_objects = len(gc.get_objects())
+		start = time.time()
+		genes = func()
+		elapsed = time.time() - start
+		gc.collect()
+		print("\t{:>5} genes, {:<10}: {:.3f}s, {} new objects".format(
+			len(templates), label, elapsed,
+			len(gc.get_objects()) - nb_objects
+		))
+		del genes
+
+
+def fill_and_write_store(store_type, nb_transitions, memory_budget):
+	"""Add synthetic transitions to a store and write the model;
+	return the time and the peak memory of the process (run in a child
+	process: the peak memory is not shared with other stores)."""
+
+	rand = random.Random(0)
+	names = ['entity_{}'.format(i) for i in range(nb_transitions // 4 + 2)]
+	groups = [conditions.And(conditions.Symbol(rand.choice(names)),
+							 conditions.Not(conditions.Symbol(rand.choice(names))))
+				for _ in range(200)]
+
+	start = time.time()
+	if store_type == 'sqlite':
+		store = SQLiteTransitionStore(memory_budget=memory_budget)
+	else:
+		store = MemoryTransitionStore()
+	for i in xrange(nb_transitions):
+		store.add(
+			(rand.choice(names), rand.choice(names)),
+			Transition(
+				'_h_{}'.format(i),
+				'http://reaction/{}'.format(i // 3),
+				rand.choice(groups),
+			)
+		)
+
+	# All entities are nodes
+	nodes = b2c.ModelNodes()
+	nodes.names.update(names)
+	nodes.uris.update((name, 'http://entity/' + name) for name in names)
+
+	fd, model_file = tempfile.mkstemp(suffix='.bcx')
+	os.close(fd)
+	try:
+		createCadbiomFile(
+			store, dict(), "benchmark", model_file, True, False, nodes
+		)
+	finally:
+		os.remove(model_file)
+		store.close()
+
+	return (time.time() - start,
+			resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def bench_transition_stores(nb_transitions=200000, memory_budget=16):
+	"""Compare time and peak memory of the stores of transitions
+	(each store is filled and written by a new process)."""
+
+	print("Stores of transitions: {} transitions".format(nb_transitions))
+	for store_type in ('memory', 'sqlite'):
+		pool = mp.Pool(1)
+		try:
+			elapsed, peak = pool.apply(
+				fill_and_write_store,
+				(store_type, nb_transitions, memory_budget)
+			)
+		finally:
+			pool.close()
+			pool.join()
+		print("\t{:<7}: {:.3f}s, peak memory {} MB".format(
+			store_type, elapsed, peak // 1024
+		))
+
+
+def fill_transition_records(record_type, nb_transitions):
+	"""Create the given number of transitions (dicts or Transition objects)
+	and return the time spent and the peak memory of the process (KB)."""
+
+	reactions = ['http://reaction/{}'.format(i) for i in xrange(nb_transitions // 3 + 1)]
+	events = ['_h_{}'.format(i) for i in xrange(len(reactions))]
+	condition = conditions.Symbol('A')
+
+	start = time.time()
+	if record_type == 'dict':
+		transitions = [
+			{
+				'event': events[i // 3],
+				'reaction': reactions[i // 3],
+				'sympyCond': condition,
+			}
+			for i in xrange(nb_transitions)
+		]
+	else:
+		transitions = [
+			Transition(events[i // 3], reactions[i // 3], condition)
+			for i in xrange(nb_transitions)
+		]
+	elapsed = time.time() - start
+	return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def bench_transition_records(nb_transitions=1000000):
+	"""Compare time and peak memory of transitions stored in dicts
+	or in Transition objects (each type is tested by a new process)."""
+
+	print("Records of transitions: {} transitions".format(nb_transitions))
+	print("\tsize of 1 record: dict {} B, Transition {} B".format(
+		sys.getsizeof({'event': None, 'reaction': None, 'sympyCond': None}),
+		sys.getsizeof(Transition(None, None, None))
+	))
+	for record_type in ('dict', 'Transition'):
+		pool = mp.Pool(1)
+		try:
+			elapsed, peak = pool.apply(
+				fill_transition_records, (record_type, nb_transitions)
+			)
+		finally:
+			pool.close()
+			pool.join()
+		print("\t{:<10}: {:.3f}s, peak memory {} MB".format(
+			record_type, elapsed, peak // 1024
+		))
+
+
+def queries_set(nb_entities, nb_reactions, seed=0):
+	"""Build results of queries (entities with synonyms, members and
+	components, reactions and controls) like those of a backup.
+
+	:return: dictPhysicalEntity, dictReaction, dictLocation, dictControl,
+		blacklisted_entities, params
+	:rtype: <tuple>
+	"""
+	rand = random.Random(seed)
+	biopax = 'http://www.biopax.org/release/biopax-level3.owl#'
+
+	dictLocation = dict()
+	for i in range(20):
+		location = Location('http://bench#Location{}'.format(i), 'loc {}'.format(i))
+		location.idRefs.add(('GO:{:07d}'.format(i), 'GO'))
+		dictLocation[location.uri] = location
+	locations = list(dictLocation)
+
+	dictPhysicalEntity = dict()
+	for i in range(nb_entities):
+		entity = PhysicalEntity(
+			'http://bench#Entity{}'.format(i), 'E{}'.format(i % 5000),
+			rand.choice(locations), biopax + 'Protein',
+			'http://bench#Ref{}'.format(i // 2)
+		)
+		entity.synonyms.update(
+			'E{}-{}'.format(i % 5000, j) for j in range(rand.randint(0, 6))
+		)
+		dictPhysicalEntity[entity.uri] = entity
+	uris = list(dictPhysicalEntity)
+	for uri in rand.sample(uris, nb_entities // 10):
+		dictPhysicalEntity[uri].components.update(rand.sample(uris, 3))
+	for uri in rand.sample(uris, nb_entities // 10):
+		dictPhysicalEntity[uri].members.update(rand.sample(uris, 4))
+
+	dictReaction = dict()
+	dictControl = dict()
+	for i in range(nb_reactions):
+		reaction = Reaction(
+			'http://bench#Reaction{}'.format(i), 'R{}'.format(i),
+			biopax + 'BiochemicalReaction', None, None
+		)
+		reaction.leftComponents.update(rand.sample(uris, 2))
+		reaction.rightComponents.update(rand.sample(uris, 2))
+		reaction.pathways.add('http://bench#Pathway{}'.format(i % 100))
+		dictReaction[reaction.uri] = reaction
+
+		control = Control(
+			'http://bench#Control{}'.format(i), biopax + 'Catalysis',
+			'ACTIVATION', reaction.uri, rand.choice(uris)
+		)
+		dictControl[control.uri] = control
+
+	return dictPhysicalEntity, dictReaction, dictLocation, dictControl, \
+		set(), {'listOfGraphUri': ['http://bench']}
+
+
+def load_backup(backup_format, backup_file):
+	"""Load the given backup and return the time spent and the peak memory
+	of the process (KB)."""
+	start = time.time()
+	if backup_format == 'snapshot':
+		load_snapshot(backup_file)
+	else:
+		dill.load(open(backup_file, "rb"))
+	elapsed = time.time() - start
+	return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def bench_backup_formats(nb_entities=30000, nb_reactions=20000):
+	"""Compare the backups of queries made with dill and snapshots
+	(each backup is loaded by a new process)."""
+
+	queries = queries_set(nb_entities, nb_reactions)
+	print("Backups of queries: {} entities, {} reactions".format(
+		nb_entities, nb_reactions
+	))
+	tmp_dir = tempfile.mkdtemp()
+	for backup_format in ('dill', 'snapshot'):
+		backup_file = os.path.join(tmp_dir, 'backup.' + backup_format)
+		start = time.time()
+		if backup_format == 'snapshot':
+			write_snapshot(backup_file, *queries)
+		else:
+			dill.dump(list(queries), open(backup_file, "wb"))
+		write_time = time.time() - start
+
+		pool = mp.Pool(1)
+		try:
+			elapsed, peak = pool.apply(
+				load_backup, (backup_format, backup_file)
+			)
+		finally:
+			pool.close()
+			pool.join()
+		print("\t{:<8}: write {:.3f}s, load {:.3f}s, peak memory {} MB, "
+			  "{:.1f} MB".format(
+			backup_format, write_time, elapsed, peak // 1024,
+			os.path.getsize(backup_file) / 1048576.
+		))
+		os.remove(backup_file)
+	os.rmdir(tmp_dir)
+
+
+def graph_passes(columnar, nb_entities, nb_reactions, convertFullGraph):
+	"""Time the first passes of the conversion made on objects or on the
+	columnar store.
+
+	:return: List of tuples (name of the pass, time spent).
+	:rtype: <list <tuple <str>, <float>>>
+	"""
+	dictPhysicalEntity, dictReaction, _, dictControl, _, _ = \
+		queries_set(nb_entities, nb_reactions)
+	timings = list()
+
+	def timed(name, function, *args):
+		start = time.time()
+		result = function(*args)
+		timings.append((name, time.time() - start))
+		return result
+
+	if columnar:
+		from biopax2cadbiom.graph_store import GraphStore
+		store = timed("reactions of entities", GraphStore,
+					  dictPhysicalEntity, dictReaction, dictControl)
+		timed("members used", store.detect_members_used, convertFullGraph)
+		timed("entities used", store.get_used_entities)
+		timed("entities of pathways", store.get_pathway_to_physical_entities)
+	else:
+		timed("reactions of entities", b2c.addReactionToEntities,
+			  dictReaction, dictControl, dictPhysicalEntity)
+		timed("members used", b2c.detectMembersUsedInEntities,
+			  dictPhysicalEntity, convertFullGraph)
+		timed("entities used", b2c.getEntitiesUsedInReactions,
+			  dictPhysicalEntity)
+		timed("entities of pathways", b2c.getPathwayToPhysicalEntities,
+			  dictReaction, dictControl, dictPhysicalEntity)
+	return timings
+
+def bench_graph_store(nb_entities=300000, nb_reactions=200000,
+					  convertFullGraph=False):
+	"""Compare the first passes of the conversion (entities involved in
+	reactions, members used, entities used, entities of pathways) made on
+	objects and on the columnar store (see :mod:`biopax2cadbiom.graph_store`).
+
+	Each variant is run by a new process on the same graph; results are
+	compared by test/test_graph_store.py.
+
+	.. note:: Skipped if numpy is not installed.
+	"""
+
+	try:
+		import numpy
+	except ImportError:
+		return
+
+	print("Graph passes: {} entities, {} reactions (convertFullGraph: {})".format(
+		nb_entities, nb_reactions, convertFullGraph
+	))
+	totals = list()
+	for columnar in (False, True):
+		pool = mp.Pool(1)
+		try:
+			timings = pool.apply(
+				graph_passes,
+				(columnar, nb_entities, nb_reactions, convertFullGraph)
+			)
+		finally:
+			pool.close()
+			pool.join()
+		totals.append(sum(elapsed for _, elapsed in timings))
+		print("\t{}: {}".format(
+			"columnar" if columnar else "objects ",
+			", ".join("{} {:.3f}s".format(name, elapsed)
+					  for name, elapsed in timings)
+		))
+	print("\ttotal   : objects {:.3f}s, columnar {:.3f}s (x{:.1f})".format(
+		totals[0], totals[1], totals[0] / totals[1]
+	))
+
+def bench_transitions_and_writer(backup_file, workers=1, convertFullGraph=True):
+	"""Time getTransitions() and createCadbiomFile() on a backup of queries.
+
+	:param backup_file: dill backup made with the option --pickleBackup.
+	:param workers: Number of processes used by getTransitions().
+	:type backup_file: <str>
+	:type workers: <int>
+	"""
+
+	dictPhysicalEntity, dictReaction, dictLocation, dictControl, \
+	blacklisted_entities, _ = dill.load(open(backup_file, "rb"))
+
+	b2c.removeEntitiesBlacklistedFromReactions(dictReaction, blacklisted_entities)
+	b2c.createControlFromEntityOnBothSides(dictReaction, dictControl)
+	b2c.addReactionToEntities(dictReaction, dictControl, dictPhysicalEntity)
+	b2c.detectMembersUsedInEntities(dictPhysicalEntity, convertFullGraph)
+	used_entities = b2c.getEntitiesUsedInReactions(dictPhysicalEntity)
+	b2c.developComplexs(dictPhysicalEntity, used_entities)
+	b2c.addControllersToReactions(dictReaction, dictControl)
+	b2c.numerotateLocations(dictLocation, True)
+
+	print("Transitions and writer: " + backup_file)
+	start = time.time()
+	b2c.addCadbiomNameToEntities(
+		dictPhysicalEntity, dictLocation, entities=used_entities
+	)
+	print("\tnames      : {:.3f}s ({}/{} entities used)".format(
+		time.time() - start, len(used_entities), len(dictPhysicalEntity)
+	))
+
+	start = time.time()
+	b2c.addCadbiomSympyCondToReactions(dictReaction, dictPhysicalEntity)
+	print("\tconditions : {:.3f}s".format(time.time() - start))
+
+	start = time.time()
+	dictTransition = b2c.getTransitions(
+		dictReaction, dictPhysicalEntity, workers=workers
+	)
+	print("\ttransitions: {:.3f}s ({} workers)".format(
+		time.time() - start, workers
+	))
+
+	fd, model_file = tempfile.mkstemp(suffix='.bcx')
+	os.close(fd)
+	start = time.time()
+	createCadbiomFile(
+		dictTransition, dictPhysicalEntity, "benchmark", model_file, True
+	)
+	print("\twriter     : {:.3f}s".format(time.time() - start))
+	os.remove(model_file)
+
+	bench_model_formats(dictTransition, dictPhysicalEntity)
+
+
+def bench_model_formats(dictTransition, dictPhysicalEntity):
+	"""Compare write time and size of the formats of the model file:
+	XML (indented or compact, plain or compressed) and JSON-lines.
+
+	.. note:: zstd files are skipped if zstandard is not installed.
+
+	:param dictTransition: Transitions returned by getTransitions().
+	:param dictPhysicalEntity: Entities with their cadbiom names.
+	:type dictTransition: <dict <tuple <str>, <str>>: <list <Transition>>>
+	:type dictPhysicalEntity: <dict <str>: <PhysicalEntity>>
+	"""
+
+	try:
+		import zstandard
+		compressions = ('', '.gz', '.zst')
+	except ImportError:
+		compressions = ('', '.gz')
+
+	formats = [
+		("xml", ".bcx", lambda path: createCadbiomFile(
+			dictTransition, dictPhysicalEntity, "benchmark", path, True
+		)),
+		("xml compact", ".bcx", lambda path: createCadbiomFile(
+			dictTransition, dictPhysicalEntity, "benchmark", path, True, True
+		)),
+		("json-lines", ".jsonl", lambda path: createJsonLinesFile(
+			dictTransition, dictPhysicalEntity, "benchmark", path
+		)),
+	]
+
+	print("Model formats:")
+	tmp_dir = tempfile.mkdtemp()
+	reference_size = None
+	for name, extension, write_model in formats:
+		for compression in compressions:
+			model_file = os.path.join(tmp_dir, "model" + extension + compression)
+			start = time.time()
+			write_model(model_file)
+			duration = time.time() - start
+			size = os.path.getsize(model_file)
+			# Sizes are compared to the indented XML file
+			reference_size = reference_size or size
+			print("\t{:<24}: {:.3f}s {:>10.1f} KB ({:.1%})".format(
+				name + " " + extension + compression, duration, size / 1024.,
+				size / float(reference_size)
+			))
+			os.remove(model_file)
+	os.rmdir(tmp_dir)
+
+
+if __name__ == "__main__":
+
+	bench_findUniqueCadbiomSynonym()
+	bench_conditions()
+	bench_format_events()
+	bench_format_events(nb_events=400)
+	bench_equivalents()
+	bench_gene_nodes()
+	bench_transition_records()
+	bench_transition_stores()
+	bench_backup_formats()
+	bench_graph_store()
+	bench_graph_store(convertFullGraph=True)
+	if len(sys.argv) > 1:
+		bench_transitions_and_writer(
+			sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 1
+		)
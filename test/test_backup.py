@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+Unit tests for the check of the parameters of backups of queries
+(see biopax2cadbiom.biopax_converter.isSameQueries()).
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+# Standard imports
+import pytest
+
+# Custom imports
+import biopax2cadbiom.biopax_converter as b2c
+
+
+@pytest.fixture()
+def params():
+	"""Parameters of a conversion"""
+	return {
+		'listOfGraphUri': ['http://biopax.org/lvl3', 'http://reactome.org/homarus'],
+		'triplestore': 'http://localhost:8890/sparql/',
+		'blacklist': None,
+		'pickleBackup': True,
+		'pickleDir': 'backup.p',
+		'backupFormat': 'dill',
+		'cadbiomFile': 'model.bcx',
+		'convertFullGraph': False,
+		'workers': 1,
+		'dryRun': False,
+		'seeds': None,
+		'radius': 1,
+	}
+
+
+@pytest.mark.parametrize('option, value', [
+	('dryRun', True),
+	('workers', 4),
+	('transitionStore', 'sqlite'),
+	('memoryBudget', 64),
+	('namesCache', 'names.p'),
+	('compactModel', True),
+	('jsonLinesFile', 'model.jsonl'),
+	('splitByPathway', True),
+	('backupFormat', 'snapshot'),
+	('shardByComponent', True),
+	('cadbiomFile', 'other.bcx'),
+	('convertFullGraph', True),
+	('seeds', ['http://reactome.org/homarus#Protein1']),
+	('radius', 2),
+])
+def test_other_options(params, option, value):
+	"""Options that do not change the queries can change"""
+	new_params = dict(params)
+	new_params[option] = value
+	assert b2c.isSameQueries(params, new_params)
+
+
+@pytest.mark.parametrize('option, value', [
+	('listOfGraphUri', ['http://biopax.org/lvl3']),
+	('triplestore', 'http://other:8890/sparql/'),
+	('blacklist', 'cofactors.csv'),
+])
+def test_query_options(params, option, value):
+	"""Options of the queries must be the same"""
+	new_params = dict(params)
+	new_params[option] = value
+	assert not b2c.isSameQueries(params, new_params)
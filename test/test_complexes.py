@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+Unit tests for the development of complexes into flat components
+(see biopax2cadbiom.biopax_converter.developComplexEntity()).
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+# Standard imports
+import itertools as it
+import pytest
+
+# Custom imports
+import biopax2cadbiom.biopax_converter as b2c
+from biopax2cadbiom.classes import PhysicalEntity
+
+BIOPAX = 'http://www.biopax.org/release/biopax-level3.owl#'
+
+
+def make_entities(components, members=None):
+	"""Build complexes and classes of entities.
+
+	:param components: Components of complexes.
+	:param members: (optional) Used members of classes.
+	:type components: <dict <str>: <list <str>>>
+	:type members: <dict <str>: <list <str>>>
+	:rtype: <dict <str>: <PhysicalEntity>>
+	"""
+	members = members or dict()
+	uris = set(components) | set(members)
+	uris.update(it.chain(*components.values()))
+	uris.update(it.chain(*members.values()))
+
+	dictPhysicalEntity = dict()
+	for uri in uris:
+		entity_type = 'Complex' if uri in components else 'Protein'
+		entity = PhysicalEntity(uri, uri, None, BIOPAX + entity_type, None)
+		entity.components.update(components.get(uri, ()))
+		entity.members.update(members.get(uri, ()))
+		entity.membersUsed.update(members.get(uri, ()))
+		entity.cadbiomName = uri
+		dictPhysicalEntity[uri] = entity
+	return dictPhysicalEntity
+
+
+@pytest.fixture()
+def big_complex():
+	"""Complex with 3 x 2 = 6 flat components, nested in a parent complex"""
+	return make_entities(
+		{'C': ['A', 'B'], 'P': ['C', 'D']},
+		{'A': ['A1', 'A2', 'A3'], 'B': ['B1', 'B2']},
+	)
+
+
+def sorted_flat_components(entity):
+	"""Flat components do not depend on the order of sets"""
+	return sorted(tuple(sorted(flat)) for flat in entity.listOfFlatComponents)
+
+
+def test_no_limit(big_complex):
+	"""All flat components are developped, parents included"""
+	b2c.developComplexEntity('P', big_complex)
+
+	expected = sorted(
+		tuple(sorted(product))
+		for product in it.product(['A1', 'A2', 'A3'], ['B1', 'B2'])
+	)
+	assert sorted_flat_components(big_complex['C']) == expected
+	assert sorted_flat_components(big_complex['P']) == \
+		sorted(tuple(sorted(flat + ('D',))) for flat in expected)
+
+
+def test_limit_not_reached(big_complex):
+	"""The limit is inclusive"""
+	b2c.developComplexEntity('C', big_complex, maxFlatComponents=6)
+	assert len(big_complex['C'].listOfFlatComponents) == 6
+
+
+def test_parent_strategy(big_complex):
+	"""Complexes over the limit are single nodes, also in their parents"""
+	b2c.developComplexEntity(
+		'P', big_complex, maxFlatComponents=4, overLimitStrategy='parent'
+	)
+	assert big_complex['C'].listOfFlatComponents == [('C',)]
+	assert sorted_flat_components(big_complex['P']) == [('C', 'D')]
+
+	# The capped complex keeps a cadbiom name (it is not removed from
+	# the transitions)
+	b2c.addCadbiomNameToEntities(big_complex, dict(), entities=['C'])
+	assert big_complex['C'].listOfCadbiomNames == \
+		[big_complex['C'].cadbiomName]
+	assert b2c.getSetOfCadbiomPossibilities(big_complex['C'], big_complex) == \
+		{big_complex['C'].cadbiomName}
+
+
+def test_sample_strategy(big_complex):
+	"""Complexes over the limit keep a reproducible sample of
+	their flat components"""
+	b2c.developComplexEntity(
+		'C', big_complex, maxFlatComponents=4, overLimitStrategy='sample'
+	)
+	sample = sorted_flat_components(big_complex['C'])
+	assert len(sample) == 4
+	assert len(set(sample)) == 4
+	assert set(sample) <= {
+		tuple(sorted(product))
+		for product in it.product(['A1', 'A2', 'A3'], ['B1', 'B2'])
+	}
+
+	# Same sample for the same complex
+	big_complex['C'].listOfFlatComponents = []
+	b2c.developComplexEntity(
+		'C', big_complex, maxFlatComponents=4, overLimitStrategy='sample'
+	)
+	assert sorted_flat_components(big_complex['C']) == sample
+
+
+def test_sample_strategy_minimal(big_complex):
+	"""The smallest limit keeps 1 flat component"""
+	b2c.developComplexEntity(
+		'C', big_complex, maxFlatComponents=1, overLimitStrategy='sample'
+	)
+	assert len(big_complex['C'].listOfFlatComponents) == 1
+
+
+@pytest.mark.parametrize('overLimitStrategy', ['parent', 'sample'])
+def test_invalid_limit(big_complex, overLimitStrategy):
+	"""A complex can't have 0 flat component"""
+	with pytest.raises(AssertionError):
+		b2c.developComplexEntity(
+			'C', big_complex, maxFlatComponents=0,
+			overLimitStrategy=overLimitStrategy
+		)
+
+
+def test_walk_nested_complexes():
+	"""Nested complexes are visited before their parents"""
+	dictPhysicalEntity = make_entities(
+		{'P': ['C1', 'x'], 'C1': ['C2', 'y'], 'C2': ['z']}
+	)
+	assert list(b2c.walkNestedComplexes('P', dictPhysicalEntity, set())) == \
+		[('C2', set()), ('C1', set()), ('P', set())]
+
+	# Complexes already done are not visited again
+	assert list(b2c.walkNestedComplexes('P', dictPhysicalEntity, {'C1'})) == \
+		[('P', set())]
+
+
+def test_walk_cycles():
+	"""Cycles are broken: complexes met again are elementary components"""
+	dictPhysicalEntity = make_entities(
+		{'X': ['Y', 'a'], 'Y': ['X', 'b'], 'Z': ['Z', 'c']}
+	)
+	assert list(b2c.walkNestedComplexes('X', dictPhysicalEntity, set())) == \
+		[('Y', {'X'}), ('X', set())]
+	# Self-loop
+	assert list(b2c.walkNestedComplexes('Z', dictPhysicalEntity, set())) == \
+		[('Z', {'Z'})]
+
+	b2c.developComplexEntity('X', dictPhysicalEntity)
+	assert sorted_flat_components(dictPhysicalEntity['Y']) == [('X', 'b')]
+	assert sorted_flat_components(dictPhysicalEntity['X']) == \
+		[('X', 'a', 'b')]
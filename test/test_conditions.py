@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+Unit tests for the conditions of transitions (see biopax2cadbiom.conditions):
+conditions must be formatted exactly like their sympy counterparts.
+"""
+
+from __future__ import print_function
+
+# Standard imports
+import gc
+import random
+import pytest
+import sympy
+
+# Custom imports
+from biopax2cadbiom import conditions
+from biopax2cadbiom.cadbiom_writer import formatCadbiomSympyCond
+
+NAMES = ['A', 'B', 'C', 'D', 'E', 'ATP_c', 'ADP_c', 'p53_n', 'MAPK_v2', 'x1']
+
+
+def random_trees(rand, depth=3):
+	"""Build the same random condition with sympy and with the module
+	conditions (And/Or/Not of symbols, like conditions of transitions).
+
+	:return: Tuple (sympy expression, expression of the module conditions).
+	:rtype: <tuple>
+	"""
+	if depth == 0 or rand.random() < 0.3:
+		name = rand.choice(NAMES)
+		return sympy.Symbol(name), conditions.Symbol(name)
+
+	operator = rand.choice(('And', 'Or', 'Not'))
+	if operator == 'Not':
+		sympy_arg, arg = random_trees(rand, depth - 1)
+		return sympy.Not(sympy_arg), conditions.Not(arg)
+
+	args = [random_trees(rand, depth - 1) for _ in range(rand.randint(2, 4))]
+	return (
+		getattr(sympy, operator)(*[sympy_arg for sympy_arg, _ in args]),
+		getattr(conditions, operator)(*[arg for _, arg in args]),
+	)
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_format_like_sympy(seed):
+	"""Formatted conditions are the same as with sympy"""
+	sympy_expr, expr = random_trees(random.Random(seed))
+
+	expected = formatCadbiomSympyCond(sympy_expr)
+	assert formatCadbiomSympyCond(expr) == expected
+	assert formatCadbiomSympyCond(expr, dict()) == expected
+	# Conversions
+	assert conditions.from_sympy(sympy_expr) is expr
+	assert formatCadbiomSympyCond(conditions.to_sympy(expr)) == expected
+	assert {str(atom) for atom in expr.atoms()} == \
+		{str(atom) for atom in sympy_expr.atoms()}
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_hash_like_sympy(seed):
+	"""Hashes are the same as with sympy"""
+	sympy_expr, expr = random_trees(random.Random(seed))
+	assert hash(expr) == hash(sympy_expr)
+
+
+def test_conditions_of_transitions():
+	"""Conditions built like in updateTransitions()"""
+	a, b, c, d = [sympy.Symbol(name) for name in 'ABCD']
+	A, B, C, D = [conditions.Symbol(name) for name in 'ABCD']
+
+	sympy_expr = sympy.And(sympy.Or(a, b), sympy.Not(sympy.Or(c, d)), d)
+	expr = conditions.And(conditions.Or(A, B), conditions.Not(conditions.Or(C, D)), D)
+	assert formatCadbiomSympyCond(expr) == formatCadbiomSympyCond(sympy_expr)
+	assert formatCadbiomSympyCond(expr) == "(D and (A or B) and not(C or D))"
+
+	# No condition
+	assert formatCadbiomSympyCond(conditions.TRUE) == \
+		formatCadbiomSympyCond(sympy.true) == ''
+
+
+def test_simplifications():
+	"""Expressions are simplified like sympy does, and interned"""
+	A, B = conditions.Symbol('A'), conditions.Symbol('B')
+
+	assert conditions.And(A, conditions.And(B, A), conditions.TRUE) is \
+		conditions.And(B, A)
+	assert conditions.Or(A, conditions.TRUE) is conditions.TRUE
+	assert conditions.And(A, conditions.FALSE) is conditions.FALSE
+	assert conditions.And(A) is A
+	assert conditions.And() is conditions.TRUE
+	assert conditions.Or() is conditions.FALSE
+	assert conditions.Not(conditions.Not(A)) is A
+	assert conditions.Not(True) is conditions.FALSE
+
+
+def test_interned_expressions_are_freed():
+	"""Expressions no longer used are removed from the table"""
+	key = (conditions.Symbol, 'only_used_by_this_test')
+	expr = conditions.And(
+		conditions.Symbol('only_used_by_this_test'), conditions.Symbol('A')
+	)
+	assert key in conditions.INTERNED
+
+	del expr
+	# PS: symbols are in a reference cycle (through their atoms)
+	gc.collect()
+	assert key not in conditions.INTERNED
+	assert conditions.Symbol('A') is conditions.Symbol('A')
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+Unit tests for the matching of equivalents of entities in reactions
+(see biopax2cadbiom.biopax_converter.bitsetsInCommon()).
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+# Standard imports
+import itertools as it
+import pytest
+
+# Custom imports
+import biopax2cadbiom.biopax_converter as b2c
+from test.benchmarks import equivalents_set, refInCommon
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('nb_refs', [1, 3, 10])
+def test_bitsets_in_common(seed, nb_refs):
+	"""Same results as the reference on sets of uris"""
+	dictPhysicalEntity, entityToListOfEquivalentsAndCadbiomName = \
+		equivalents_set(15, nb_refs=nb_refs, seed=seed)
+	entityToBitsets = b2c.getEquivalentsBitsets(
+		entityToListOfEquivalentsAndCadbiomName, dictPhysicalEntity
+	)
+
+	pairs = [
+		(equis, bitsets)
+		for entity, equivalents_and_names
+			in entityToListOfEquivalentsAndCadbiomName.iteritems()
+		for (equis, _), bitsets
+			in zip(equivalents_and_names, entityToBitsets[entity])
+	]
+	for (equis1, bitsets1), (equis2, bitsets2) in it.product(pairs, repeat=2):
+		assert b2c.bitsetsInCommon(bitsets1, bitsets2) == \
+			refInCommon(equis1, equis2, dictPhysicalEntity), (equis1, equis2)
+
+
+def test_without_entity_refs():
+	"""Different entities without entityRef have nothing in common"""
+	dictPhysicalEntity, _ = equivalents_set(1, nb_refs=1)
+	for entity in dictPhysicalEntity.itervalues():
+		entity.entityRef = None
+	uris = sorted(dictPhysicalEntity)
+	possibilities = {
+		'left': [((uris[0],), 'A'), ((uris[0], uris[1]), 'A_B')],
+		'right': [((uris[1],), 'B'), ((uris[2],), 'C')],
+	}
+	entityToBitsets = b2c.getEquivalentsBitsets(
+		possibilities, dictPhysicalEntity
+	)
+	left, left_complex = entityToBitsets['left']
+	right_b, right_c = entityToBitsets['right']
+
+	# Subsets of entities
+	assert b2c.bitsetsInCommon(left, left_complex)
+	assert b2c.bitsetsInCommon(right_b, left_complex)
+	# No common entity nor entityRef
+	assert not b2c.bitsetsInCommon(left, right_b)
+	assert not b2c.bitsetsInCommon(left_complex, right_c)
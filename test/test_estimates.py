@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+Unit tests for the estimates of the conversion
+(see biopax2cadbiom.biopax_converter.getConversionEstimates()):
+estimates are compared to the transitions computed by getTransitions().
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+# Standard imports
+import random
+from collections import Counter
+import pytest
+
+# Custom imports
+import biopax2cadbiom.biopax_converter as b2c
+from biopax2cadbiom.classes import PhysicalEntity, Reaction, Location, \
+	Control
+
+BIOPAX = 'http://www.biopax.org/release/biopax-level3.owl#'
+
+
+def make_entity(uri, entity_type, components=(), members=(), location=None):
+	"""Get a PhysicalEntity with the given components and members"""
+	entity = PhysicalEntity(
+		uri, 'name of ' + uri, location, BIOPAX + entity_type, None
+	)
+	entity.components.update(components)
+	entity.members.update(members)
+	return entity
+
+
+def make_reaction(uri, left, right, reaction_type='BiochemicalReaction'):
+	"""Get a Reaction with the given participants"""
+	reaction = Reaction(uri, None, BIOPAX + reaction_type, None, None)
+	reaction.leftComponents.update(left)
+	reaction.rightComponents.update(right)
+	return reaction
+
+
+def random_graph(seed):
+	"""Random graph with classes of proteins, complexes (nested, with
+	classes as components) and classes of complexes"""
+	rng = random.Random(seed)
+	dictLocation = {'L': Location('L', 'cytosol')}
+	entities = dict()
+
+	proteins = ['P' + str(i) for i in range(8)]
+	for uri in proteins:
+		entities[uri] = make_entity(uri, 'Protein', location='L')
+
+	classes = ['F' + str(i) for i in range(3)]
+	for uri in classes:
+		entities[uri] = make_entity(
+			uri, 'Protein', members=rng.sample(proteins, rng.randint(2, 3))
+		)
+
+	complexes = list()
+	for i in range(5):
+		uri = 'C' + str(i)
+		entities[uri] = make_entity(
+			uri, 'Complex',
+			components=rng.sample(proteins + classes + complexes,
+								  rng.randint(1, 3))
+		)
+		complexes.append(uri)
+
+	# Classes of complexes: complexes without components
+	complex_classes = ['CF' + str(i) for i in range(3)]
+	for uri in complex_classes:
+		entities[uri] = make_entity(
+			uri, 'Complex', members=rng.sample(complexes, rng.randint(2, 3))
+		)
+
+	participants = proteins + classes + complexes + complex_classes
+	dictReaction = dict()
+	for i in range(12):
+		uri = 'R' + str(i)
+		reaction_type = rng.choice(
+			['BiochemicalReaction'] * 3 + ['ComplexAssembly', 'Degradation']
+		)
+		right = () if reaction_type == 'Degradation' else \
+			rng.sample(participants, rng.randint(1, 2))
+		dictReaction[uri] = make_reaction(
+			uri, rng.sample(participants, rng.randint(1, 2)), right,
+			reaction_type
+		)
+
+	dictControl = {
+		'Ctrl' + str(i): Control(
+			'Ctrl' + str(i), BIOPAX + 'Catalysis', 'ACTIVATION',
+			rng.choice(sorted(dictReaction)), rng.choice(participants)
+		)
+		for i in range(4)
+	}
+	return entities, dictReaction, dictLocation, dictControl
+
+
+def estimate_and_convert(graph, convertFullGraph):
+	"""Get the estimates of transitions and the numbers of transitions
+	computed for each reaction"""
+	dictPhysicalEntity, dictReaction, dictLocation, dictControl = graph
+
+	b2c.createControlFromEntityOnBothSides(dictReaction, dictControl)
+	b2c.addReactionToEntities(dictReaction, dictControl, dictPhysicalEntity)
+	b2c.detectMembersUsedInEntities(dictPhysicalEntity, convertFullGraph)
+	used_entities = b2c.getEntitiesUsedInReactions(dictPhysicalEntity)
+	estimates = b2c.getConversionEstimates(
+		dictReaction, dictPhysicalEntity, used_entities
+	)
+
+	b2c.developComplexs(dictPhysicalEntity, used_entities)
+	b2c.addControllersToReactions(dictReaction, dictControl)
+	b2c.numerotateLocations(dictLocation, True)
+	b2c.addCadbiomNameToEntities(
+		dictPhysicalEntity, dictLocation, None, used_entities
+	)
+	b2c.addCadbiomSympyCondToReactions(dictReaction, dictPhysicalEntity)
+	dictTransition = b2c.getTransitions(dictReaction, dictPhysicalEntity)
+
+	counts = Counter(
+		transition.reaction for transitions in dictTransition.itervalues()
+		for transition in transitions
+	)
+	return estimates, counts
+
+
+def test_class_of_complexes():
+	"""A class of complexes has 1 name for each member"""
+	graph = (
+		{
+			'A': make_entity('A', 'Protein'),
+			'B': make_entity('B', 'Protein'),
+			'C': make_entity('C', 'Protein'),
+			'AB': make_entity('AB', 'Complex', components=['A', 'B']),
+			'AC': make_entity('AC', 'Complex', components=['A', 'C']),
+			'CF': make_entity('CF', 'Complex', members=['AB', 'AC']),
+		},
+		{'R1': make_reaction('R1', ['A'], ['CF'])},
+		dict(),
+		dict(),
+	)
+
+	estimates, counts = estimate_and_convert(graph, True)
+
+	assert estimates['cadbiomNames']['CF'] == 2
+	# Upper bound: the names of CF are matched with A
+	nb_transitions, exact = estimates['transitions']['R1']
+	assert not exact
+	assert counts['R1'] == 2 <= nb_transitions
+
+
+@pytest.mark.parametrize("convertFullGraph", [True, False])
+@pytest.mark.parametrize("seed", range(40))
+def test_estimates(seed, convertFullGraph):
+	"""Estimates are upper bounds of the numbers of transitions;
+	they are equal when they are said to be exact"""
+	estimates, counts = estimate_and_convert(
+		random_graph(seed), convertFullGraph
+	)
+
+	for uri, (nb_transitions, exact) in \
+		estimates['transitions'].iteritems():
+		if exact:
+			assert counts[uri] == nb_transitions, uri
+		else:
+			assert counts[uri] <= nb_transitions, uri
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+"""
+Unit tests for the columnar store of the graph
+(see biopax2cadbiom.graph_store): the results of its passes are compared to
+those of the passes made on objects (see biopax2cadbiom.biopax_converter).
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+# Standard imports
+import random
+import pytest
+
+# Custom imports
+import biopax2cadbiom.biopax_converter as b2c
+from biopax2cadbiom.classes import PhysicalEntity, Reaction, Control
+
+np = pytest.importorskip("numpy")
+from biopax2cadbiom.graph_store import GraphStore
+
+BIOPAX = 'http://www.biopax.org/release/biopax-level3.owl#'
+
+
+def random_graph(seed):
+	"""Random graph with members (some of them unknown, nested), reactions
+	with or without product and participant, and controls (some of them
+	without reaction or with an unknown reaction)"""
+	rng = random.Random(seed)
+	entities = dict()
+	uris = ['E' + str(i) for i in range(30)]
+	for uri in uris:
+		entities[uri] = PhysicalEntity(
+			uri, 'name of ' + uri, None, BIOPAX + 'Protein', None
+		)
+	for uri in rng.sample(uris, 10):
+		entities[uri].members.update(
+			rng.sample(uris + ['Unknown1', 'Unknown2'], rng.randint(1, 4))
+		)
+
+	pathways = ['Pathway' + str(i) for i in range(4)]
+	dictReaction = dict()
+	for i in range(rng.randint(0, 12)):
+		uri = 'R' + str(i)
+		reaction = Reaction(
+			uri, None, BIOPAX + 'BiochemicalReaction',
+			rng.choice([None, None, rng.choice(uris)]),
+			rng.choice([None, None, rng.choice(uris)])
+		)
+		reaction.leftComponents.update(rng.sample(uris, rng.randint(0, 2)))
+		reaction.rightComponents.update(rng.sample(uris, rng.randint(0, 2)))
+		reaction.pathways.update(rng.sample(pathways, rng.randint(0, 2)))
+		dictReaction[uri] = reaction
+
+	dictControl = dict()
+	for i in range(rng.randint(0, 5)):
+		reaction = rng.choice(sorted(dictReaction) + [None, 'UnknownReaction']) \
+			if dictReaction else None
+		dictControl['Ctrl' + str(i)] = Control(
+			'Ctrl' + str(i), BIOPAX + 'Catalysis', 'ACTIVATION', reaction,
+			rng.choice(uris + [None])
+		)
+	return entities, dictReaction, dictControl
+
+
+def object_passes(graph, convertFullGraph):
+	"""Get members used, entities used and entities of pathways
+	computed on objects"""
+	dictPhysicalEntity, dictReaction, dictControl = graph
+	b2c.addReactionToEntities(dictReaction, dictControl, dictPhysicalEntity)
+	b2c.detectMembersUsedInEntities(dictPhysicalEntity, convertFullGraph)
+	used_entities = b2c.getEntitiesUsedInReactions(dictPhysicalEntity)
+	# PS: Controls of unknown reactions are not supported
+	pathways = b2c.getPathwayToPhysicalEntities(
+		dictReaction,
+		{uri: control for uri, control in dictControl.iteritems()
+			if control.reaction in dictReaction},
+		dictPhysicalEntity
+	)
+	members_used = {uri: entity.membersUsed
+					for uri, entity in dictPhysicalEntity.iteritems()}
+	return members_used, used_entities, pathways
+
+
+def columnar_passes(graph, convertFullGraph):
+	"""Get members used, entities used and entities of pathways
+	computed by the columnar store"""
+	dictPhysicalEntity, dictReaction, dictControl = graph
+	store = GraphStore(dictPhysicalEntity, dictReaction, dictControl)
+	store.detect_members_used(convertFullGraph)
+	members_used = {uri: entity.membersUsed
+					for uri, entity in dictPhysicalEntity.iteritems()}
+	return members_used, store.get_used_entities(), \
+		store.get_pathway_to_physical_entities()
+
+
+@pytest.mark.parametrize('convertFullGraph', [False, True])
+@pytest.mark.parametrize('seed', range(50))
+def test_passes(seed, convertFullGraph):
+	"""Columnar passes give the same results as the passes on objects"""
+	# PS: Graphs are not copied: members of the copies could be iterated
+	# in another order
+	expected = object_passes(random_graph(seed), convertFullGraph)
+	graph = random_graph(seed)
+	found = columnar_passes(graph, convertFullGraph)
+
+	assert found == expected
+	# Entities are not added to the sets of reactions
+	assert not any(entity.reactions for entity in graph[0].itervalues())
+
+
+def test_first_member_used():
+	"""Only the first member involved in a reaction is used; the entity
+	represents the other members"""
+	entities = {
+		uri: PhysicalEntity(uri, uri, None, BIOPAX + 'Protein', None)
+		for uri in ('Class', 'A', 'B', 'C', 'Other')
+	}
+	entities['Class'].members.update(('A', 'B', 'C', 'Unknown'))
+	entities['Other'].members.add('Class')
+	reaction = Reaction('R', None, BIOPAX + 'BiochemicalReaction', None, None)
+	reaction.leftComponents.update(('B', 'C'))
+	reaction.rightComponents.add('Other')
+	store = GraphStore(entities, {'R': reaction}, {})
+
+	store.detect_members_used()
+
+	first_member = next(uri for uri in entities['Class'].members
+						if uri in ('B', 'C'))
+	assert entities['Class'].membersUsed == {first_member, 'Class'}
+	# 'Class' is not involved in a reaction
+	assert entities['Other'].membersUsed == {'Other'}
+	assert store.get_used_entities() == {'Other', 'B', 'C'}
+	assert store.get_pathway_to_physical_entities() == {}
+
+
+def test_empty_graph():
+	"""Graph without reactions"""
+	entities = {'A': PhysicalEntity('A', 'A', None, BIOPAX + 'Protein', None)}
+	store = GraphStore(entities, {}, {})
+
+	store.detect_members_used()
+
+	assert store.get_used_entities() == set()
+	assert store.get_pathway_to_physical_entities() == {}
+
+
+def test_unknown_participant():
+	"""Participants of reactions are entities (see addReactionToEntities())"""
+	reaction = Reaction('R', None, BIOPAX + 'BiochemicalReaction', 'A', None)
+
+	with pytest.raises(KeyError):
+		GraphStore({}, {'R': reaction}, {})
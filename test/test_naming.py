@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+Unit tests for the names of entities
+(see biopax2cadbiom.biopax_converter.findUniqueCadbiomSynonym() and
+biopax2cadbiom.naming).
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+# Standard imports
+import dill
+import pytest
+
+# Custom imports
+import biopax2cadbiom.biopax_converter as b2c
+from biopax2cadbiom.classes import PhysicalEntity
+from biopax2cadbiom.naming import load_names_cache, save_names_cache
+from test.benchmarks import collision_set, pairwiseFindUniqueCadbiomSynonym
+
+BIOPAX = 'http://www.biopax.org/release/biopax-level3.owl#'
+
+
+def shared_synonym_set(nb_owners):
+	"""Build entities with the same name and the same synonym 'X'"""
+	dictPhysicalEntity = dict()
+	for i in range(nb_owners):
+		entity = PhysicalEntity(
+			'http://test#Protein{}'.format(i), 'ATP', None,
+			BIOPAX + 'SmallMolecule', None
+		)
+		entity.synonyms.add('X')
+		dictPhysicalEntity[entity.uri] = entity
+	return dictPhysicalEntity
+
+
+@pytest.mark.parametrize('nb_owners', [2, 3, 4, 5])
+def test_shared_synonym(nb_owners):
+	"""Owners of a synonym lose it by pairs (taken in the order of uris):
+	if their number is odd, the last one keeps it"""
+	dictPhysicalEntity = shared_synonym_set(nb_owners)
+	uris = sorted(dictPhysicalEntity)
+
+	names = b2c.findUniqueCadbiomSynonym(
+		'ATP', uris, set(), dictPhysicalEntity, dict()
+	)
+	expected = pairwiseFindUniqueCadbiomSynonym(
+		'ATP', uris, set(), dictPhysicalEntity, dict()
+	)
+	assert names == expected
+
+	if nb_owners % 2 == 1:
+		# The others are numbered at the next round
+		assert names.pop(uris[-1]) == 'X'
+	assert set(names.values()) == \
+		{'ATP_v{}'.format(i) for i in range(1, len(names) + 1)}
+
+
+@pytest.mark.parametrize('nb_entities', [2, 3, 7, 8, 51, 100])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_pairwise_equivalence(nb_entities, seed):
+	"""Same names as the pairwise subtraction of synonyms"""
+	dictPhysicalEntity, dictLocation = collision_set(
+		nb_entities, nb_synonyms=nb_entities // 2 + 1, seed=seed
+	)
+
+	for uris in (sorted(dictPhysicalEntity), set(dictPhysicalEntity)):
+		used_names = {'ATP-0'}
+		expected_used_names = set(used_names)
+		names = b2c.findUniqueCadbiomSynonym(
+			'ATP', uris, used_names, dictPhysicalEntity, dictLocation
+		)
+		expected = pairwiseFindUniqueCadbiomSynonym(
+			'ATP', uris, expected_used_names, dictPhysicalEntity, dictLocation
+		)
+		assert names == expected
+		assert used_names == expected_used_names
+
+
+def test_names_memo():
+	"""Names are the same with or without memo"""
+	dictPhysicalEntity, dictLocation = collision_set(20)
+	memo = dict()
+	for entity in dictPhysicalEntity.itervalues():
+		for synonym in [None] + list(entity.synonyms):
+			assert b2c.getCadbiomName(
+				entity, dictLocation, synonym=synonym, memo=memo
+			) == b2c.getCadbiomName(entity, dictLocation, synonym=synonym)
+	assert memo
+
+
+def test_names_cache(tmpdir):
+	"""Names are reused only if the digest is the same"""
+	filename = str(tmpdir.join('names.p'))
+	names = {'http://test#Protein0': 'ATP_c'}
+
+	assert load_names_cache(filename, 'digest') is None
+	save_names_cache(filename, 'digest', names)
+	assert load_names_cache(filename, 'digest') == names
+	assert load_names_cache(filename, 'other digest') is None
+
+
+@pytest.mark.parametrize('content', [
+	b'',
+	b'not a pickle',
+	dill.dumps({'digest': 'digest', 'names': {}})[:-10],
+	# Other formats
+	dill.dumps(['digest', {}]),
+	dill.dumps({'digest': 'digest'}),
+])
+def test_unreadable_names_cache(tmpdir, content):
+	"""Caches that can't be read are ignored"""
+	filename = tmpdir.join('names.p')
+	filename.write_binary(content)
+	assert load_names_cache(str(filename), 'digest') is None
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+Unit tests for the strongly connected components of the model
+(see biopax2cadbiom.scc).
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+# Standard imports
+import random
+import itertools as it
+from collections import defaultdict
+import pytest
+
+# Custom imports
+from biopax2cadbiom import conditions
+from biopax2cadbiom.classes import Transition
+from biopax2cadbiom.transition_store import MemoryTransitionStore, \
+	SQLiteTransitionStore
+from biopax2cadbiom.scc import getStronglyConnectedComponents, \
+	estimateCondition, getFrontierSCCs
+
+A, B, C, X, Y = (conditions.Symbol(name) for name in 'ABCXY')
+
+
+def make_transitions(edges):
+	"""Get a dictTransition from a list of (left, right, condition)"""
+	dictTransition = defaultdict(list)
+	for event_number, (left, right, condition) in enumerate(edges):
+		dictTransition[left, right].append(Transition(
+			'_h_' + str(event_number), 'R' + str(event_number), condition
+		))
+	return dict(dictTransition)
+
+
+def reference_frontier_sccs(dictTransition):
+	"""Frontier SCCs searched by brute force, as cadbiom does when
+	it adds start nodes to a model (add_start_nodes()):
+
+		- 2 places are in the same SCC if each one is reachable from the
+		  other one,
+		- a SCC is a frontier if for every transition that enters it, no
+		  assignment of the places outside the SCC makes the condition True.
+	"""
+
+	graph = defaultdict(set)
+	for left, right in dictTransition:
+		if left != right:
+			graph[left].add(right)
+	nodes = set(graph) | set(it.chain.from_iterable(graph.values()))
+
+	def reachable(node):
+		seen, stack = {node}, [node]
+		while stack:
+			for successor in graph[stack.pop()]:
+				if successor not in seen:
+					seen.add(successor)
+					stack.append(successor)
+		return seen
+
+	reach = {node: reachable(node) for node in nodes}
+	sccs = {frozenset(other for other in nodes
+					  if other in reach[node] and node in reach[other])
+			for node in nodes}
+
+	def may_be_true(condition, scc):
+		condition = conditions.as_expr(condition)
+		free = sorted(atom.name for atom in condition.atoms()
+					  if isinstance(atom, conditions.Symbol)
+					  and atom.name not in scc)
+		for values in it.product((False, True), repeat=len(free)):
+			assignment = dict(zip(free, values))
+			assignment.update((name, False) for name in scc)
+			if evaluate(condition, assignment):
+				return True
+		return False
+
+	frontier_sccs = [
+		sorted(scc, key=lambda name: (name.lower(), name))
+		for scc in sccs if len(scc) > 1 and not any(
+			may_be_true(transition.sympyCond, scc)
+			for (left, right), transitions in dictTransition.items()
+			if left not in scc and right in scc
+			for transition in transitions
+		)
+	]
+	return sorted(frontier_sccs, key=lambda scc: (scc[0].lower(), scc[0]))
+
+
+def evaluate(condition, assignment):
+	"""Evaluate a condition with the given values of places"""
+	if isinstance(condition, conditions.Symbol):
+		return assignment[condition.name]
+	elif isinstance(condition, conditions.BooleanConstant):
+		return condition.value
+	elif isinstance(condition, conditions.Not):
+		return not evaluate(condition.arg, assignment)
+	elif isinstance(condition, conditions.And):
+		return all(evaluate(arg, assignment) for arg in condition.args)
+	return any(evaluate(arg, assignment) for arg in condition.args)
+
+
+def random_condition(rng, names):
+	"""Random condition in which each place appears at most once
+	(3-valued estimations are exact for such conditions)"""
+	names = rng.sample(names, rng.randint(0, 3))
+	if not names:
+		return rng.choice((conditions.TRUE, conditions.FALSE))
+	args = [conditions.Symbol(name) if rng.random() < 0.6
+			else conditions.Not(conditions.Symbol(name)) for name in names]
+	if len(args) == 1:
+		return args[0]
+	return rng.choice((conditions.And, conditions.Or))(*args)
+
+
+def test_strongly_connected_components():
+	"""Cycles, self-loops, nested cycles and isolated nodes"""
+	graph = {
+		# Nested cycles: A -> B -> A and A -> B -> C -> A
+		'A': {'B'}, 'B': {'A', 'C'}, 'C': {'A', 'D'},
+		# Self-loop
+		'D': {'D', 'E'},
+		# 2nd cycle reachable from the first one
+		'E': {'F'}, 'F': {'E'},
+		'G': set(),
+	}
+	found = list(getStronglyConnectedComponents(graph))
+
+	assert sorted(sorted(scc) for scc in found) == \
+		[['A', 'B', 'C'], ['D'], ['E', 'F'], ['G']]
+	# Components are yielded in reverse topological order
+	assert found.index({'E', 'F'}) < found.index({'D'}) < \
+		found.index({'A', 'B', 'C'})
+
+
+def test_strongly_connected_components_depth():
+	"""The depth of the graph is not limited by the recursion limit"""
+	size = 20000
+	graph = {node: {node + 1} for node in range(size)}
+	graph[size] = {0}
+
+	found = list(getStronglyConnectedComponents(graph))
+
+	assert found == [set(range(size + 1))]
+
+
+@pytest.mark.parametrize("condition, expected", [
+	(conditions.TRUE, 1),
+	(conditions.FALSE, -1),
+	(A, -1),
+	(X, 0),
+	(conditions.Not(A), 1),
+	(conditions.And(A, X), -1),
+	(conditions.Or(A, X), 0),
+	(conditions.Or(conditions.Not(A), X), 1),
+	(conditions.Not(conditions.And(X, conditions.Or(A, B))), 1),
+])
+def test_estimate_condition(condition, expected):
+	"""Places A and B are inactive, X is unknown"""
+	assert estimateCondition(condition, {'A', 'B'}) == expected
+
+
+@pytest.mark.parametrize("edges, expected", [
+	# Isolated cycle
+	([('A', 'B', conditions.TRUE), ('B', 'A', conditions.TRUE)],
+	 [['A', 'B']]),
+	# Self-loops are not cycles
+	([('A', 'A', conditions.TRUE)], []),
+	# A self-loop does not enter the cycle
+	([('A', 'B', conditions.TRUE), ('B', 'A', conditions.TRUE),
+	  ('A', 'A', X)],
+	 [['A', 'B']]),
+	# Entering transition that may be fired
+	([('A', 'B', conditions.TRUE), ('B', 'A', conditions.TRUE),
+	  ('X', 'A', conditions.TRUE)],
+	 []),
+	([('A', 'B', conditions.TRUE), ('B', 'A', conditions.TRUE),
+	  ('X', 'A', Y)],
+	 []),
+	([('A', 'B', conditions.TRUE), ('B', 'A', conditions.TRUE),
+	  ('X', 'A', conditions.Not(B))],
+	 []),
+	# Entering transitions blocked by the places of the cycle
+	([('A', 'B', conditions.TRUE), ('B', 'A', conditions.TRUE),
+	  ('X', 'A', conditions.And(B, Y)), ('Y', 'B', conditions.FALSE)],
+	 [['A', 'B']]),
+	# Only 1 of the events of a transition may be fired
+	([('A', 'B', conditions.TRUE), ('B', 'A', conditions.TRUE),
+	  ('X', 'A', B), ('X', 'A', Y)],
+	 []),
+	# Nested cycles are 1 SCC; transitions inside the SCC are ignored
+	([('A', 'B', conditions.TRUE), ('B', 'A', conditions.TRUE),
+	  ('B', 'C', Y), ('C', 'A', conditions.TRUE), ('X', 'C', A)],
+	 [['A', 'B', 'C']]),
+	# A cycle entered from another frontier cycle is not a frontier
+	([('A', 'B', conditions.TRUE), ('B', 'A', conditions.TRUE),
+	  ('B', 'C', conditions.TRUE), ('C', 'X', conditions.TRUE),
+	  ('X', 'C', conditions.TRUE)],
+	 [['A', 'B']]),
+	# Case insensitive order of places and SCCs
+	([('b', 'A', conditions.TRUE), ('A', 'b', conditions.TRUE),
+	  ('X', 'Y', conditions.TRUE), ('Y', 'X', conditions.TRUE),
+	  ('c', 'C', conditions.TRUE), ('C', 'c', conditions.TRUE)],
+	 [['A', 'b'], ['C', 'c'], ['X', 'Y']]),
+])
+def test_frontier_sccs(edges, expected):
+	"""Frontier SCCs of small models"""
+	dictTransition = make_transitions(edges)
+
+	assert getFrontierSCCs(dictTransition) == expected
+	assert reference_frontier_sccs(dictTransition) == expected
+
+
+def test_frontier_sccs_sympy():
+	"""Conditions built with sympy are accepted"""
+	sympy = pytest.importorskip("sympy")
+	a, y = sympy.symbols('A Y')
+	dictTransition = make_transitions([
+		('A', 'B', sympy.true), ('B', 'A', sympy.true),
+		('X', 'A', sympy.And(a, y)),
+	])
+
+	assert getFrontierSCCs(dictTransition) == [['A', 'B']]
+
+
+@pytest.mark.parametrize("store_class",
+						 [MemoryTransitionStore, SQLiteTransitionStore])
+def test_frontier_sccs_stores(tmpdir, store_class):
+	"""Frontier SCCs are found on the stores of transitions"""
+	edges = [
+		('A', 'B', conditions.TRUE), ('B', 'A', conditions.TRUE),
+		('X', 'A', conditions.And(B, Y)), ('C', 'D', conditions.TRUE),
+		('D', 'C', conditions.TRUE), ('X', 'D', Y), ('D', 'D', Y),
+	]
+	store = store_class(str(tmpdir)) \
+		if store_class is SQLiteTransitionStore else store_class()
+	try:
+		for left_right, transitions in make_transitions(edges).items():
+			for transition in transitions:
+				store.add(left_right, transition)
+
+		assert getFrontierSCCs(store) == [['A', 'B']]
+	finally:
+		store.close()
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_frontier_sccs_reference(seed):
+	"""Frontier SCCs of random models are those found by brute force"""
+	rng = random.Random(seed)
+	names = ['A', 'b', 'C', 'd', 'E', 'f', 'G', 'h']
+	edges = [
+		(rng.choice(names), rng.choice(names), random_condition(rng, names))
+		for _ in range(rng.randint(1, 16))
+	]
+	dictTransition = make_transitions(edges)
+
+	assert getFrontierSCCs(dictTransition) == \
+		reference_frontier_sccs(dictTransition)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+Unit tests for the neighbourhood of seeds
+(see biopax2cadbiom.biopax_converter.getSeedsNeighbourhood()).
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+# Standard imports
+import pytest
+
+# Custom imports
+import biopax2cadbiom.biopax_converter as b2c
+from biopax2cadbiom.classes import PhysicalEntity, Reaction, Control
+
+BIOPAX = 'http://www.biopax.org/release/biopax-level3.owl#'
+
+
+@pytest.fixture()
+def graph():
+	"""Small graph:
+
+		R1: S -> A
+		R2: A -> B (controlled by K)
+		R3: B -> C
+		R4: CX -> D (CX: complex of S and X)
+		R5: F -> E (F: class of A and A2)
+		R6: X -> Q (X is only a component of CX)
+		R7: A2 -> P (A2 is only a member of F)
+		R8: Z -> W (unrelated)
+	"""
+	dictPhysicalEntity = dict()
+	for uri in ('S', 'A', 'A2', 'B', 'C', 'D', 'E', 'K', 'X', 'Q', 'P',
+				'Z', 'W', 'CX', 'F'):
+		entity_type = 'Complex' if uri == 'CX' else 'Protein'
+		dictPhysicalEntity[uri] = PhysicalEntity(
+			uri, 'name of ' + uri, None, BIOPAX + entity_type, None
+		)
+	dictPhysicalEntity['S'].synonyms.add('synonym of S')
+	dictPhysicalEntity['CX'].components.update({'S', 'X'})
+	dictPhysicalEntity['F'].members.update({'A', 'A2'})
+
+	dictReaction = dict()
+	for uri, left, right in (('R1', 'S', 'A'), ('R2', 'A', 'B'),
+							 ('R3', 'B', 'C'), ('R4', 'CX', 'D'),
+							 ('R5', 'F', 'E'), ('R6', 'X', 'Q'),
+							 ('R7', 'A2', 'P'), ('R8', 'Z', 'W')):
+		reaction = Reaction(
+			uri, None, BIOPAX + 'BiochemicalReaction', None, None
+		)
+		reaction.leftComponents.add(left)
+		reaction.rightComponents.add(right)
+		dictReaction[uri] = reaction
+
+	control = Control('Ctrl2', BIOPAX + 'Catalysis', 'ACTIVATION', 'R2', 'K')
+	return dictPhysicalEntity, dictReaction, {control.uri: control}
+
+
+def neighbourhood(graph, seeds, radius):
+	"""Get the sorted uris of entities, reactions and controls kept"""
+	return tuple(
+		sorted(objects)
+		for objects in b2c.getSeedsNeighbourhood(seeds, radius, *graph)
+	)
+
+
+def test_radius_0(graph):
+	"""Seeds, their parents and the components of these parents"""
+	assert neighbourhood(graph, ['S'], 0) == (['CX', 'S', 'X'], [], [])
+
+
+def test_radius_1(graph):
+	"""Reactions of the seeds and of their parents (but not of the
+	components of their parents)"""
+	assert neighbourhood(graph, ['S'], 1) == (
+		['A', 'A2', 'CX', 'D', 'F', 'S', 'X'],
+		['R1', 'R4'],
+		[],
+	)
+
+
+def test_radius_2(graph):
+	"""Reactions of the parents and of the controllers reached at
+	the previous step (but not of the members of these parents)"""
+	assert neighbourhood(graph, ['S'], 2) == (
+		['A', 'A2', 'B', 'CX', 'D', 'E', 'F', 'K', 'S', 'X'],
+		['R1', 'R2', 'R4', 'R5'],
+		['Ctrl2'],
+	)
+
+
+def test_whole_component(graph):
+	"""The search stops when no reaction is added"""
+	expected = neighbourhood(graph, ['S'], 3)
+	assert 'R3' in expected[1]
+	assert neighbourhood(graph, ['S'], 10) == expected
+	assert 'R8' not in expected[1]
+
+
+def test_controller_seed(graph):
+	"""Reactions controlled by the seeds are reached"""
+	assert neighbourhood(graph, ['K'], 1) == (
+		['A', 'A2', 'B', 'F', 'K'],
+		['R2'],
+		['Ctrl2'],
+	)
+
+
+def test_seeds_names(graph):
+	"""Seeds are uris, names or synonyms; unknown seeds are ignored"""
+	expected = neighbourhood(graph, ['S'], 1)
+	assert neighbourhood(graph, ['name of S'], 1) == expected
+	assert neighbourhood(graph, ['synonym of S', 'unknown'], 1) == expected
+	assert neighbourhood(graph, ['unknown'], 1) == ([], [], [])
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+Unit tests for the snapshots of queries (see biopax2cadbiom.snapshot).
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+# Standard imports
+import pytest
+
+# Custom imports
+from biopax2cadbiom.classes import PhysicalEntity, Reaction, Location, Control
+from biopax2cadbiom.snapshot import write_snapshot, load_snapshot, \
+	Snapshot, SnapshotError
+
+BIOPAX = 'http://www.biopax.org/release/biopax-level3.owl#'
+
+
+@pytest.fixture()
+def queries():
+	"""Results of queries with all kinds of attributes"""
+	location = Location('http://test#cytosol', 'cytosol')
+	location.idRefs.update({('GO:0005829', 'GO'), ('GO:0005737', 'GO')})
+	empty_location = Location('http://test#nucleus', 'nucleus')
+
+	complex_entity = PhysicalEntity(
+		'http://test#Complex1', 'A/B complex', location.uri,
+		BIOPAX + 'Complex', None
+	)
+	complex_entity.components.update({'http://test#A', 'http://test#B'})
+	protein_a = PhysicalEntity(
+		'http://test#A', 'β-catenin', None,
+		BIOPAX + 'Protein', 'http://test#RefA'
+	)
+	protein_a.synonyms.update({'CTNNB1', 'β-cat'})
+	protein_b = PhysicalEntity(
+		'http://test#B', 'B', location.uri, BIOPAX + 'Protein', None
+	)
+	family = PhysicalEntity(
+		'http://test#Family', 'family', None, BIOPAX + 'Protein', None
+	)
+	family.members.update({'http://test#A', 'http://test#B'})
+	dictPhysicalEntity = {entity.uri: entity for entity in
+		(complex_entity, protein_a, protein_b, family)}
+
+	reaction = Reaction(
+		'http://test#Reaction1', 'binding',
+		BIOPAX + 'BiochemicalReaction', None, None
+	)
+	reaction.leftComponents.update({'http://test#A', 'http://test#B'})
+	reaction.rightComponents.add('http://test#Complex1')
+	reaction.pathways.update({'http://test#Pathway1', 'http://test#Pathway2'})
+	template = Reaction(
+		'http://test#Reaction2', None,
+		BIOPAX + 'TemplateReaction', 'http://test#A', None
+	)
+	dictReaction = {reaction.uri: reaction, template.uri: template}
+
+	control = Control(
+		'http://test#Control1', 'Catalysis', 'ACTIVATION',
+		reaction.uri, 'http://test#Family'
+	)
+	control.evidences.add('http://test#Evidence1')
+
+	return (
+		dictPhysicalEntity, dictReaction,
+		{location.uri: location, empty_location.uri: empty_location},
+		{control.uri: control},
+		{'http://test#B'},
+		{'listOfGraphUri': ['http://test'], 'blacklist': None,
+		 'convertFullGraph': True},
+	)
+
+
+def test_round_trip(tmpdir, queries):
+	"""Objects are the same after a save/load of a snapshot"""
+	filename = str(tmpdir.join('backup.snap'))
+	write_snapshot(filename, *queries)
+	loaded = load_snapshot(filename)
+
+	for objects, loaded_objects in zip(queries[:4], loaded[:4]):
+		assert set(objects) == set(loaded_objects)
+		for uri, obj in objects.iteritems():
+			assert vars(obj) == vars(loaded_objects[uri])
+
+	# Blacklist and params
+	assert loaded[4] == queries[4]
+	assert loaded[5] == queries[5]
+
+
+def test_shared_strings(tmpdir, queries):
+	"""Each string is decoded once and shared by the loaded objects"""
+	filename = str(tmpdir.join('backup.snap'))
+	write_snapshot(filename, *queries)
+	dictPhysicalEntity, dictReaction = load_snapshot(filename)[:2]
+
+	reaction = dictReaction['http://test#Reaction1']
+	entity_uri = next(uri for uri in reaction.leftComponents
+					  if uri == 'http://test#A')
+	assert entity_uri is dictPhysicalEntity['http://test#A'].uri
+
+
+def test_empty_queries(tmpdir):
+	"""Snapshot without entities"""
+	filename = str(tmpdir.join('backup.snap'))
+	write_snapshot(filename, {}, {}, {}, {}, set(), {})
+	assert load_snapshot(filename) == ({}, {}, {}, {}, set(), {})
+
+
+def test_not_a_snapshot(tmpdir):
+	"""Other files (ex: dill backups) are rejected"""
+	filename = tmpdir.join('backup.p')
+	filename.write_binary(b'')
+	with pytest.raises(SnapshotError):
+		load_snapshot(str(filename))
+
+	filename.write_binary(b'\x80\x02]q\x00' * 10)
+	with pytest.raises(SnapshotError):
+		load_snapshot(str(filename))
+
+
+def test_lazy_decoding(tmpdir, queries):
+	"""Only the header is read when the file is mapped; strings are
+	decoded when their sections are used"""
+	filename = str(tmpdir.join('backup.snap'))
+	write_snapshot(filename, *queries)
+
+	with Snapshot(filename) as snapshot:
+		assert snapshot.strings == {-1: None}
+
+		uris = snapshot.column('reaction.uri')
+		assert sorted(uris) == sorted(queries[1])
+		assert set(snapshot.strings.values()) == set(uris) | {None}
+
+		assert snapshot.column('reaction.product').count(None) == 1
+		assert snapshot.string(-1) is None
+
+	# The file is unmapped
+	with pytest.raises(ValueError):
+		snapshot.section('blacklist')
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+Unit tests for the stores of transitions
+(see biopax2cadbiom.transition_store).
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+# Standard imports
+import os
+import random
+import pytest
+
+# Custom imports
+import biopax2cadbiom.biopax_converter as b2c
+from biopax2cadbiom import conditions
+from biopax2cadbiom.classes import Transition
+from biopax2cadbiom.transition_store import MemoryTransitionStore, \
+	SQLiteTransitionStore, iterSortedTransitions
+from test.benchmarks import queries_set
+
+
+def as_tuples(groups):
+	"""Get comparable groups of transitions"""
+	return [
+		(left_right, [(transition.event, transition.reaction,
+					   transition.sympyCond) for transition in transitions])
+		for left_right, transitions in groups
+	]
+
+
+@pytest.fixture()
+def transitions():
+	"""Random transitions; names differ by their case and by non-ASCII
+	characters, conditions are shared between transitions"""
+	rng = random.Random(0)
+	names = ['A', 'a', 'B', 'b', 'é', 'E', 'e_1', 'e_10', 'e_2', 'Z', 'ζ']
+	shared_conditions = [
+		conditions.TRUE, conditions.Symbol('A'),
+		conditions.And(conditions.Symbol('B'),
+					   conditions.Not(conditions.Symbol('é'))),
+	]
+	return [
+		((rng.choice(names), rng.choice(names)),
+		 Transition('_h_' + str(number), 'R' + str(rng.randint(0, 50)),
+					rng.choice(shared_conditions)))
+		for number in range(5000)
+	]
+
+
+@pytest.fixture()
+def sqlite_store(tmpdir):
+	"""SQLite store with the smallest budget"""
+	store = SQLiteTransitionStore(str(tmpdir), memory_budget=1)
+	yield store
+	store.close()
+
+
+def test_stores_equivalence(transitions, sqlite_store):
+	"""Both stores give the same groups of transitions, in the same order"""
+	memory_store = MemoryTransitionStore()
+	flushes = list()
+	flush = sqlite_store.flush
+
+	def counted_flush():
+		flushes.append(len(sqlite_store.buffer))
+		flush()
+
+	sqlite_store.flush = counted_flush
+	for left_right, transition in transitions:
+		memory_store.add(left_right, transition)
+		sqlite_store.add(left_right, transition)
+
+	# Several batches are inserted before the first query
+	assert len([size for size in flushes if size]) >= 3
+
+	expected = as_tuples(memory_store.itersorted())
+	assert as_tuples(sqlite_store.itersorted()) == expected
+	assert as_tuples(iterSortedTransitions(sqlite_store)) == expected
+	assert as_tuples(iterSortedTransitions(dict(memory_store))) == expected
+	assert list(sqlite_store.iterkeys()) == \
+		[left_right for left_right, _ in expected]
+	assert len(sqlite_store) == len(memory_store)
+
+	# Conditions are not duplicated
+	assert len(sqlite_store.conditions) == 3
+
+
+def test_sqlite_store_items(transitions, sqlite_store):
+	"""Access to the transitions of ori/ext nodes"""
+	memory_store = MemoryTransitionStore()
+	for left_right, transition in transitions:
+		memory_store.add(left_right, transition)
+		sqlite_store.add(left_right, transition)
+
+	for left_right in memory_store:
+		assert left_right in sqlite_store
+		assert as_tuples([(left_right, sqlite_store[left_right])]) == \
+			as_tuples([(left_right, memory_store[left_right])])
+
+	assert ('unknown', 'A') not in sqlite_store
+	with pytest.raises(KeyError):
+		sqlite_store['unknown', 'A']
+
+
+def test_sqlite_store_close(tmpdir):
+	"""The database is deleted; errors are not raised"""
+	store = SQLiteTransitionStore(str(tmpdir))
+	store.add(('A', 'B'), Transition('_h_1', 'R1', conditions.TRUE))
+	assert len(store) == 1
+
+	store.close()
+	assert not os.path.exists(store.path)
+
+	# The database is already deleted
+	store.close()
+
+
+def convert(store, workers=1, shardByComponent=False):
+	"""Add the transitions of a small random graph to the given store;
+	return the nodes of the model"""
+	dictPhysicalEntity, dictReaction, dictLocation, dictControl, _, _ = \
+		queries_set(300, 200)
+	b2c.addReactionToEntities(dictReaction, dictControl, dictPhysicalEntity)
+	b2c.detectMembersUsedInEntities(dictPhysicalEntity)
+	used_entities = b2c.getEntitiesUsedInReactions(dictPhysicalEntity)
+	b2c.developComplexs(dictPhysicalEntity, used_entities)
+	b2c.addControllersToReactions(dictReaction, dictControl)
+	b2c.numerotateLocations(dictLocation, True)
+	nodes = b2c.ModelNodes()
+	b2c.addCadbiomNameToEntities(
+		dictPhysicalEntity, dictLocation, None, used_entities, nodes
+	)
+
+	computed_reactions = None
+	if shardByComponent:
+		computed_reactions = b2c.getShardedConditionsAndTransitions(
+			dictReaction, dictPhysicalEntity, store, workers, nodes
+		)
+	else:
+		b2c.addCadbiomSympyCondToReactions(dictReaction, dictPhysicalEntity)
+	b2c.getTransitions(
+		dictReaction, dictPhysicalEntity, None, workers, computed_reactions,
+		nodes, store
+	)
+	return nodes
+
+
+@pytest.mark.parametrize('workers, shardByComponent', [
+	(2, False),
+	(1, True),
+	(2, True),
+])
+def test_streamed_transitions(tmpdir, workers, shardByComponent):
+	"""Transitions computed by processes or by shards are added to the
+	stores as they are returned; the stores get the same transitions
+	(in any order) and the same nodes as with 1 process"""
+	expected_store = MemoryTransitionStore()
+	expected_nodes = convert(expected_store)
+	expected = [
+		(left_right, sorted(transitions))
+		for left_right, transitions in as_tuples(expected_store.itersorted())
+	]
+
+	memory_store = MemoryTransitionStore()
+	sqlite_store = SQLiteTransitionStore(str(tmpdir), memory_budget=1)
+	try:
+		for store in (memory_store, sqlite_store):
+			nodes = convert(store, workers, shardByComponent)
+
+			assert [
+				(left_right, sorted(transitions))
+				for left_right, transitions in as_tuples(store.itersorted())
+			] == expected
+			assert nodes.names == expected_nodes.names
+	finally:
+		sqlite_store.close()
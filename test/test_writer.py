@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# MIT License
+#
+# Copyright (c) 2017 IRISA, Jean Coquet, Pierre Vignet, Mateo Boudet
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Contributor(s): Jean Coquet, Pierre Vignet, Mateo Boudet
+
+"""
+Unit tests for the cadbiom writer: content hash of models and model
+without strongly connected components
+(see biopax2cadbiom.cadbiom_writer.createCadbiomFile()).
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+# Standard imports
+import os
+from lxml import etree as ET
+import pytest
+
+# Custom imports
+from biopax2cadbiom import conditions
+from biopax2cadbiom import cadbiom_writer
+from biopax2cadbiom.classes import PhysicalEntity, Transition
+
+BIOPAX = 'http://www.biopax.org/release/biopax-level3.owl#'
+
+
+@pytest.fixture()
+def model():
+	"""Model with a frontier SCC (A, B), entered by a transition blocked
+	by B"""
+	dictPhysicalEntity = dict()
+	for uri in ('A', 'B', 'C', 'X'):
+		entity = PhysicalEntity(uri, uri, None, BIOPAX + 'Protein', None)
+		entity.cadbiomName = uri
+		dictPhysicalEntity[uri] = entity
+
+	dictTransition = {
+		('A', 'B'): [Transition('_h_1', 'R1', conditions.TRUE)],
+		('B', 'A'): [Transition('_h_2', 'R2', conditions.TRUE)],
+		('X', 'A'): [Transition('_h_3', 'R3', conditions.And(
+			conditions.Symbol('B'), conditions.Symbol('C')
+		))],
+	}
+	return dictTransition, dictPhysicalEntity
+
+
+@pytest.fixture()
+def frontier_sccs_calls(monkeypatch):
+	"""Record the calls to getFrontierSCCs()"""
+	calls = list()
+	getFrontierSCCs = cadbiom_writer.getFrontierSCCs
+
+	def recorded_getFrontierSCCs(dictTransition):
+		calls.append(dictTransition)
+		return getFrontierSCCs(dictTransition)
+
+	monkeypatch.setattr(
+		cadbiom_writer, 'getFrontierSCCs', recorded_getFrontierSCCs
+	)
+	return calls
+
+
+def children(path):
+	"""Get the tags and names of the elements of a model"""
+	with cadbiom_writer.openModelFile(path, 'rb') as fd:
+		root = ET.parse(fd).getroot()
+	return [(ET.QName(element).localname, element.get('name'),
+			 element.get('ori'), element.get('ext'))
+			for element in root]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("extension", ['.bcx', '.bcx.gz'])
+def test_model_without_scc(tmpdir, model, extension, compact):
+	"""The model without SCC is the basic model with start nodes and
+	their transitions"""
+	path = str(tmpdir.join('model' + extension))
+	scc_path = cadbiom_writer.getModelWithoutSCCPath(path)
+
+	assert cadbiom_writer.createCadbiomFile(
+		model[0], model[1], 'model', path, False, compact
+	)
+
+	basic = children(path)
+	nodes = [element for element in basic if element[0] == 'CSimpleNode']
+	transitions = [element for element in basic
+				   if element[0] == 'transition']
+	assert len(nodes) == 4 and len(transitions) == 3
+	assert children(scc_path) == \
+		nodes + [('CStartNode', '__start__0', None, None)] + \
+		transitions + [('transition', None, '__start__0', 'A')]
+
+	content_hash = cadbiom_writer.readModelHash(path)
+	assert content_hash is not None
+	assert cadbiom_writer.readModelHash(scc_path) == content_hash
+	# Temporary files are removed
+	assert sorted(os.listdir(str(tmpdir))) == \
+		sorted(os.path.basename(name) for name in (path, scc_path))
+
+
+def test_unchanged_model(tmpdir, model, frontier_sccs_calls):
+	"""Unchanged models are not replaced, and SCCs are not searched"""
+	path = str(tmpdir.join('model.bcx'))
+	scc_path = cadbiom_writer.getModelWithoutSCCPath(path)
+	cadbiom_writer.createCadbiomFile(model[0], model[1], 'model', path, False)
+	assert len(frontier_sccs_calls) == 1
+	stats = [os.stat(name) for name in (path, scc_path)]
+
+	assert not cadbiom_writer.createCadbiomFile(
+		model[0], model[1], 'model', path, False
+	)
+	assert len(frontier_sccs_calls) == 1
+	assert [os.stat(name) for name in (path, scc_path)] == stats
+
+	# Missing model without SCC: only this model is written
+	with open(scc_path, 'rb') as fd:
+		scc_model = fd.read()
+	os.remove(scc_path)
+	assert cadbiom_writer.createCadbiomFile(
+		model[0], model[1], 'model', path, False
+	)
+	assert len(frontier_sccs_calls) == 2
+	assert os.stat(path) == stats[0]
+	with open(scc_path, 'rb') as fd:
+		assert fd.read() == scc_model
+
+
+def test_changed_model(tmpdir, model, frontier_sccs_calls):
+	"""Both models are replaced when the model changes"""
+	path = str(tmpdir.join('model.bcx'))
+	scc_path = cadbiom_writer.getModelWithoutSCCPath(path)
+	cadbiom_writer.createCadbiomFile(model[0], model[1], 'model', path, False)
+	content_hash = cadbiom_writer.readModelHash(path)
+
+	del model[0]['X', 'A']
+	assert cadbiom_writer.createCadbiomFile(
+		model[0], model[1], 'model', path, False
+	)
+
+	assert len(frontier_sccs_calls) == 2
+	new_hash = cadbiom_writer.readModelHash(path)
+	assert new_hash != content_hash
+	assert cadbiom_writer.readModelHash(scc_path) == new_hash
+	assert ('transition', None, 'X', 'A') not in children(scc_path)
+
+
+def test_no_scc_fix(tmpdir, model, frontier_sccs_calls):
+	"""No model without SCC"""
+	path = str(tmpdir.join('model.bcx'))
+
+	assert cadbiom_writer.createCadbiomFile(
+		model[0], model[1], 'model', path, True
+	)
+
+	assert not frontier_sccs_calls
+	assert os.listdir(str(tmpdir)) == ['model.bcx']